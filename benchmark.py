@@ -0,0 +1,423 @@
+'''
+    File: benchmark.py
+    Author: Drew Scott
+    Description: Times the convex hull, triangulation and fractal methods on generated point sets
+    Usage: python3 benchmark.py <benchmark> [n_points] [report path]
+           python3 benchmark.py compare <old report path> <new report path>
+        * benchmark can be: chan, divide_conquer, parallel, sliding_window, predicates, nearest_site, approximate, suite
+        * for divide_conquer, n_points is the largest size timed
+        * for parallel, n_points points are used (PARALLEL_POINTS by default) for each number of workers up to the number
+          of cpus
+        * for sliding_window, n_points is the largest window timed
+        * for nearest_site, n_points is the largest number of sites timed
+        * for approximate, n_points points are streamed in chunks of CHUNK_SIZE for each of EPSILONS
+        * for suite, n_points is the largest size run (up to 10^7), and the JSON report is written to report path
+          (SUITE_REPORT_PATH by default)
+        * compare prints how each run of the suite changed between two reports, and exits with status 1 if any of them
+          got more than REGRESSION_THRESHOLD times slower
+'''
+
+from math import cos, sin, pi, log2
+from random import random, randint, seed
+from time import perf_counter
+import json
+import platform
+import sys
+import tracemalloc
+
+import numpy as np
+
+from convex_hull import graham_scan, gift_wrap, divide_conquer, parallel_divide_conquer, chan, quickhull_hull, monotone_chain, approximate_hull, sliding_window_hulls, available_cpus
+from delaunay_triangulation import delaunay_triangulation
+from instrumentation import Predicate_Counter
+from serpinski import chaos_game
+from voronoi import Nearest_Site_Index
+import util
+
+N_POINTS = 10000
+PARALLEL_POINTS = 10**6
+HULL_SIZES = [4, 8, 16, 32, 64, 128, 256]
+N_WINDOWS = 1000
+N_QUERIES = 10000
+RADIUS = 1000
+EPSILONS = [0.1, 0.01, 0.001, 0.0001]
+CHUNK_SIZE = 10**6
+
+SUITE_SIZES = [10**2, 10**3, 10**4, 10**5, 10**6, 10**7]
+SUITE_MAX_POINTS = 10**6
+SUITE_REPORT_PATH = 'benchmark_report.json'
+DISTRIBUTIONS = ['uniform', 'disk', 'circle', 'clustered', 'degenerate']
+N_CLUSTERS = 10
+# a method isn't run on the next size of a distribution if it would take longer than this, growing at least linearly
+SUITE_TIME_LIMIT = 10
+REGRESSION_THRESHOLD = 1.25
+# fast runs are repeated up to this many times, until they have taken this long in total, and the best time is kept
+SUITE_REPEATS = 5
+SUITE_MIN_TIME = 0.2
+
+def main(args):
+    if args[1] == 'compare':
+        sys.exit(1 if compare_reports(args[2], args[3]) else 0)
+    n_points = int(args[2]) if len(args) > 2 else N_POINTS
+
+    if args[1] == 'chan':
+        benchmark_hull_size(n_points, {'graham_scan': graham_scan, 'gift_wrap': gift_wrap, 'divide_conquer': divide_conquer, 'chan': chan, 'quickhull': quickhull_hull})
+    elif args[1] == 'divide_conquer':
+        benchmark_growth(n_points, divide_conquer)
+    elif args[1] == 'parallel':
+        benchmark_parallel(int(args[2]) if len(args) > 2 else PARALLEL_POINTS)
+    elif args[1] == 'sliding_window':
+        benchmark_sliding_window(n_points)
+    elif args[1] == 'predicates':
+        benchmark_predicates(n_points)
+    elif args[1] == 'nearest_site':
+        benchmark_nearest_site(n_points)
+    elif args[1] == 'approximate':
+        benchmark_approximate(n_points)
+    elif args[1] == 'suite':
+        n_points = int(args[2]) if len(args) > 2 else SUITE_MAX_POINTS
+        benchmark_suite(n_points, args[3] if len(args) > 3 else SUITE_REPORT_PATH)
+
+def benchmark_hull_size(n_points, methods):
+    '''
+        Prints the time taken by each method on n_points points with each of the hull sizes in HULL_SIZES
+    '''
+
+    print(f'{"k":>6}' + ''.join(f'{name:>16}' for name in methods))
+    for k in HULL_SIZES:
+        points = points_with_hull_size(n_points, k)
+        times = [time_method(method, points) for method in methods.values()]
+        print(f'{k:>6}' + ''.join(f'{time:>15.4f}s' for time in times))
+
+def benchmark_growth(max_points, method):
+    '''
+        Prints the time taken by method on uniformly random points for each power of 10 up to max_points
+        The time divided by nlogn should stay flat if method is O(nlogn)
+    '''
+
+    print(f'{"n":>10}{"time":>12}{"ns / nlogn":>14}')
+    n_points = 1000
+    while n_points <= max_points:
+        seed(n_points)
+        points = [(randint(-RADIUS * n_points, RADIUS * n_points), randint(-RADIUS * n_points, RADIUS * n_points)) for _ in range(n_points)]
+        time = time_method(method, points)
+        print(f'{n_points:>10}{time:>11.4f}s{1e9 * time / (n_points * log2(n_points)):>14.2f}')
+        n_points *= 10
+
+def benchmark_parallel(n_points):
+    '''
+        Prints the time taken by parallel_divide_conquer on n_points uniformly random points, as a list and as an array,
+        with each power of 2 workers up to the number of cpus (and the number of cpus itself), and its speedup over
+        divide_conquer
+        One worker (or fewer than PARALLEL_MIN_POINTS points) runs divide_conquer itself, so its speedup is about 1
+    '''
+
+    seed(n_points)
+    points = [(randint(-RADIUS * n_points, RADIUS * n_points), randint(-RADIUS * n_points, RADIUS * n_points)) for _ in range(n_points)]
+    array = np.array(points)
+    serial_time = time_method(divide_conquer, points)
+    print(f'divide_conquer: {serial_time:.4f}s')
+
+    worker_counts = [2**i for i in range(int(log2(available_cpus())) + 1)]
+    if worker_counts[-1] != available_cpus():
+        worker_counts.append(available_cpus())
+
+    print(f'{"workers":>8}{"list":>12}{"speedup":>10}{"array":>12}{"speedup":>10}')
+    for workers in worker_counts:
+        list_time = time_method(lambda points: parallel_divide_conquer(points, workers=workers), points)
+        array_time = time_method(lambda points: parallel_divide_conquer(points, workers=workers), array)
+        print(f'{workers:>8}{list_time:>11.4f}s{serial_time / list_time:>10.2f}{array_time:>11.4f}s{serial_time / array_time:>10.2f}')
+
+def benchmark_sliding_window(max_window):
+    '''
+        Prints the time per window taken to compute the hulls of N_WINDOWS consecutive windows of uniformly random points
+        by updating a Dynamic_Hull and by running graham_scan on each window, for each power of 10 up to max_window
+    '''
+
+    print(f'{"window":>10}{"dynamic":>14}{"graham_scan":>14}')
+    window = 100
+    while window <= max_window:
+        seed(window)
+        points = [(random(), random()) for _ in range(window + N_WINDOWS - 1)]
+
+        start = perf_counter()
+        for _ in sliding_window_hulls(points, window):
+            pass
+        dynamic_time = (perf_counter() - start) / N_WINDOWS
+
+        start = perf_counter()
+        for i in range(N_WINDOWS):
+            graham_scan(points[i : i + window])
+        graham_time = (perf_counter() - start) / N_WINDOWS
+
+        print(f'{window:>10}{1000 * dynamic_time:>12.3f}ms{1000 * graham_time:>12.3f}ms')
+        window *= 10
+
+def benchmark_predicates(n_triples):
+    '''
+        Prints the time per call of util.get_side on n_triples triples of points from several distributions, and the
+        fraction of calls decided by the floating point filter without falling back to util.exact_get_side
+    '''
+
+    seed(n_triples)
+    distributions = {
+        'integer': [tuple((randint(-RADIUS, RADIUS), randint(-RADIUS, RADIUS)) for _ in range(3)) for _ in range(n_triples)],
+        'uniform float': [tuple((random(), random()) for _ in range(3)) for _ in range(n_triples)],
+        'near collinear': [collinear_triple() for _ in range(n_triples)],
+    }
+
+    # count the fallbacks by wrapping the exact predicate, which get_side looks up at call time
+    exact_get_side = util.exact_get_side
+    fallbacks = [0]
+    def counting_exact_get_side(point1, point2, point3):
+        fallbacks[0] += 1
+        return exact_get_side(point1, point2, point3)
+
+    print(f'{"distribution":>16}{"time per call":>16}{"filter hit rate":>18}')
+    util.exact_get_side = counting_exact_get_side
+    try:
+        for name, triples in distributions.items():
+            fallbacks[0] = 0
+            start = perf_counter()
+            for point1, point2, point3 in triples:
+                util.get_side(point1, point2, point3)
+            time = (perf_counter() - start) / n_triples
+            print(f'{name:>16}{1e9 * time:>14.0f}ns{100 * (1 - fallbacks[0] / n_triples):>17.2f}%')
+    finally:
+        util.exact_get_side = exact_get_side
+
+def benchmark_nearest_site(max_sites):
+    '''
+        Prints the queries per second answered by a Nearest_Site_Index and by brute force distance scans, on N_QUERIES
+        uniformly random queries among uniformly random sites, for each power of 10 up to max_sites
+        Also prints the time taken to build the index, including the Delaunay triangulation
+    '''
+
+    print(f'{"sites":>10}{"build":>12}{"walk":>16}{"brute force":>16}')
+    n_sites = 1000
+    while n_sites <= max_sites:
+        seed(n_sites)
+        np.random.seed(n_sites)
+        points = [(random(), random()) for _ in range(n_sites)]
+        queries = np.random.random_sample((N_QUERIES, 2))
+
+        start = perf_counter()
+        index = Nearest_Site_Index(delaunay_triangulation(points, point_location='walk'), seed=n_sites)
+        build_time = perf_counter() - start
+
+        start = perf_counter()
+        nearest = index.nearest_many(queries)
+        walk_time = perf_counter() - start
+
+        # scan a block of queries at a time against all of the sites
+        start = perf_counter()
+        brute_nearest = np.empty(N_QUERIES, dtype=np.intp)
+        block = max(1, 2**22 // n_sites)
+        for i in range(0, N_QUERIES, block):
+            differences = queries[i : i + block, np.newaxis, :] - index.sites[np.newaxis, :, :]
+            brute_nearest[i : i + block] = np.argmin(np.sum(differences * differences, axis=2), axis=1)
+        brute_time = perf_counter() - start
+
+        # ties may be broken differently, but the distances have to match
+        assert np.allclose(np.linalg.norm(index.sites[nearest] - queries, axis=1), np.linalg.norm(index.sites[brute_nearest] - queries, axis=1))
+        print(f'{n_sites:>10}{build_time:>11.3f}s{N_QUERIES / walk_time:>14.0f}/s{N_QUERIES / brute_time:>14.0f}/s')
+        n_sites *= 10
+
+def benchmark_approximate(n_points):
+    '''
+        Prints the time taken by approximate_hull to stream n_points uniformly random points in a disk in chunks of
+        CHUNK_SIZE, the size of its hull and its error bound (relative to the diameter), for each of EPSILONS
+        The exact hull is computed with monotone_chain for comparison, with all of the points in memory at once
+    '''
+
+    np.random.seed(n_points)
+    radii, angles = np.sqrt(np.random.random_sample(n_points)), 2 * pi * np.random.random_sample(n_points)
+    points = RADIUS * np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1)
+    chunks = [points[i : i + CHUNK_SIZE] for i in range(0, n_points, CHUNK_SIZE)]
+
+    start = perf_counter()
+    exact_size = len(monotone_chain(points))
+    print(f'exact: {perf_counter() - start:.4f}s, {exact_size} points')
+
+    print(f'{"epsilon":>10}{"time":>12}{"points":>10}{"error bound":>14}')
+    for epsilon in EPSILONS:
+        start = perf_counter()
+        convex_hull, error_bound = approximate_hull(chunks, epsilon)
+        time = perf_counter() - start
+        print(f'{epsilon:>10}{time:>11.4f}s{len(convex_hull) - 1:>10}{error_bound / (2 * RADIUS):>14.2e}')
+
+def benchmark_suite(max_points, report_path):
+    '''
+        Runs each method of suite_methods headless on each of DISTRIBUTIONS at each of SUITE_SIZES up to max_points,
+        prints the results as they finish, and writes them all to report_path as JSON
+        Each run is timed on its own (the best of several, if it is fast), then run again to get its peak memory (from
+        tracemalloc) and predicate calls
+    '''
+
+    results = []
+    print(f'{"method":>24}{"distribution":>14}{"n":>10}{"time":>12}{"peak memory":>14}{"predicates":>14}')
+    methods = suite_methods()
+    for distribution in DISTRIBUTIONS + ['none']:
+        last_times = {}
+        for n_points in SUITE_SIZES:
+            if n_points > max_points:
+                break
+
+            # only generate the points if some method still needs them
+            pending = [
+                name for name, (method_distributions, _) in methods.items()
+                if distribution in method_distributions and last_times.get(name, 0) * n_points / (n_points // 10) <= SUITE_TIME_LIMIT
+            ]
+            if len(pending) == 0:
+                break
+            points = generate_points(distribution, n_points) if distribution != 'none' else n_points
+
+            for name in pending:
+                method = methods[name][1]
+                times = [time_method(method, points)]
+                while len(times) < SUITE_REPEATS and sum(times) < SUITE_MIN_TIME:
+                    times.append(time_method(method, points))
+                time = min(times)
+                last_times[name] = time
+
+                predicate_counts = {}
+                tracemalloc.start()
+                with Predicate_Counter(predicate_counts):
+                    method(points)
+                _, peak_memory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                results.append({
+                    'method': name, 'distribution': distribution, 'n': n_points, 'time': time,
+                    'peak_memory': peak_memory, 'predicates': predicate_counts,
+                })
+                print(f'{name:>24}{distribution:>14}{n_points:>10}{time:>11.4f}s{peak_memory / 2**20:>12.1f}MB{sum(predicate_counts.values()):>14}')
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(report_path, 'w') as file:
+        json.dump(report, file, indent=1)
+
+def suite_methods():
+    '''
+        Returns the methods run by benchmark_suite by name, each with the distributions it runs on
+        The chaos game generates its own points, so it takes the number of points and runs on the 'none' distribution
+    '''
+
+    def consume_chaos_game(n_points):
+        for _ in chaos_game([(0, 0), (RADIUS, 0), (RADIUS / 2, RADIUS)], n_points, seed=n_points):
+            pass
+
+    return {
+        'graham_scan': (DISTRIBUTIONS, graham_scan),
+        'gift_wrap': (DISTRIBUTIONS, gift_wrap),
+        'divide_conquer': (DISTRIBUTIONS, divide_conquer),
+        'quickhull': (DISTRIBUTIONS, quickhull_hull),
+        'delaunay_triangulation': (DISTRIBUTIONS, lambda points: delaunay_triangulation(points, point_location='walk')),
+        'chaos_game': (['none'], consume_chaos_game),
+    }
+
+def generate_points(distribution, n_points):
+    '''
+        Returns a list of n_points float points from distribution, seeded by n_points:
+            * uniform: uniform in a square
+            * disk: uniform in a disk
+            * circle: on a circle, so every point is on the convex hull (the worst case for gift_wrap)
+            * clustered: Gaussian clusters around N_CLUSTERS uniform centers
+            * degenerate: integer points on a few lines, with each point repeated about 4 times
+    '''
+
+    rng = np.random.default_rng(n_points)
+    if distribution == 'uniform':
+        points = rng.uniform(-RADIUS, RADIUS, (n_points, 2))
+    elif distribution == 'disk':
+        radii, angles = RADIUS * np.sqrt(rng.random(n_points)), 2*pi*rng.random(n_points)
+        points = np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1)
+    elif distribution == 'circle':
+        angles = 2*pi*rng.random(n_points)
+        points = np.stack([RADIUS * np.cos(angles), RADIUS * np.sin(angles)], axis=1)
+    elif distribution == 'clustered':
+        centers = rng.uniform(-RADIUS, RADIUS, (N_CLUSTERS, 2))
+        points = centers[rng.integers(N_CLUSTERS, size=n_points)] + rng.normal(0, RADIUS / 20, (n_points, 2))
+    elif distribution == 'degenerate':
+        # points on the x axis, the y axis and the diagonal, with about n_points / 12 distinct positions on each
+        positions = rng.integers(-(n_points // 24) - 1, n_points // 24 + 1, size=n_points)
+        lines = rng.integers(3, size=n_points)
+        points = np.stack([np.where(lines == 1, 0, positions), np.where(lines == 0, 0, positions)], axis=1).astype(float)
+    else:
+        raise ValueError(f'unknown distribution: {distribution}')
+
+    return list(map(tuple, points.tolist()))
+
+def compare_reports(old_path, new_path):
+    '''
+        Prints the ratio of the new to the old time, peak memory and predicate calls of each run in both reports
+        Returns whether any run's time grew by more than REGRESSION_THRESHOLD times
+    '''
+
+    with open(old_path) as file:
+        old_results = {(result['method'], result['distribution'], result['n']): result for result in json.load(file)['results']}
+    with open(new_path) as file:
+        new_results = json.load(file)['results']
+
+    regressed = False
+    print(f'{"method":>24}{"distribution":>14}{"n":>10}{"time":>10}{"memory":>10}{"predicates":>12}')
+    for new in new_results:
+        key = (new['method'], new['distribution'], new['n'])
+        if key not in old_results:
+            continue
+        old = old_results[key]
+
+        ratios = [
+            new['time'] / max(old['time'], 1e-9),
+            new['peak_memory'] / max(old['peak_memory'], 1),
+            sum(new['predicates'].values()) / max(sum(old['predicates'].values()), 1),
+        ]
+        flag = ''
+        if ratios[0] > REGRESSION_THRESHOLD:
+            regressed = True
+            flag = '  <- slower'
+        print(f'{key[0]:>24}{key[1]:>14}{key[2]:>10}' + ''.join(f'{ratio:>9.2f}x' for ratio in ratios[ : 2]) + f'{ratios[2]:>11.2f}x{flag}')
+
+    return regressed
+
+def collinear_triple():
+    '''
+        Returns three float points which are collinear up to rounding
+    '''
+
+    point1, point2, t = (random(), random()), (RADIUS * random(), RADIUS * random()), random()
+    return point1, point2, (point1[0] + t*(point2[0] - point1[0]), point1[1] + t*(point2[1] - point1[1]))
+
+def points_with_hull_size(n_points, k):
+    '''
+        Returns n_points points whose convex hull is a regular k-gon; the other points are uniformly placed inside of it
+    '''
+
+    seed(k)
+    points = [(RADIUS * cos(2*pi*i / k), RADIUS * sin(2*pi*i / k)) for i in range(k)]
+
+    # stay inside the circle inscribed in the k-gon
+    inner_radius = 0.99 * RADIUS * cos(pi / k)
+    while len(points) < n_points:
+        x, y = (2*random() - 1) * inner_radius, (2*random() - 1) * inner_radius
+        if x*x + y*y < inner_radius*inner_radius:
+            points.append((x, y))
+
+    return points
+
+def time_method(method, points):
+    '''
+        Returns the number of seconds method takes to compute the convex hull of points
+    '''
+
+    start = perf_counter()
+    method(points)
+    return perf_counter() - start
+
+if __name__ == '__main__':
+    main(sys.argv)
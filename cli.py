@@ -0,0 +1,188 @@
+'''
+    File: cli.py
+    Author: Drew Scott
+    Description: Runs the convex hull and Delaunay triangulation methods on points read from a file, without drawing
+        anything unless asked to, so they can be used in batch jobs and shell pipelines
+    Usage: python3 cli.py <command> <input path> [output path] [--method=<method>] [--dtype=<dtype>] [--chunk_size=<n>] [--render=<mode>] [--fps=<fps>] [--skip] [--budget=<seconds>]
+        * command can be: hull, triangulate
+        * the points are read with util.load_points: .npy files, .csv/.txt files, or anything else as raw little endian
+          pairs of dtype (float64 by default); an input path of - reads raw pairs from standard input
+        * hull writes the int64 indices into the input of the points of the convex hull in CCW order (not closed), and
+          method can be any method of convex_hull.hull (monotone_chain by default)
+        * with --chunk_size, hull reads the input chunk_size points at a time with convex_hull.out_of_core_hull, for
+          inputs larger than memory; method can then be monotone_chain or quickhull
+        * triangulate writes an (f, 3) int64 array of the indices into the input of the points of each triangle in CCW
+          order, and method can be any method of delaunay_triangulation.triangulate (incremental by default)
+        * the output is written with util.save_array in the same formats as the input; an output path of - writes it
+          raw to standard output, and without an output path only its size is printed
+        * mode can be: none (the default), turtle, raster; turtle is only imported in turtle mode, which animates the
+          method, and raster mode writes the points and the result to RASTER_PATH
+        * --fps, --skip and --budget are the same as for convex_hull.py, in turtle mode
+'''
+
+import sys
+
+import numpy as np
+
+from convex_hull import hull, monotone_chain, quickhull, out_of_core_hull, HULL_METHODS, Turtle_Hull_Observer
+from delaunay_triangulation import delaunay_triangulation, triangulate, Turtle_Delaunay_Observer
+from render import parse_frame_flags, Frame_Renderer, Density_Raster
+from util import load_points, save_array, draw_connect_points, PointSet, Array_DCEL, DOT_RADIUS
+
+RENDER_MODES = ['none', 'turtle', 'raster']
+RASTER_PATH = 'cli.png'
+
+# the drawing is this fraction of the points' extent bigger than their bounding box on each side
+RENDER_MARGIN = 0.05
+
+def main(args):
+    args, frame_options = parse_frame_flags(args)
+    method, dtype, chunk_size, render_mode = None, np.float64, None, 'none'
+    other_args = []
+    for arg in args:
+        if arg.startswith('--method='):
+            method = arg[len('--method=') : ]
+        elif arg.startswith('--dtype='):
+            dtype = np.dtype(arg[len('--dtype=') : ])
+        elif arg.startswith('--chunk_size='):
+            chunk_size = int(arg[len('--chunk_size=') : ])
+        elif arg.startswith('--render='):
+            render_mode = arg[len('--render=') : ]
+        else:
+            other_args.append(arg)
+    args = other_args
+
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f'unknown render mode: {render_mode}')
+
+    if args[1] == 'hull' and chunk_size is not None:
+        # the points are never all in memory, so they can't be rendered
+        if render_mode != 'none':
+            raise ValueError('out of core hulls can\'t be rendered')
+        result = out_of_core_hull(load_points(args[2], dtype), chunk_size, method or 'monotone_chain')
+        if len(args) > 3:
+            save_array(args[3], result)
+        else:
+            print(f'{len(result)} hull points')
+        return
+
+    points = PointSet(load_points(args[2], dtype))
+    screen = open_screen(points, frame_options) if render_mode == 'turtle' else None
+
+    if args[1] == 'hull':
+        observer = Turtle_Hull_Observer(screen) if screen is not None else None
+        result = hull_indices(points, method or 'monotone_chain', observer)
+        description = f'{len(result)} hull points'
+        paths = [points.coordinates[np.append(result, result[ : 1])]]
+    elif args[1] == 'triangulate':
+        observer = Turtle_Delaunay_Observer(screen) if screen is not None else None
+        result = triangle_indices(points, method or 'incremental', observer)
+        description = f'{len(result)} triangles'
+        paths = points.coordinates[result[:, [0, 1, 2, 0]]]
+    else:
+        raise ValueError(f'unknown command: {args[1]}')
+
+    if len(args) > 3:
+        save_array(args[3], result)
+    else:
+        print(description)
+
+    if render_mode == 'turtle':
+        from turtle import Turtle
+
+        result_turtle = Turtle(visible=False)
+        result_turtle.speed(0)
+        for path in paths:
+            if len(path) > 0:
+                draw_connect_points([tuple(point) for point in path.tolist()], screen, result_turtle)
+        screen.exitonclick()
+    elif render_mode == 'raster':
+        raster = Density_Raster(render_bounds(points))
+        raster.add_points(points.coordinates)
+        for path in paths:
+            raster.add_path(path)
+        raster.save(RASTER_PATH)
+
+def hull_indices(points, method='monotone_chain', observer=None):
+    '''
+        Returns the int64 indices into the PointSet points of the points of its convex hull in CCW order (not closed)
+        monotone_chain and quickhull give indices themselves; the points returned by the other methods are looked up
+    '''
+
+    if method not in HULL_METHODS:
+        raise ValueError(f'unknown convex hull method: {method}')
+
+    if method in ('monotone_chain', 'quickhull'):
+        indices = monotone_chain(points.coordinates) if method == 'monotone_chain' else quickhull(points.coordinates, observer)
+        if observer is not None and len(indices) > 0:
+            observer.on_hull([points[i] for i in indices] + [points[indices[0]]])
+    else:
+        convex_hull = hull(points, method, observer)
+        if len(convex_hull) > 1 and convex_hull[-1] == convex_hull[0]:
+            convex_hull.pop()
+        indices = point_indices(points, convex_hull)
+
+    return np.asarray(indices, dtype=np.int64)
+
+def triangle_indices(points, method='incremental', observer=None):
+    '''
+        Returns an (f, 3) int64 array of the indices into the PointSet points of the points of each triangle of its
+        Delaunay triangulation, in CCW order
+        The triangulation is built in an Array_DCEL, and the incremental method locates points by walking, since the
+        DAG's history isn't needed
+    '''
+
+    dcel = Array_DCEL()
+    if method == 'incremental':
+        delaunay_triangulation(points, observer, dcel, point_location='walk')
+    else:
+        triangulate(points, method, observer, dcel)
+
+    # each vertex of the DCEL is one of the distinct points
+    vertex_indices = np.asarray(point_indices(points, [vertex.coordinate for vertex in dcel.vertices]), dtype=np.int64)
+    edges = dcel.face_edge[np.array([face.index for face in dcel.faces], dtype=np.intp)]
+    corners = np.stack([edges, dcel.next[edges], dcel.prev[edges]], axis=1)
+    return vertex_indices[dcel.origin[corners]].reshape(-1, 3)
+
+def point_indices(points, coordinates):
+    '''
+        Returns the list of the index into the PointSet points of the first copy of each of coordinates
+    '''
+
+    n_points = len(points)
+    first_indices = dict(zip(reversed(points.points()), range(n_points - 1, -1, -1)))
+    return [first_indices[tuple(coordinate)] for coordinate in coordinates]
+
+def render_bounds(points):
+    '''
+        Returns the (min x, min y, max x, max y) of the area drawn around the PointSet points
+    '''
+
+    # no points have no bounding box, so the area is just the margin around the origin
+    min_x, min_y, max_x, max_y = points.bounding_box() if len(points) > 0 else (0, 0, 0, 0)
+    margin = RENDER_MARGIN * max(max_x - min_x, max_y - min_y, 1)
+    return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+def open_screen(points, frame_options):
+    '''
+        Returns a Frame_Renderer of a turtle screen whose coordinates fit the PointSet points, with the points drawn
+    '''
+
+    from turtle import Turtle, Screen
+
+    screen = Frame_Renderer(Screen(), **frame_options)
+    screen.tracer(0, 0)
+    screen.setworldcoordinates(*render_bounds(points))
+
+    points_turtle = Turtle(visible=False)
+    points_turtle.speed(0)
+    points_turtle.penup()
+    for point in points:
+        points_turtle.setposition(point)
+        points_turtle.dot(DOT_RADIUS, 'black')
+    screen.update()
+
+    return screen
+
+if __name__ == '__main__':
+    main(sys.argv)
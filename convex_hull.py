@@ -2,25 +2,55 @@
     File: convex_hull.py
     Author: Drew Scott
     Description: Displays various methods of computing the convex hull of a set of points
-    Usage: python3 convex_hull.py <method>
-        * method can be: graham_scan, gift_wrap, divide_conquer
+    Usage: python3 convex_hull.py <method> [--render=<mode>] [--fps=<fps>] [--skip] [--budget=<seconds>]
+        * method can be: graham_scan, gift_wrap, divide_conquer, chan, quickhull
+        * mode can be: turtle (the default), raster
+        * --fps limits how often the screen is redrawn, --skip only draws the hull, and --budget skips to the hull once
+          the animation has taken that many seconds
+        * raster mode computes the hull of RASTER_N_POINTS points without drawing the steps, and writes it to RASTER_PATH
 '''
 
-from random import randint, choice
-from turtle import Turtle, Screen
-from time import sleep
+from bisect import bisect_left
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+from random import randint, random
+import os
 import sys
 
-from util import get_side, prev_ccw, next_ccw, draw_connect_points, DOT_RADIUS, BORDER_PADDING
+import numpy as np
+
+from render import parse_render_flag, parse_frame_flags, write_image, Frame_Renderer, Density_Raster, RASTER_WIDTH, RASTER_HEIGHT, PATH_COLOR
+from util import get_side, get_sides, crossing_side, exact_integer_array, prev_ccw, next_ccw, draw_connect_points, release_rows, PointSet, sorted_unique_points, unique_points, DOT_RADIUS, BORDER_PADDING
 
 N_POINTS = 100
 TIME_STEP_DELAY = 0.1
 BOTTOM_TEXT_HEIGHT = 80
 FONT_SIZE = 15
+RASTER_N_POINTS = 1000000
+RASTER_PATH = 'convex_hull.png'
+APPROXIMATE_EPSILON = 0.001
+OUT_OF_CORE_CHUNK_SIZE = 10**6
+CHAN_MIN_GROUP_SIZE = 4096
+# quickhull splits with at most this many candidates are finished by quickhull_chain in plain Python
+QUICKHULL_SCALAR_SIZE = 64
+# parallel_divide_conquer runs serially on fewer points than this, where starting the worker processes costs more
+# than they save
+PARALLEL_MIN_POINTS = 10**5
 
 def main(args):
+    args, render_mode = parse_render_flag(args)
+    if render_mode == 'raster':
+        main_raster(args)
+        return
+    args, frame_options = parse_frame_flags(args)
+
+    # turtle is only needed for the visualization, so it is imported here rather than at module load
+    from turtle import Turtle, Screen
+
     # set up the screen
-    screen = Screen()
+    screen = Frame_Renderer(Screen(), **frame_options)
     width, height = screen.window_width(), screen.window_height()
     screen.tracer(0, 0)
 
@@ -38,6 +68,7 @@ def main(args):
     screen.update()
 
     # compute and draw the convex hull
+    observer = Turtle_Hull_Observer(screen)
     ch_turtle = Turtle(visible=False)
     ch_turtle.speed(0)
     text_turtle = Turtle(visible=False)
@@ -47,178 +78,547 @@ def main(args):
         text_turtle.setposition((((-width//2) + BORDER_PADDING), ((-height//2) + BOTTOM_TEXT_HEIGHT - 4*FONT_SIZE)))
         text_turtle.write("Graham Scan: O(n)\nPre-condition: points are sorted by x-value; O(nlogn) preprocessing\nExplanation: Computes the upper and lower hulls then splices them together. Starts with the leftmost\n\tpoint; successive points on the top/bottom must be to the right/left of the previous segment.",
             font=("Arial", FONT_SIZE, "normal"))
-        convex_hull = graham_scan(points, screen, True)
+        convex_hull = graham_scan(points, observer)
         draw_connect_points(convex_hull, screen, ch_turtle)
     elif args[1] == 'gift_wrap':
         text_turtle.setposition((((-width//2) + BORDER_PADDING), ((-height//2) + BOTTOM_TEXT_HEIGHT - 3*FONT_SIZE)))
         text_turtle.write("Gift Wrapping: O(n*k), where k is the number of vertices on the hull\nExplanation: Starts with the lowest point; adds points for which all other points are to the left of the\n\tsegment created by it and the previous added point.",
             font=("Arial", FONT_SIZE, "normal"))
-        convex_hull = gift_wrap(points, screen, True)
+        convex_hull = gift_wrap(points, observer)
         draw_connect_points(convex_hull, screen, ch_turtle)
     elif args[1] == 'divide_conquer':
         text_turtle.setposition((((-width//2) + BORDER_PADDING), ((-height//2) + BOTTOM_TEXT_HEIGHT - 4*FONT_SIZE)))
         text_turtle.write("Divide and Conquer: O(nlogn)\nExplanation: Recursively computes the convex hull of the left and right points, then merges them\n\ttogether. The merging process finds the upper and lower common tangents between the\n\tleft and right hulls.",
             font=("Arial", FONT_SIZE, "normal"))
-        convex_hull = divide_conquer(points, screen, True)
+        convex_hull = divide_conquer(points, observer)
         draw_connect_points(convex_hull, screen, ch_turtle)
+    elif args[1] == 'chan':
+        text_turtle.setposition((((-width//2) + BORDER_PADDING), ((-height//2) + BOTTOM_TEXT_HEIGHT - 4*FONT_SIZE)))
+        text_turtle.write("Chan's Algorithm: O(nlogk), where k is the number of vertices on the hull\nExplanation: Splits the points into groups of m and computes their hulls with Monotone Chain, then gift\n\twraps the group hulls using binary searched tangents. If the hull has more than m points,\n\tm is squared and the process restarts.",
+            font=("Arial", FONT_SIZE, "normal"))
+        convex_hull = chan(points, observer)
+        draw_connect_points(convex_hull, screen, ch_turtle)
+    elif args[1] == 'quickhull':
+        text_turtle.setposition((((-width//2) + BORDER_PADDING), ((-height//2) + BOTTOM_TEXT_HEIGHT - 4*FONT_SIZE)))
+        text_turtle.write("QuickHull: O(nlogn) expected, O(n^2) worst case\nExplanation: Splits the points by the line between the leftmost and rightmost points. Recursively\n\tadds the point farthest from each hull edge, dropping the points inside the triangle it makes\n\twith the edge.",
+            font=("Arial", FONT_SIZE, "normal"))
+        convex_hull = quickhull_hull(points, observer)
+        draw_connect_points(convex_hull, screen, ch_turtle)
+    else:
+        raise ValueError(f'unknown convex hull method: {args[1]}')
 
     screen.exitonclick()
 
-def divide_conquer(points, screen, show_states):
+def main_raster(args):
+    '''
+        Renders the density of RASTER_N_POINTS random points and their convex hull to RASTER_PATH
+    '''
+
+    bounds = (-RASTER_WIDTH//2, -RASTER_HEIGHT//2, RASTER_WIDTH//2, RASTER_HEIGHT//2)
+    points = np.random.randint(
+        (bounds[0] + BORDER_PADDING, bounds[1] + BORDER_PADDING), (bounds[2] - BORDER_PADDING, bounds[3] - BORDER_PADDING),
+        size=(RASTER_N_POINTS, 2)
+    )
+    convex_hull = hull(PointSet(points), args[1])
+
+    raster = Density_Raster(bounds)
+    raster.add_points(points)
+    raster.add_path(convex_hull)
+    raster.save(RASTER_PATH)
+
+def hull(points, method='graham_scan', observer=None):
+    '''
+        Returns the list of points in CCW order of the convex hull of the set of points
+        The first and last points in the list are the same, and the hull of no points is an empty list
+        method can be: graham_scan, gift_wrap, divide_conquer, monotone_chain, chan, parallel_divide_conquer, quickhull
+        points can be a list of points or a PointSet, whose sorted order is kept for the next method run on it
+        Nothing is drawn (and turtle is never imported) unless observer does so itself
+    '''
+
+    if method not in HULL_METHODS:
+        raise ValueError(f'unknown convex hull method: {method}')
+
+    return HULL_METHODS[method](points, observer)
+
+class Hull_Observer():
+    '''
+        Receives the intermediate states of the convex hull algorithms
+        Every callback does nothing by default; subclasses override the ones they care about
+    '''
+
+    def on_pop(self, chain, stack):
+        '''
+            Called by graham_scan right before the top of the upper/lower chain stack is popped
+        '''
+
+        pass
+
+    def on_chain(self, chain, stack):
+        '''
+            Called by graham_scan once the upper/lower chain is complete
+        '''
+
+        pass
+
+    def on_candidate(self, convex_hull, candidate):
+        '''
+            Called by gift_wrap whenever the guess for the next hull point changes
+        '''
+
+        pass
+
+    def on_scan(self, convex_hull, point):
+        '''
+            Called by gift_wrap for every point compared against the current guess
+        '''
+
+        pass
+
+    def on_mini_hull(self, convex_hull):
+        '''
+            Called by chan with the hull of each group of points
+        '''
+
+        pass
+
+    def on_base(self, convex_hull):
+        '''
+            Called by divide_conquer_util with the hull of each base case
+        '''
+
+        pass
+
+    def on_tangent(self, side, left_point, right_point):
+        '''
+            Called by divide_conquer_util with the upper/lower common tangent each walk starts from, then again after each
+            step of the walk
+        '''
+
+        pass
+
+    def on_merge(self, convex_hull):
+        '''
+            Called by divide_conquer_util with the hull merged from the two most recent hulls
+        '''
+
+        pass
+
+    def on_split(self, start, end, farthest):
+        '''
+            Called by quickhull with each hull edge start-end and the point farthest outside of it, which it is split at
+        '''
+
+        pass
+
+    def on_hull(self, convex_hull):
+        '''
+            Called by every method with its final convex hull
+        '''
+
+        pass
+
+class Turtle_Hull_Observer(Hull_Observer):
+    '''
+        Draws the intermediate states of the convex hull algorithms using turtle
+    '''
+
+    def __init__(self, screen):
+        from turtle import Turtle
+
+        self.screen = screen if isinstance(screen, Frame_Renderer) else Frame_Renderer(screen)
+        self.Turtle = Turtle
+
+        self.chain_turtles = {'upper': self.new_turtle(), 'lower': self.new_turtle()}
+        self.tangent_turtles = {'upper': self.new_turtle('red'), 'lower': self.new_turtle('red')}
+        self.split_turtle = self.new_turtle('red')
+        self.scan_turtle = self.new_turtle()
+        self.candidate_turtle = self.new_turtle('red')
+        self.mini_hull_turtle = self.new_turtle('gray')
+
+        # each hull of divide_conquer_util waiting to be merged has its own turtle
+        self.merge_turtles = []
+        self.free_turtles = []
+
+    def new_turtle(self, color='black'):
+        turtle = self.Turtle(visible=False)
+        turtle.speed(0)
+        turtle.pencolor(color)
+        return turtle
+
+    def draw_segment(self, turtle, start, end):
+        turtle.clear()
+        turtle.penup()
+        turtle.setposition(start)
+        turtle.pendown()
+        turtle.goto(end)
+        self.screen.update()
+
+    def push_merge_hull(self, convex_hull):
+        turtle = self.free_turtles.pop() if len(self.free_turtles) > 0 else self.new_turtle()
+        draw_connect_points(convex_hull + [convex_hull[0]], self.screen, turtle)
+        self.merge_turtles.append(turtle)
+
+    def on_pop(self, chain, stack):
+        turtle = self.chain_turtles[chain]
+        draw_connect_points(stack, self.screen, turtle)
+        self.screen.pause(TIME_STEP_DELAY)
+        turtle.clear()
+
+    def on_chain(self, chain, stack):
+        draw_connect_points(stack, self.screen, self.chain_turtles[chain])
+
+    def on_candidate(self, convex_hull, candidate):
+        self.draw_segment(self.candidate_turtle, convex_hull[-1], candidate)
+
+    def on_scan(self, convex_hull, point):
+        self.scan_turtle.clear()
+        draw_connect_points(convex_hull + [point], self.screen, self.scan_turtle)
+        self.screen.pause(TIME_STEP_DELAY)
+
+    def on_mini_hull(self, convex_hull):
+        draw_connect_points(convex_hull + [convex_hull[0]], self.screen, self.mini_hull_turtle)
+
+    def on_base(self, convex_hull):
+        self.push_merge_hull(convex_hull)
+
+    def on_tangent(self, side, left_point, right_point):
+        self.draw_segment(self.tangent_turtles[side], left_point, right_point)
+        self.screen.pause(TIME_STEP_DELAY)
+
+    def on_split(self, start, end, farthest):
+        self.split_turtle.clear()
+        draw_connect_points([start, farthest, end], self.screen, self.split_turtle)
+        self.screen.pause(TIME_STEP_DELAY)
+
+    def on_merge(self, convex_hull):
+        for turtle in self.tangent_turtles.values():
+            turtle.clear()
+        for _ in range(2):
+            turtle = self.merge_turtles.pop()
+            turtle.clear()
+            self.free_turtles.append(turtle)
+
+        self.push_merge_hull(convex_hull)
+
+    def on_hull(self, convex_hull):
+        for turtle in [*self.chain_turtles.values(), *self.tangent_turtles.values(), self.split_turtle, self.scan_turtle, self.candidate_turtle, self.mini_hull_turtle, *self.merge_turtles]:
+            turtle.clear()
+        self.free_turtles.extend(self.merge_turtles)
+        self.merge_turtles = []
+        self.screen.update()
+
+class Raster_Hull_Observer(Hull_Observer):
+    '''
+        Draws the intermediate states of the convex hull algorithms over the density image of a Density_Raster
+        Each state is written to frame_path.format(<frame number>) if frame_path is given; the last one is in self.image
+    '''
+
+    def __init__(self, raster, frame_path=None):
+        self.raster = raster
+        self.frame_path = frame_path
+        self.n_frames = 0
+        self.background = raster.image().reshape(-1, 3)
+        self.image = self.background.reshape(raster.height, raster.width, 3)
+
+        # the paths currently drawn, by what they show, and the hulls of divide_conquer_util waiting to be merged
+        self.paths = {}
+        self.merge_hulls = []
+
+    def frame(self):
+        image = self.background.copy()
+        for path in [*self.paths.values(), *self.merge_hulls]:
+            image[self.raster.path_pixels(path)] = PATH_COLOR
+        self.image = image.reshape(self.raster.height, self.raster.width, 3)
+
+        if self.frame_path is not None:
+            write_image(self.frame_path.format(self.n_frames), self.image)
+        self.n_frames += 1
+
+    def on_pop(self, chain, stack):
+        self.paths[chain] = list(stack)
+        self.frame()
+
+    def on_chain(self, chain, stack):
+        self.paths[chain] = list(stack)
+        self.frame()
+
+    def on_candidate(self, convex_hull, candidate):
+        self.paths['candidate'] = [convex_hull[-1], candidate]
+        self.frame()
+
+    def on_scan(self, convex_hull, point):
+        self.paths['scan'] = convex_hull + [point]
+        self.frame()
+
+    def on_mini_hull(self, convex_hull):
+        self.merge_hulls.append(convex_hull + [convex_hull[0]])
+        self.frame()
+
+    def on_base(self, convex_hull):
+        self.merge_hulls.append(convex_hull + [convex_hull[0]])
+        self.frame()
+
+    def on_tangent(self, side, left_point, right_point):
+        self.paths[side + '_tangent'] = [left_point, right_point]
+        self.frame()
+
+    def on_split(self, start, end, farthest):
+        self.paths['split'] = [start, farthest, end]
+        self.frame()
+
+    def on_merge(self, convex_hull):
+        self.paths.pop('upper_tangent', None)
+        self.paths.pop('lower_tangent', None)
+        del self.merge_hulls[-2 : ]
+        self.merge_hulls.append(convex_hull + [convex_hull[0]])
+        self.frame()
+
+    def on_hull(self, convex_hull):
+        self.paths = {'hull': list(convex_hull)}
+        self.merge_hulls = []
+        self.frame()
+
+def divide_conquer(points, observer=None):
     '''
         Returns the list of points in CCW order of the convex hull of the set of points
         The first and last points in the list are the same
-        Draws the steps taken in the processing
+        Reports the steps taken in the processing to observer, if given
         Uses the Divide and Conquer approach: O(nlogn), where n is number of points
         Utilized divide_conquer_util
     '''
 
-    points = sorted(points)
-    convex_hull, _ = divide_conquer_util(points, 0, len(points), screen, show_states)
+    if len(points) == 0:
+        return []
+
+    # duplicate points would make the base cases degenerate
+    points = sorted_unique_points(points)
+    convex_hull, _, _ = divide_conquer_util(points, 0, len(points), observer)
     convex_hull.append(convex_hull[0])
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
     return convex_hull
 
-def divide_conquer_util(points, l, r, screen, show_states):
+def divide_conquer_util(points, l, r, observer):
     '''
         Computes the convex hull of the points between the lth (inclusive) and rth (exlusive) index in points using a recursive approach
-        Returns the points of the computed in CCW order, and the turtle used to draw the merged hull
+        The points must be sorted and distinct; collinear points are left off of the hull
+        Returns the points of the computed hull in CCW order, and the indices of its leftmost and rightmost points
     '''
 
     if r - l <= 3:
-        # base case: we have 2 or 3 points, so return them in CCW order
-        if r - l == 2:
+        # base case: we have 1, 2 or 3 points, so return them in CCW order
+        # the first point is the leftmost since the points are sorted
+        if r - l <= 2:
             convex_hull = points[l : r]
+            rightmost = len(convex_hull) - 1
         else:
-            if get_side(points[l], points[l+1], points[l+2]) > 0:
+            side = get_side(points[l], points[l+1], points[l+2])
+            if side > 0:
                 # if third point is to the left then its already CCW
                 convex_hull = points[l : r]
-            else:
+                rightmost = 2
+            elif side < 0:
                 convex_hull = [points[l], points[l+2], points[l+1]]
+                rightmost = 1
+            else:
+                # the middle point is on the segment between the other two
+                convex_hull = [points[l], points[l+2]]
+                rightmost = 1
 
-        merge_turtle = Turtle(visible=False)
-        merge_turtle.speed(0)
-        if show_states:
-            draw_connect_points(convex_hull + [convex_hull[0]], screen, merge_turtle)
-        return convex_hull, merge_turtle
+        if observer is not None:
+            observer.on_base(convex_hull)
+        return convex_hull, 0, rightmost
 
     # compute the convex hulls of the left and right halves of the point set recursively
-    left_half, left_turtle = divide_conquer_util(points, l, l + (r-l)//2, screen, show_states)
-    right_half, right_turtle = divide_conquer_util(points, l + (r-l)//2, r, screen, show_states)
+    left_half = divide_conquer_util(points, l, l + (r-l)//2, observer)
+    right_half = divide_conquer_util(points, l + (r-l)//2, r, observer)
 
     # merge the left and right halves by finding the common tangents 
+    return merge_hulls(left_half, right_half, observer)
 
-    # start by finding the upper tangent
-    upper_endpoints = [max(left_half), min(right_half)]
-    upper_indices = [left_half.index(max(left_half)), right_half.index(min(right_half))]
-    
-    # draw each candidate tangent in red
-    upper_turtle = Turtle(visible=False)
-    if show_states:
-        upper_turtle.speed(0)
-        upper_turtle.pencolor('red')
-        upper_turtle.penup()
-        upper_turtle.setposition(upper_endpoints[0])
-        upper_turtle.pendown()
-        upper_turtle.goto(upper_endpoints[1]) 
-        screen.update()
-
-    while (
-            get_side(upper_endpoints[0], upper_endpoints[1], prev_ccw(right_half, upper_indices[1])) > 0 or 
-            get_side(upper_endpoints[1], upper_endpoints[0], next_ccw(left_half, upper_indices[0])) < 0
-    ):
-        if get_side(upper_endpoints[0], upper_endpoints[1], prev_ccw(right_half, upper_indices[1])) > 0:
-            upper_endpoints[1] = prev_ccw(right_half, upper_indices[1]) 
-            upper_indices[1] = right_half.index(upper_endpoints[1])
-        else:
-            upper_endpoints[0] = next_ccw(left_half, upper_indices[0])
-            upper_indices[0] = left_half.index(upper_endpoints[0])
-    
-        if show_states:
-            sleep(TIME_STEP_DELAY)
-            upper_turtle.clear()
-            upper_turtle.penup()
-            upper_turtle.setposition(upper_endpoints[0])
-            upper_turtle.pendown()
-            upper_turtle.goto(upper_endpoints[1]) 
-            screen.update()
-
-    # then find the lower tangent
-    lower_endpoints = [max(left_half), min(right_half)]
-    lower_indices = [left_half.index(max(left_half)), right_half.index(min(right_half))]
-
-    # draw each candidate tangent in red
-    lower_turtle = Turtle(visible=False)
-    if show_states:
-        lower_turtle.speed(0)
-        lower_turtle.pencolor('red')
-        lower_turtle.penup()
-        lower_turtle.setposition(lower_endpoints[0])
-        lower_turtle.pendown()
-        lower_turtle.goto(lower_endpoints[1]) 
-        screen.update()
-
-    while (
-            get_side(lower_endpoints[0], lower_endpoints[1], next_ccw(right_half, lower_indices[1])) < 0 or 
-            get_side(lower_endpoints[1], lower_endpoints[0], prev_ccw(left_half, lower_indices[0])) > 0
-    ):
-        if get_side(lower_endpoints[0], lower_endpoints[1], next_ccw(right_half, lower_indices[1])) < 0:
-            lower_endpoints[1] = next_ccw(right_half, lower_indices[1]) 
-            lower_indices[1] = right_half.index(lower_endpoints[1])
-        else:
-            lower_endpoints[0] = prev_ccw(left_half, lower_indices[0])
-            lower_indices[0] = left_half.index(lower_endpoints[0])
-
-        if show_states:
-            sleep(TIME_STEP_DELAY)
-            lower_turtle.clear()
-            lower_turtle.penup()
-            lower_turtle.setposition(lower_endpoints[0])
-            lower_turtle.pendown()
-            lower_turtle.goto(lower_endpoints[1]) 
-            screen.update()
+def merge_hulls(left_half, right_half, observer=None):
+    '''
+        Merges two convex hulls by finding their upper and lower common tangents: O(h), where h is the number of points on them
+        Each hull is given as a (points in CCW order, leftmost index, rightmost index) tuple, as returned by divide_conquer_util
+        Every point of the left hull must come before every point of the right hull in sorted order
+        Returns the merged hull as the same kind of tuple
+    '''
+
+    left_hull, left_leftmost, left_rightmost = left_half
+    right_hull, right_leftmost, right_rightmost = right_half
+
+    # both tangents start from the rightmost point of the left hull and the leftmost point of the right hull
+    upper_indices = [left_rightmost, right_leftmost]
+    lower_indices = [left_rightmost, right_leftmost]
+
+    # start by finding the upper tangent: walk CW on the right hull and CCW on the left hull while the tangent can be raised
+    if observer is not None:
+        observer.on_tangent('upper', left_hull[upper_indices[0]], right_hull[upper_indices[1]])
+
+    moved = True
+    while moved:
+        moved = False
+        while is_tangent_step(left_hull[upper_indices[0]], right_hull[upper_indices[1]], prev_ccw(right_hull, upper_indices[1]), 1):
+            upper_indices[1] = (upper_indices[1] - 1) % len(right_hull)
+            moved = True
+
+            # report each step of the tangent
+            if observer is not None:
+                observer.on_tangent('upper', left_hull[upper_indices[0]], right_hull[upper_indices[1]])
+        while is_tangent_step(right_hull[upper_indices[1]], left_hull[upper_indices[0]], next_ccw(left_hull, upper_indices[0]), -1):
+            upper_indices[0] = (upper_indices[0] + 1) % len(left_hull)
+            moved = True
+
+            if observer is not None:
+                observer.on_tangent('upper', left_hull[upper_indices[0]], right_hull[upper_indices[1]])
+
+    # then find the lower tangent: walk CCW on the right hull and CW on the left hull while the tangent can be lowered
+    if observer is not None:
+        observer.on_tangent('lower', left_hull[lower_indices[0]], right_hull[lower_indices[1]])
+
+    moved = True
+    while moved:
+        moved = False
+        while is_tangent_step(left_hull[lower_indices[0]], right_hull[lower_indices[1]], next_ccw(right_hull, lower_indices[1]), -1):
+            lower_indices[1] = (lower_indices[1] + 1) % len(right_hull)
+            moved = True
+
+            if observer is not None:
+                observer.on_tangent('lower', left_hull[lower_indices[0]], right_hull[lower_indices[1]])
+        while is_tangent_step(right_hull[lower_indices[1]], left_hull[lower_indices[0]], prev_ccw(left_hull, lower_indices[0]), 1):
+            lower_indices[0] = (lower_indices[0] - 1) % len(left_hull)
+            moved = True
+
+            if observer is not None:
+                observer.on_tangent('lower', left_hull[lower_indices[0]], right_hull[lower_indices[1]])
 
     # merge the left and right hulls using the upper and lower tangents
     if upper_indices[0] <= lower_indices[0]:
-        merged_convex_hull = left_half[upper_indices[0] : lower_indices[0] + 1]
+        merged_convex_hull = left_hull[upper_indices[0] : lower_indices[0] + 1]
     else:
-        merged_convex_hull = left_half[upper_indices[0] : ]
-        merged_convex_hull.extend(left_half[ : lower_indices[0] + 1])
+        merged_convex_hull = left_hull[upper_indices[0] : ]
+        merged_convex_hull.extend(left_hull[ : lower_indices[0] + 1])
+    n_left = len(merged_convex_hull)
 
     if lower_indices[1] <= upper_indices[1]:
-        merged_convex_hull.extend(right_half[lower_indices[1] : upper_indices[1] + 1])
+        merged_convex_hull.extend(right_hull[lower_indices[1] : upper_indices[1] + 1])
     else:
-        merged_convex_hull.extend(right_half[lower_indices[1] : ])
-        merged_convex_hull.extend(right_half[ : upper_indices[1] + 1])
+        merged_convex_hull.extend(right_hull[lower_indices[1] : ])
+        merged_convex_hull.extend(right_hull[ : upper_indices[1] + 1])
+
+    # the leftmost and rightmost points of the halves are always kept, so their positions follow from the splice
+    leftmost = (left_leftmost - upper_indices[0]) % len(left_hull)
+    rightmost = n_left + (right_rightmost - lower_indices[1]) % len(right_hull)
 
-    upper_turtle.clear()
-    lower_turtle.clear()
-    left_turtle.clear()
-    right_turtle.clear()
+    if observer is not None:
+        observer.on_merge(merged_convex_hull)
+    return merged_convex_hull, leftmost, rightmost
+
+def is_tangent_step(anchor, endpoint, candidate, direction):
+    '''
+        Returns whether a tangent from anchor to endpoint should move its endpoint to candidate: it should if candidate
+        is on the given side (1 for left, -1 for right) of the segment anchor-endpoint, or is collinear and farther away
+    '''
 
-    # draw the merge convex hull and return it and the turtle used to draw it
-    merge_turtle = Turtle(visible=False)
-    if show_states:
-        merge_turtle.speed(0)
-        draw_connect_points(merged_convex_hull + [merged_convex_hull[0]], screen, merge_turtle)
-    return merged_convex_hull, merge_turtle
+    side = get_side(anchor, endpoint, candidate) * direction
+    return side > 0 or (side == 0 and squared_distance(anchor, candidate) > squared_distance(anchor, endpoint))
 
-def gift_wrap(points, screen, show_states):
+def parallel_divide_conquer(points, observer=None, workers=None):
     '''
         Returns the list of points in CCW order of the convex hull of the set of points
-        The first point is the leftmost point
-        Draws the steps taken in the processing
+        The first and last points in the list are the same
+        Splits the sorted points into one slab per worker, computes the hull of each slab with divide_conquer_util in
+        a separate process, then merges the slab hulls pairwise with merge_hulls
+        The sorted points are passed to the workers in shared memory, so only the slab hulls are pickled
+        Runs divide_conquer instead if there are fewer than PARALLEL_MIN_POINTS points or only one worker, which is
+        the number of cpus this process may run on by default
+    '''
+
+    if len(points) == 0:
+        return []
+
+    workers = workers or available_cpus()
+    if workers == 1 or len(points) < PARALLEL_MIN_POINTS:
+        # divide_conquer takes an array as a PointSet, since its rows can't be put in a set
+        return divide_conquer(PointSet(points) if isinstance(points, np.ndarray) else points, observer)
+
+    # duplicate points would make the base cases of divide_conquer_util degenerate
+    points = (points if isinstance(points, PointSet) else PointSet(points)).unique().coordinates
+
+    # every slab needs enough points for the base case of divide_conquer_util
+    n_slabs = max(1, min(workers, len(points) // 4))
+    bounds = [len(points) * i // n_slabs for i in range(n_slabs + 1)]
+    if n_slabs == 1:
+        return divide_conquer([tuple(point) for point in points.tolist()], observer)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(1, points.nbytes))
+    try:
+        np.ndarray(points.shape, dtype=points.dtype, buffer=memory.buf)[:] = points
+        with ProcessPoolExecutor(min(workers, n_slabs)) as executor:
+            futures = [executor.submit(slab_hull, memory.name, points.shape, points.dtype.str, l, r) for l, r in zip(bounds, bounds[1:])]
+            hulls = [future.result() for future in futures]
+    finally:
+        memory.close()
+        memory.unlink()
+
+    # merge neighbouring slab hulls in a reduction tree
+    while len(hulls) > 1:
+        merged_hulls = [merge_hulls(hulls[i], hulls[i + 1]) for i in range(0, len(hulls) - 1, 2)]
+        if len(hulls) % 2 == 1:
+            merged_hulls.append(hulls[-1])
+        hulls = merged_hulls
+
+    convex_hull, _, _ = hulls[0]
+    convex_hull.append(convex_hull[0])
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    return convex_hull
+
+def available_cpus():
+    '''
+        Returns the number of cpus this process may run on, which can be fewer than os.cpu_count() (in a container, or
+        with its affinity set)
+    '''
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def slab_hull(memory_name, shape, dtype, l, r):
+    '''
+        Returns the convex hull of the lth (inclusive) to rth (exclusive) sorted points in the shared memory block named
+        memory_name, as returned by divide_conquer_util; run in the worker processes of parallel_divide_conquer
+    '''
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        slab = np.ndarray(shape, dtype=dtype, buffer=memory.buf)[l : r]
+        points = [tuple(point) for point in slab.tolist()]
+    finally:
+        memory.close()
+
+    return divide_conquer_util(points, 0, len(points), None)
+
+def gift_wrap(points, observer=None):
+    '''
+        Returns the list of points in CCW order of the convex hull of the set of points
+        The first point is the lowest point, and the first and last points in the list are the same
+        Reports the steps taken in the processing to observer, if given; otherwise uses gift_wrap_batched
         Uses the Gift Wrap approach: O(n*k), where n is number of points and k is the number of points on the convex hull
     '''
 
+    if len(points) == 0:
+        return []
+
     # get the lowest point in points (if there is a tie, take the leftmost one)
     lowest_point = min(points, key = lambda x: (x[1], x[0]))
-   
-    turtle = Turtle(visible=False)
-    turtle.speed(0)
 
-    cur_guess_turtle = Turtle(visible=False)
-    cur_guess_turtle.speed(0)
-    cur_guess_turtle.pencolor('red')
+    if observer is None:
+        convex_hull = gift_wrap_batched(points, lowest_point)
+        convex_hull.append(convex_hull[0])
+        return convex_hull
 
     # build the convex hull, adding points until the lowest point is reached again 
     convex_hull = []
@@ -228,104 +628,1108 @@ def gift_wrap(points, screen, show_states):
         
         added_point = points[0]
 
-        if show_states:
-            cur_guess_turtle.penup()
-            cur_guess_turtle.setposition(convex_hull[-1])
-            cur_guess_turtle.pendown()
-            cur_guess_turtle.goto(added_point)
-            screen.update()
+        if observer is not None:
+            observer.on_candidate(convex_hull, added_point)
 
         # find the point which point for which all other points are to the right of the segment made by the last point added to the convex hull and it
         for i, point in enumerate(points):
             if i == 0:
                 continue
 
-            # show the current state
-            if show_states:
-                convex_hull.append(point)
-                turtle.clear()
-                draw_connect_points(convex_hull, screen, turtle)
-                sleep(TIME_STEP_DELAY)
-                convex_hull.pop()
+            # report the current state
+            if observer is not None:
+                observer.on_scan(convex_hull, point)
             
-            if get_side(convex_hull[-1], added_point, point) < 0:
-                # if current point is right of current guess, update it to the guess
+            # a guess equal to the last point added is degenerate, so any other point replaces it
+            # of collinear points the farthest is taken, so the middle ones are left off and the wrapping closes
+            side = get_side(convex_hull[-1], added_point, point)
+            if (added_point == convex_hull[-1] or side < 0 or
+                (side == 0 and squared_distance(convex_hull[-1], point) > squared_distance(convex_hull[-1], added_point))):
+                # if current point is right of current guess (or farther along it), update it to the guess
                 added_point = point
 
-                # show the current guess using a red line
-                if show_states:
-                    cur_guess_turtle.clear()
-                    cur_guess_turtle.penup()
-                    cur_guess_turtle.setposition(convex_hull[-1])
-                    cur_guess_turtle.pendown()
-                    cur_guess_turtle.goto(added_point)
-                    screen.update()
+                # report the current guess
+                if observer is not None:
+                    observer.on_candidate(convex_hull, added_point)
 
     convex_hull.append(added_point)
-    turtle.clear()
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    return convex_hull
+
+def gift_wrap_batched(points, lowest_point):
+    '''
+        Returns the points of the convex hull (in CCW order, not closed) found by gift wrapping from lowest_point
+        Instead of scanning the points one at a time, each hull point is found by comparing every point against the
+        current guess at once with get_sides, then moving the guess to the point farthest right of it until none are
+        Collinear points are left off of the hull
+    '''
+
+    # large integer coordinates are kept as Python ints, so the products below can't overflow
+    array = exact_integer_array(points)
+
+    convex_hull = []
+    added_point = lowest_point
+    while len(convex_hull) == 0 or added_point != convex_hull[0]:
+        convex_hull.append(added_point)
+
+        # any point other than the last one added can be the first guess
+        others = np.flatnonzero(np.any(array != added_point, axis=1))
+        if len(others) == 0:
+            break
+        added_point = points[others[0]]
+
+        sides = get_sides(convex_hull[-1], added_point, array)
+        i = np.argmin(sides)
+        while sides[i] < 0:
+            added_point = points[i]
+            sides = get_sides(convex_hull[-1], added_point, array)
+            i = np.argmin(sides)
+
+        # of the points collinear with the guess and in the same direction, take the farthest one
+        offsets = array - convex_hull[-1]
+        ahead = np.flatnonzero((sides == 0) & (offsets @ np.subtract(added_point, convex_hull[-1]) > 0))
+        added_point = points[ahead[np.argmax(np.sum(offsets[ahead] ** 2, axis=1))]]
+
     return convex_hull
 
-def graham_scan(points, screen, show_states):
+def graham_scan(points, observer=None):
     '''
         Returns the list of points in CCW order of the convex hull of the set of points
-        The first point is the leftmost point
-        Draws the steps taken in the processing
+        The first point is the leftmost point, and the first and last points in the list are the same
+        Reports the steps taken in the processing to observer, if given
         Uses the Graham Scan approach: O(nlogn) where n is the number of points
     '''
 
     # sort the points by x value then by y value
-    points = sorted(points)
+    # duplicates are dropped, since a repeated point on top of a stack would make every turn look collinear
+    points = sorted_unique_points(points)
 
     # build the upper hull
-    upper_turtle = Turtle(visible=False)
-    upper_turtle.speed(0)
     upper_hull_stack = []
-    for i, point in enumerate(points):
+    for point in points:
         while len(upper_hull_stack) >= 2 and get_side(upper_hull_stack[-2], upper_hull_stack[-1], point) > 0:
-            # display the current state of the upper hull
-            if show_states:
-                draw_connect_points(upper_hull_stack, screen, upper_turtle)
-                sleep(TIME_STEP_DELAY)
-                upper_turtle.clear()
+            # report the current state of the upper hull
+            if observer is not None:
+                observer.on_pop('upper', upper_hull_stack)
              
             # if current point is a left turn, remove the last item
             upper_hull_stack.pop()
 
         upper_hull_stack.append(point)
 
-    # show the upper hull 
-    if show_states:
-        draw_connect_points(upper_hull_stack, screen, upper_turtle)
+    # report the upper hull 
+    if observer is not None:
+        observer.on_chain('upper', upper_hull_stack)
 
     # build the lower hull
-    lower_turtle = Turtle(visible=False)
-    lower_turtle.speed(0)
     lower_hull_stack = []
-    for i, point in enumerate(points):
+    for point in points:
         while len(lower_hull_stack) >= 2 and get_side(lower_hull_stack[-2], lower_hull_stack[-1], point) < 0:
-            # display the current state of the lower hull
-            if show_states:
-                draw_connect_points(lower_hull_stack, screen, lower_turtle)
-                sleep(TIME_STEP_DELAY)
-                lower_turtle.clear()
+            # report the current state of the lower hull
+            if observer is not None:
+                observer.on_pop('lower', lower_hull_stack)
 
             # if current point is a right turn, remove the last item
             lower_hull_stack.pop()
 
         lower_hull_stack.append(point)
 
-    # show the lower hull
-    if show_states:
-        draw_connect_points(lower_hull_stack, screen, lower_turtle)
-
-    # clear the hulls
-    upper_turtle.clear()
-    lower_turtle.clear()
+    # report the lower hull
+    if observer is not None:
+        observer.on_chain('lower', lower_hull_stack)
 
-    # put the upper and lower hull together and return them    
+    # put the upper and lower hull together (they share the rightmost point) and return them    
     upper_hull_stack.reverse()
-    lower_hull_stack.extend(upper_hull_stack)
+    lower_hull_stack.extend(upper_hull_stack[1 : ])
+
+    if observer is not None:
+        observer.on_hull(lower_hull_stack)
     return lower_hull_stack
 
+def chan(points, observer=None):
+    '''
+        Returns the list of points in CCW order of the convex hull of the set of points
+        The first point is the leftmost point, and the first and last points in the list are the same
+        Reports the steps taken in the processing to observer, if given
+        Uses Chan's approach: O(nlogk), where n is number of points and k is the number of points on the convex hull
+        Utilizes chan_wrap
+    '''
+
+    if len(points) == 0:
+        return []
+
+    # duplicate points would make the tangents from a point to its own mini hull degenerate
+    points = unique_points(points)
+    array = np.array(points)
+    start = min(points)
+
+    # guess the size of the hull, squaring the guess until the wrapping closes within m steps
+    # small guesses would mean a mini hull for every few points, so the guesses start at CHAN_MIN_GROUP_SIZE
+    guess = CHAN_MIN_GROUP_SIZE
+    while True:
+        m = min(guess, len(points))
+
+        # compute the mini hulls of groups of m points
+        # monotone_chain leaves collinear points off, so each point's successor on its own mini hull is a corner of it
+        mini_hulls = []
+        for i in range(0, len(points), m):
+            mini_hull = [points[i + j] for j in monotone_chain(array[i : i + m]).tolist()]
+            mini_hulls.append(mini_hull)
+
+            if observer is not None:
+                observer.on_mini_hull(mini_hull)
+
+        convex_hull = chan_wrap(mini_hulls, start, m, observer)
+        if convex_hull is not None:
+            break
+        guess *= guess
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    return convex_hull
+
+def chan_wrap(mini_hulls, start, m, observer):
+    '''
+        Gift wraps the mini hulls for at most m steps, starting at start
+        Returns the closed convex hull, or None if it has more than m points
+        Each step takes the tangent from the last added point to every mini hull, which is O(logm) per mini hull
+    '''
+
+    # remember which mini hull each point is on, since the tangent to a point's own hull is just its CCW successor
+    positions = {}
+    for g, mini_hull in enumerate(mini_hulls):
+        for i, point in enumerate(mini_hull):
+            positions[point] = (g, i)
+
+    convex_hull = [start]
+    for _ in range(m):
+        last_point = convex_hull[-1]
+        g, i = positions[last_point]
+        added_point = next_ccw(mini_hulls[g], i)
+
+        # take the tangent point for which all other tangent points are to the left (the farthest one if collinear)
+        for h, mini_hull in enumerate(mini_hulls):
+            if h == g:
+                continue
+
+            point = mini_hull[hull_tangent(mini_hull, last_point)]
+            side = get_side(last_point, added_point, point)
+            if (
+                added_point == last_point or side < 0 or
+                (side == 0 and squared_distance(last_point, point) > squared_distance(last_point, added_point))
+            ):
+                added_point = point
+
+        if observer is not None:
+            observer.on_candidate(convex_hull, added_point)
+
+        if added_point == start:
+            convex_hull.append(start)
+            return convex_hull
+        convex_hull.append(added_point)
+
+    return None
+
+def hull_tangent(convex_hull, point):
+    '''
+        Returns the index in convex_hull (in CCW order, not closed) of the point q such that no point of convex_hull
+        is to the right of the segment point-q (the farthest one if collinear), where point is outside of convex_hull
+        Binary searches for q in O(logh), falling back to a linear walk if collinear points break the search
+    '''
+
+    n = len(convex_hull)
+    if n <= 2:
+        return linear_hull_tangent(convex_hull, point)
+
+    def is_right(i, j):
+        return get_side(point, convex_hull[i % n], convex_hull[j % n]) < 0
+
+    def sign(i, j):
+        side = get_side(point, convex_hull[i % n], convex_hull[j % n])
+        return (side > 0) - (side < 0)
+
+    l, r = 0, n
+    l_prev, l_next = sign(0, -1), sign(0, 1)
+    while l < r:
+        c = (l + r) // 2
+        c_prev, c_next, c_side = sign(c, c - 1), sign(c, c + 1), sign(l, c)
+        if c_prev >= 0 and c_next >= 0:
+            return farthest_collinear_neighbor(convex_hull, point, c % n)
+
+        if (c_side > 0 and (l_next < 0 or l_prev == l_next)) or (c_side < 0 and c_prev < 0):
+            # the tangent point is between l and c
+            r = c
+        else:
+            # the tangent point is after c
+            l = c + 1
+            l_prev = -c_next
+            l_next = sign(l, l + 1)
+
+    l %= n
+    if is_right(l, l - 1) or is_right(l, l + 1):
+        return linear_hull_tangent(convex_hull, point)
+    return farthest_collinear_neighbor(convex_hull, point, l)
+
+def farthest_collinear_neighbor(convex_hull, point, i):
+    '''
+        Returns the index of the neighbor of the ith point of convex_hull (in CCW order, not closed) if it is collinear
+        with point and the ith point and farther from point, otherwise i
+        When the tangent from point runs along an edge of convex_hull, this makes it end at the far end of the edge
+    '''
+
+    n = len(convex_hull)
+    for j in ((i - 1) % n, (i + 1) % n):
+        if get_side(point, convex_hull[i], convex_hull[j]) == 0 and squared_distance(point, convex_hull[j]) > squared_distance(point, convex_hull[i]):
+            return j
+    return i
+
+def linear_hull_tangent(convex_hull, point):
+    '''
+        Returns the same index as hull_tangent, but by checking every point of convex_hull: O(h)
+    '''
+
+    best = 0
+    for i, hull_point in enumerate(convex_hull):
+        side = get_side(point, convex_hull[best], hull_point)
+        if side < 0 or (side == 0 and squared_distance(point, hull_point) > squared_distance(point, convex_hull[best])):
+            best = i
+
+    return best
+
+def squared_distance(point1, point2):
+    return (point1[0] - point2[0])**2 + (point1[1] - point2[1])**2
+
+def monotone_chain(points):
+    '''
+        Returns the indices into the (N, 2) array points of the vertices of its convex hull in CCW order
+        The first index is that of the leftmost point, and it is not repeated at the end; collinear points are dropped
+        Interior points are pruned with akl_toussaint_filter before the upper/lower stack passes
+        Uses the Monotone Chain approach: O(nlogn) where n is the number of points
+    '''
+
+    points = np.asarray(points)
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # sort the remaining points by x value then by y value
+    candidates = np.flatnonzero(akl_toussaint_filter(points))
+    order = candidates[np.lexsort((points[candidates, 1], points[candidates, 0]))]
+
+    # keep only the first of each run of duplicate points
+    is_new = np.ones(len(order), dtype=bool)
+    is_new[1 : ] = np.any(points[order[1 : ]] != points[order[ : -1]], axis=1)
+    order = order[is_new]
+    sorted_points = list(zip(points[order, 0].tolist(), points[order, 1].tolist()))
+
+    # build the lower and upper hulls as stacks of positions into sorted_points
+    lower_hull_stack = []
+    for i, point in enumerate(sorted_points):
+        while len(lower_hull_stack) >= 2 and get_side(sorted_points[lower_hull_stack[-2]], sorted_points[lower_hull_stack[-1]], point) <= 0:
+            lower_hull_stack.pop()
+        lower_hull_stack.append(i)
+
+    upper_hull_stack = []
+    for i, point in enumerate(sorted_points):
+        while len(upper_hull_stack) >= 2 and get_side(sorted_points[upper_hull_stack[-2]], sorted_points[upper_hull_stack[-1]], point) >= 0:
+            upper_hull_stack.pop()
+        upper_hull_stack.append(i)
+
+    # splice the hulls together (they share the leftmost and rightmost points) and map back to the input indices
+    upper_hull_stack.reverse()
+    lower_hull_stack.extend(upper_hull_stack[1 : -1])
+    return order[np.array(lower_hull_stack, dtype=np.intp)]
+
+def monotone_chain_hull(points, observer=None):
+    '''
+        Returns the list of points in CCW order of the convex hull of the set of points
+        The first and last points in the list are the same
+        Wraps monotone_chain for callers which want points rather than indices
+    '''
+
+    if len(points) == 0:
+        return []
+
+    points = np.asarray(points)
+    convex_hull = [tuple(point) for point in points[monotone_chain(points)].tolist()]
+    convex_hull.append(convex_hull[0])
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    return convex_hull
+
+def akl_toussaint_filter(points):
+    '''
+        Returns a boolean mask over the (N, 2) array points which is False for the points strictly inside the octagon
+        spanned by the extreme points in the x, y, x+y and x-y directions; those points can't be on the convex hull
+        Integer coordinates too large for exact int64 sums and products are used as Python ints
+    '''
+
+    points = exact_integer_array(points)
+    xs, ys = points[:, 0], points[:, 1]
+    sums, differences = xs + ys, xs - ys
+
+    # the extreme points in CCW order, starting with the leftmost
+    extremes = [np.argmin(xs), np.argmin(sums), np.argmin(ys), np.argmax(differences),
+                np.argmax(xs), np.argmax(sums), np.argmax(ys), np.argmin(differences)]
+    octagon = []
+    for index in extremes:
+        vertex = tuple(points[index].tolist())
+        if len(octagon) == 0 or vertex != octagon[-1]:
+            octagon.append(vertex)
+    if octagon[0] == octagon[-1]:
+        octagon.pop()
+
+    if len(octagon) < 3:
+        # the octagon is degenerate, so nothing can be strictly inside it
+        return np.ones(len(points), dtype=bool)
+
+    # a point is strictly inside the octagon if it is strictly left of every one of its edges
+    inside = np.ones(len(points), dtype=bool)
+    for i, vertex in enumerate(octagon):
+        next_vertex = next_ccw(octagon, i)
+        inside &= (next_vertex[0] - vertex[0])*(ys - vertex[1]) - (next_vertex[1] - vertex[1])*(xs - vertex[0]) > 0
+    return ~inside
+
+def quickhull(points, observer=None):
+    '''
+        Returns the indices into the (N, 2) array points of the vertices of its convex hull in CCW order
+        The first index is that of the leftmost point, and it is not repeated at the end; collinear points are dropped
+        Reports each split to observer, if given
+        Uses the QuickHull approach: O(nlogn) expected, O(n^2) worst case, where n is the number of points
+        Every split finds the farthest point and partitions the candidates with NumPy over arrays of indices, and the
+        points inside the triangle it makes are dropped for good, so on spread out points most of them are gone after
+        the first few splits; splits with few candidates left are finished by quickhull_chain, since the NumPy calls
+        would cost more than the work on them
+    '''
+
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # the leftmost and rightmost points (the lowest and highest of ties), without sorting unless it already has been
+    if isinstance(points, PointSet):
+        leftmost, _, rightmost, _ = points.extremes()
+        points = points.coordinates
+    else:
+        points = np.asarray(points)
+        xs, ys = points[:, 0], points[:, 1]
+        leftmost = np.flatnonzero(xs == xs.min())
+        leftmost = leftmost[np.argmin(ys[leftmost])]
+        rightmost = np.flatnonzero(xs == xs.max())
+        rightmost = rightmost[np.argmax(ys[rightmost])]
+    if np.all(points[leftmost] == points[rightmost]):
+        return np.array([leftmost], dtype=np.intp)
+
+    # the lower chain goes from the leftmost to the rightmost point, and the upper chain back, with their points on the right
+    sides = get_sides(points[leftmost], points[rightmost], points)
+    convex_hull = [leftmost]
+    stack = [
+        (rightmost, leftmost, np.flatnonzero(sides > 0)),
+        (rightmost, None, None),
+        (leftmost, rightmost, np.flatnonzero(sides < 0)),
+    ]
+
+    # each entry is either a hull point to add (with no candidates), or a segment and the candidates right of it
+    while len(stack) > 0:
+        start, end, candidates = stack.pop()
+        if candidates is None:
+            convex_hull.append(start)
+            continue
+        if len(candidates) == 0:
+            continue
+        if len(candidates) <= QUICKHULL_SCALAR_SIZE:
+            coordinates = [tuple(point) for point in points[[start, end]].tolist()]
+            candidates = list(zip(candidates.tolist(), map(tuple, points[candidates].tolist())))
+            convex_hull.extend(quickhull_chain((start, coordinates[0]), (end, coordinates[1]), candidates, observer))
+            continue
+
+        # the farthest candidate from the segment is on the hull; of ties, the one nearest to start is taken, so that
+        # the others aren't collinear with the edge leading to it
+        candidate_points = points[candidates]
+        distances = -get_sides(points[start], points[end], candidate_points)
+        farthest = candidates[distances == distances.max()]
+        if len(farthest) > 1:
+            farthest = farthest[np.argmin((points[farthest] - points[start]) @ (points[end] - points[start]))]
+        else:
+            farthest = farthest[0]
+
+        if observer is not None:
+            observer.on_split(tuple(points[start].tolist()), tuple(points[end].tolist()), tuple(points[farthest].tolist()))
+
+        # the candidates inside the triangle start-farthest-end are dropped
+        start_sides = get_sides(points[start], points[farthest], candidate_points)
+        end_sides = get_sides(points[farthest], points[end], candidate_points)
+        stack.append((farthest, end, candidates[end_sides < 0]))
+        stack.append((farthest, None, None))
+        stack.append((start, farthest, candidates[start_sides < 0]))
+
+    return np.array(convex_hull, dtype=np.intp)
+
+def quickhull_chain(start, end, candidates, observer=None):
+    '''
+        Returns the indices of the hull points between start and end (exclusive) in CCW order, where start and end are
+        (index, point) pairs and candidates is the list of (index, point) pairs right of the segment start-end
+        The same splits as quickhull, with get_side on lists
+    '''
+
+    if len(candidates) == 0:
+        return []
+
+    # the farthest candidate from the segment, of ties the one nearest to start
+    distances = [-get_side(start[1], end[1], point) for _, point in candidates]
+    max_distance = max(distances)
+    direction = (end[1][0] - start[1][0], end[1][1] - start[1][1])
+    farthest = min(
+        (candidate for candidate, distance in zip(candidates, distances) if distance == max_distance),
+        key=lambda candidate: (candidate[1][0] - start[1][0])*direction[0] + (candidate[1][1] - start[1][1])*direction[1],
+    )
+
+    if observer is not None:
+        observer.on_split(start[1], end[1], farthest[1])
+
+    # farthest itself is left out, since it is collinear with both of its segments
+    candidates = [candidate for candidate in candidates if candidate is not farthest]
+    start_candidates = [candidate for candidate in candidates if get_side(start[1], farthest[1], candidate[1]) < 0]
+    end_candidates = [candidate for candidate in candidates if get_side(farthest[1], end[1], candidate[1]) < 0]
+    return (
+        quickhull_chain(start, farthest, start_candidates, observer) + [farthest[0]] +
+        quickhull_chain(farthest, end, end_candidates, observer)
+    )
+
+def quickhull_hull(points, observer=None):
+    '''
+        Returns the list of points in CCW order of the convex hull of the set of points
+        The first point is the leftmost point, and the first and last points in the list are the same
+        Reports the steps taken in the processing to observer, if given
+        Wraps quickhull for callers which want points rather than indices
+    '''
+
+    if len(points) == 0:
+        return []
+
+    indices = quickhull(points, observer)
+    convex_hull = [tuple(point) for point in np.asarray(points)[indices].tolist()]
+    convex_hull.append(convex_hull[0])
+
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    return convex_hull
+
+class Incremental_Hull():
+    '''
+        Maintains the convex hull of a growing set of points as sorted upper and lower chains
+        Inserting a point is O(logh) to find its place in each chain (bisect), plus the amortized removal of the chain
+        points it makes non-convex; points inside the current hull are rejected after two bisects and two get_sides
+        Collinear points are left off of the hull
+    '''
+
+    def __init__(self, points=()):
+        self.upper_chain = []
+        self.lower_chain = []
+        self.insert_many(points)
+
+    def insert(self, point):
+        '''
+            Adds point to the set; returns whether it is on the updated convex hull
+        '''
+
+        point = tuple(point)
+        in_upper = self.insert_into_chain(self.upper_chain, point, -1)
+        in_lower = self.insert_into_chain(self.lower_chain, point, 1)
+        return in_upper or in_lower
+
+    def insert_many(self, points):
+        '''
+            Adds every point in the iterable points to the set; returns how many of them were on the hull when added
+        '''
+
+        return sum(self.insert(point) for point in points)
+
+    def hull(self):
+        '''
+            Returns the list of points in CCW order of the current convex hull
+            The first point is the leftmost point, and the first and last points in the list are the same
+        '''
+
+        # the chains share the leftmost and rightmost points
+        convex_hull = self.lower_chain + self.upper_chain[-2 : 0 : -1]
+        if len(convex_hull) > 0:
+            convex_hull.append(convex_hull[0])
+        return convex_hull
+
+    def insert_into_chain(self, chain, point, direction):
+        '''
+            Inserts point into the sorted chain if it is outside of it, where direction is 1 for the lower chain (whose
+            points make left turns) and -1 for the upper chain (whose points make right turns)
+            Returns whether point was inserted
+        '''
+
+        i = bisect_left(chain, point)
+        if i < len(chain) and chain[i] == point:
+            return False
+
+        # a point between two chain points is only on the chain if it is outside the segment between them
+        if 0 < i < len(chain) and get_side(chain[i-1], chain[i], point) * direction >= 0:
+            return False
+
+        chain.insert(i, point)
+
+        # remove the points on either side of point which no longer make the right turn
+        while i + 2 < len(chain) and get_side(point, chain[i+1], chain[i+2]) * direction <= 0:
+            del chain[i+1]
+        while i >= 2 and get_side(chain[i-2], chain[i-1], point) * direction <= 0:
+            del chain[i-1]
+            i -= 1
+
+        return True
+
+def incremental_hull_stream(chunks, incremental_hull=None):
+    '''
+        Generator pipeline stage which adds each chunk of points from the iterable chunks to incremental_hull (a new
+        Incremental_Hull by default) and yields the convex hull after each chunk
+    '''
+
+    if incremental_hull is None:
+        incremental_hull = Incremental_Hull()
+
+    for chunk in chunks:
+        incremental_hull.insert_many(chunk)
+        yield incremental_hull.hull()
+
+def out_of_core_hull(points, chunk_size=OUT_OF_CORE_CHUNK_SIZE, method='monotone_chain'):
+    '''
+        Returns the indices into the (N, 2) array points of the vertices of its convex hull in CCW order, like
+        monotone_chain, without ever holding more than two chunks of chunk_size points in memory at once
+        points is meant to be memory mapped (e.g. by util.load_points), so it can be larger than memory: it is read in
+        order one chunk at a time by prefetched_chunks, and the hull of each chunk is computed with method (monotone_chain
+        or quickhull), keeping only its vertices
+        The chunk hulls are merged hierarchically like a binary counter, so at most O(log(N/chunk_size)) hulls are
+        waiting to be merged at any time
+    '''
+
+    if method not in HULL_INDEX_METHODS:
+        raise ValueError(f'unknown out of core convex hull method: {method}')
+    hull_indices = HULL_INDEX_METHODS[method]
+
+    def merge(hull1, hull2):
+        indices, coordinates = np.concatenate([hull1[0], hull2[0]]), np.concatenate([hull1[1], hull2[1]])
+        kept = hull_indices(coordinates)
+        return indices[kept], coordinates[kept]
+
+    # the hulls waiting to be merged, as (level, indices, coordinates), where a hull of level l covers 2^l chunks
+    hulls = []
+    for start, chunk in prefetched_chunks(points, chunk_size):
+        kept = hull_indices(chunk)
+        level, merged = 0, (kept.astype(np.int64) + start, chunk[kept])
+        while len(hulls) > 0 and hulls[-1][0] == level:
+            _, indices, coordinates = hulls.pop()
+            merged = merge((indices, coordinates), merged)
+            level += 1
+        hulls.append((level, *merged))
+
+    if len(hulls) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # merge the rest from the most recent, keeping the earlier chunks first so their copies of duplicates are kept
+    _, *merged = hulls.pop()
+    while len(hulls) > 0:
+        _, indices, coordinates = hulls.pop()
+        merged = merge((indices, coordinates), merged)
+
+    return merged[0]
+
+def prefetched_chunks(points, chunk_size):
+    '''
+        Generator which yields each chunk of chunk_size rows of the (N, 2) array points in order, copied into memory,
+        along with the index of its first row
+        The next chunk is copied by a background thread while the current one is used, so reading a memory mapped file
+        overlaps with the computation on it (NumPy releases the GIL while copying); once copied, the chunk's pages of
+        the file are released with util.release_rows
+    '''
+
+    def read(start):
+        chunk = np.array(points[start : start + chunk_size])
+        release_rows(points, start, start + chunk_size)
+        return chunk
+
+    with ThreadPoolExecutor(1) as executor:
+        next_chunk = executor.submit(read, 0)
+        for start in range(0, len(points), chunk_size):
+            chunk = next_chunk.result()
+            if start + chunk_size < len(points):
+                next_chunk = executor.submit(read, start + chunk_size)
+            yield start, chunk
+
+class Approximate_Hull():
+    '''
+        Maintains an approximation of the convex hull of a stream of points, keeping only the extreme point in each of
+        a fixed set of evenly spaced directions
+        The number of directions is chosen so that the approximate hull is within epsilon * D of the exact hull (in
+        Hausdorff distance), where D is the diameter of the points; error_bound gives a usually much smaller bound for
+        the points actually seen
+        Memory is O(1/epsilon) however many points are added
+    '''
+
+    def __init__(self, epsilon=APPROXIMATE_EPSILON, points=()):
+        # the error is at most (D/2) * tan(pi/k) for k directions
+        self.n_directions = max(4, int(np.ceil(np.pi / np.arctan(2 * epsilon))))
+        angles = 2 * np.pi * np.arange(self.n_directions) / self.n_directions
+        self.directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+        # the extreme point in each direction, and how far along the direction it is
+        self.extremes = None
+        self.support = np.full(self.n_directions, -np.inf)
+        self.insert_many(points)
+
+    def insert_many(self, points):
+        '''
+            Adds the (N, 2) array points to the set; only the vertices of their own hull (found with monotone_chain) are
+            compared against the directions, so a chunk of N points costs O(NlogN) rather than O(N/epsilon)
+        '''
+
+        points = np.asarray(points).reshape(-1, 2)
+        if len(points) == 0:
+            return
+
+        candidates = points[monotone_chain(points)]
+        projections = candidates @ self.directions.T
+        best = np.argmax(projections, axis=0)
+        support = projections[best, np.arange(self.n_directions)]
+
+        improved = support > self.support
+        if self.extremes is None:
+            self.extremes = candidates[best]
+        else:
+            self.extremes = np.where(improved[:, np.newaxis], candidates[best], self.extremes)
+        self.support = np.maximum(support, self.support)
+
+    def hull(self):
+        '''
+            Returns the list of points in CCW order of the convex hull of the extreme points, computed with graham_scan
+            The first point is the leftmost point, and the first and last points in the list are the same
+        '''
+
+        if self.extremes is None:
+            return []
+        return graham_scan([tuple(point) for point in self.extremes.tolist()])
+
+    def error_bound(self):
+        '''
+            Returns a bound on the Hausdorff distance between the approximate hull and the exact hull of the points seen
+            Between the extremes of two neighbouring directions, the exact hull is inside the triangle made by the chord
+            between them and the two supporting lines, so it is no farther from the chord than the triangle's apex
+        '''
+
+        if self.extremes is None:
+            return 0.0
+
+        # the apexes, where each direction's supporting line meets the next one's
+        next_directions = np.roll(self.directions, -1, axis=0)
+        lines = np.stack([self.directions, next_directions], axis=1)
+        apexes = np.linalg.solve(lines, np.stack([self.support, np.roll(self.support, -1)], axis=1)[..., np.newaxis])[..., 0]
+
+        # the distances from the apexes to their chords
+        starts = self.extremes.astype(float)
+        chords = np.roll(starts, -1, axis=0) - starts
+        lengths = np.sum(chords * chords, axis=1)
+        t = np.sum((apexes - starts) * chords, axis=1) / np.maximum(lengths, np.finfo(float).tiny)
+        closest = starts + np.clip(t, 0, 1)[:, np.newaxis] * chords
+        return float(np.max(np.linalg.norm(apexes - closest, axis=1)))
+
+def approximate_hull(chunks, epsilon=APPROXIMATE_EPSILON):
+    '''
+        Returns the convex hull (as returned by Approximate_Hull.hull) of the points in the iterable chunks of (N, 2)
+        arrays, within epsilon times their diameter of the exact hull, and the bound on its error from error_bound
+        Only one chunk is held at a time, so the chunks can be read from a file (e.g. slices of a numpy.memmap)
+    '''
+
+    approximate = Approximate_Hull(epsilon)
+    for chunk in chunks:
+        approximate.insert_many(chunk)
+
+    return approximate.hull(), approximate.error_bound()
+
+class Dynamic_Hull():
+    '''
+        Maintains the convex hull of a set of points under insertions and deletions, in the style of Overmars and van Leeuwen
+        The points are the leaves of a weight balanced tree in sorted order; every node keeps the upper and lower chains of
+        the points below it, spliced together from its children's chains at the bridges between them
+        An update rebuilds the chains on one root to leaf path: O(logn) bridges, each found by a binary search and
+        spliced in O(logn), for O(log^2n) per update
+        Collinear points are left off of the hull
+    '''
+
+    # a node is rebuilt once one of its children holds less than this fraction of its points
+    BALANCE = 0.25
+
+    def __init__(self, points=()):
+        self.root = None
+        self.n_points = 0
+
+        # the initial points are built into a balanced tree at once, rather than inserted one by one
+        counts = Counter(tuple(point) for point in points)
+        if len(counts) > 0:
+            leaves = [Dynamic_Hull_Node(point, count) for point, count in sorted(counts.items())]
+            self.root = Dynamic_Hull_Node.build(leaves, 0, len(leaves))
+            self.n_points = sum(counts.values())
+
+    def __len__(self):
+        return self.n_points
+
+    def insert(self, point):
+        '''
+            Adds point to the set; points may be added more than once
+        '''
+
+        point = tuple(point)
+        self.n_points += 1
+        if self.root is None:
+            self.root = Dynamic_Hull_Node(point)
+            return
+
+        path = self.find_path(point)
+        leaf = path[-1]
+        if leaf.point == point:
+            leaf.count += 1
+            return
+
+        # split the leaf into an internal node over it and the new point
+        new_leaf = Dynamic_Hull_Node(point)
+        old_leaf = Dynamic_Hull_Node(leaf.point, leaf.count)
+        leaf.point = None
+        leaf.count = 0
+        leaf.left, leaf.right = (new_leaf, old_leaf) if point < old_leaf.point else (old_leaf, new_leaf)
+        leaf.split = leaf.left.point
+        self.update_path(path)
+
+    def delete(self, point):
+        '''
+            Removes one copy of point from the set; raises ValueError if it isn't in the set
+        '''
+
+        point = tuple(point)
+        path = self.find_path(point) if self.root is not None else []
+        if len(path) == 0 or path[-1].point != point:
+            raise ValueError(f'{point} is not in the set')
+
+        self.n_points -= 1
+        leaf = path.pop()
+        leaf.count -= 1
+        if leaf.count > 0:
+            return
+
+        if len(path) == 0:
+            self.root = None
+            return
+
+        # replace the parent of the leaf by the leaf's sibling
+        parent = path.pop()
+        sibling = parent.right if parent.left is leaf else parent.left
+        if len(path) == 0:
+            self.root = sibling
+        elif path[-1].left is parent:
+            path[-1].left = sibling
+        else:
+            path[-1].right = sibling
+        self.update_path(path)
+
+    def hull(self):
+        '''
+            Returns the list of points in CCW order of the current convex hull
+            The first point is the leftmost point, and the first and last points in the list are the same
+        '''
+
+        if self.root is None:
+            return []
+
+        # the chains share the leftmost and rightmost points
+        convex_hull = chain_points(self.root.lower_chain) + chain_points(self.root.upper_chain)[-2 : 0 : -1]
+        convex_hull.append(convex_hull[0])
+        return convex_hull
+
+    def find_path(self, point):
+        '''
+            Returns the nodes from the root to the leaf where point is (or would be) in the tree
+        '''
+
+        path = [self.root]
+        while path[-1].point is None:
+            node = path[-1]
+            path.append(node.left if point <= node.split else node.right)
+
+        return path
+
+    def update_path(self, path):
+        '''
+            Recomputes the chains of the nodes on path (from the root down) after the leaves below them changed,
+            then rebuilds the highest node on it which is out of balance
+        '''
+
+        for node in reversed(path):
+            node.pull()
+
+        for i, node in enumerate(path):
+            if min(node.left.size, node.right.size) < Dynamic_Hull.BALANCE * node.size:
+                leaves = []
+                node.collect_leaves(leaves)
+                rebuilt = Dynamic_Hull_Node.build(leaves, 0, len(leaves))
+                if i == 0:
+                    self.root = rebuilt
+                elif path[i-1].left is node:
+                    path[i-1].left = rebuilt
+                else:
+                    path[i-1].right = rebuilt
+                break
+
+class Dynamic_Hull_Node():
+    '''
+        A node of the tree in Dynamic_Hull: either a leaf holding a point (and how many copies of it are in the set), or an
+        internal node with two children, split by the largest point of its left child
+    '''
+
+    def __init__(self, point=None, count=1):
+        self.point = point
+        self.count = count
+        self.left = None
+        self.right = None
+        self.split = None
+        self.size = 1
+        # a single point is both of its chains
+        self.upper_chain = self.lower_chain = Chain_Node(point) if point is not None else None
+
+    @staticmethod
+    def build(leaves, l, r):
+        '''
+            Returns a perfectly balanced subtree over the lth (inclusive) to rth (exclusive) leaves
+        '''
+
+        if r - l == 1:
+            return leaves[l]
+
+        node = Dynamic_Hull_Node()
+        node.left = Dynamic_Hull_Node.build(leaves, l, l + (r-l)//2)
+        node.right = Dynamic_Hull_Node.build(leaves, l + (r-l)//2, r)
+        node.split = leaves[l + (r-l)//2 - 1].point
+        node.pull()
+        return node
+
+    def collect_leaves(self, leaves):
+        if self.point is not None:
+            leaves.append(self)
+        else:
+            self.left.collect_leaves(leaves)
+            self.right.collect_leaves(leaves)
+
+    def pull(self):
+        '''
+            Recomputes the size and chains of this internal node from its children
+            The chains are joined from pieces of the children's chains, which are shared rather than copied: O(logn)
+        '''
+
+        self.size = self.left.size + self.right.size
+        self.upper_chain = bridge_chains(self.left.upper_chain, self.right.upper_chain, -1)
+        self.lower_chain = bridge_chains(self.left.lower_chain, self.right.lower_chain, 1)
+
+class Chain_Node():
+    '''
+        A node of a chain of a Dynamic_Hull_Node: the chains are treaps in sorted order which are never changed once
+        built, so the chains of different nodes share their subtrees, and are split and joined in O(logn) expected
+        Each node knows the size and the first and last points of its subtree
+    '''
+
+    __slots__ = ('point', 'left', 'right', 'priority', 'size', 'first', 'last')
+
+    def __init__(self, point, left=None, right=None, priority=None):
+        self.point = point
+        self.left = left
+        self.right = right
+        self.priority = random() if priority is None else priority
+        self.size = 1
+        self.first = self.last = point
+        if left is not None:
+            self.size += left.size
+            self.first = left.first
+        if right is not None:
+            self.size += right.size
+            self.last = right.last
+
+def chain_size(chain):
+    return chain.size if chain is not None else 0
+
+def join_chains(left_chain, right_chain):
+    '''
+        Returns the chain of the points of left_chain followed by those of right_chain, without changing either
+    '''
+
+    if left_chain is None:
+        return right_chain
+    if right_chain is None:
+        return left_chain
+
+    if left_chain.priority > right_chain.priority:
+        return Chain_Node(left_chain.point, left_chain.left, join_chains(left_chain.right, right_chain), left_chain.priority)
+    return Chain_Node(right_chain.point, join_chains(left_chain, right_chain.left), right_chain.right, right_chain.priority)
+
+def split_chain(chain, k):
+    '''
+        Returns the chains of the first k points of chain and of the rest, without changing chain
+    '''
+
+    if chain is None:
+        return None, None
+
+    left_size = chain_size(chain.left)
+    if k <= left_size:
+        first, rest = split_chain(chain.left, k)
+        return first, Chain_Node(chain.point, rest, chain.right, chain.priority)
+    first, rest = split_chain(chain.right, k - left_size - 1)
+    return Chain_Node(chain.point, chain.left, first, chain.priority), rest
+
+def chain_points(chain):
+    '''
+        Returns the list of the points of chain in order
+    '''
+
+    points = []
+    stack = []
+    while chain is not None or len(stack) > 0:
+        while chain is not None:
+            stack.append(chain)
+            chain = chain.left
+        chain = stack.pop()
+        points.append(chain.point)
+        chain = chain.right
+
+    return points
+
+def bridge_chains(left_chain, right_chain, direction):
+    '''
+        Returns the chain of the points in the sorted chains left_chain and right_chain, where every point of left_chain
+        comes before every point of right_chain and direction is 1 for lower chains and -1 for upper chains
+        Utilizes find_bridge, then splits and joins the chains: O(logn)
+    '''
+
+    i, j = find_bridge(left_chain, right_chain, direction)
+    # the bridge is often between the innermost points, which needs no splits
+    left_part = left_chain if i == left_chain.size - 1 else split_chain(left_chain, i + 1)[0]
+    right_part = right_chain if j == 0 else split_chain(right_chain, j)[1]
+    return join_chains(left_part, right_part)
+
+def find_bridge(left_chain, right_chain, direction):
+    '''
+        Returns the indices in left_chain and right_chain of the ends of the bridge between them, as in bridge_chains
+        An edge of left_chain is on the joined chain if all of right_chain is strictly on its outer side, and an edge of
+        right_chain is if all of left_chain is; those edges are a prefix of left_chain and a suffix of right_chain
+        Both are binary searched at once, Overmars and van Leeuwen's way: each step tests an edge from each chain, and
+        learns which way to go in at least one of them: O(logn)
+    '''
+
+    def outside(point1, point2, point3):
+        # whether point3 is strictly on the outer side of the edge point1-point2 (below for upper chains)
+        return get_side(point1, point2, point3) * direction > 0
+
+    def crossing_before(point1, point2, point3, point4, point):
+        # whether the lines through point1-point2 and point3-point4 cross before point in sorted order, comparing
+        # the y coordinates (by swapping the coordinates of every point) if the crossing is level with point
+        side = crossing_side(point1, point2, point3, point4, point[0])
+        if side == 0:
+            side = crossing_side(*[(y, x) for x, y in (point1, point2, point3, point4)], point[1])
+        return side < 0
+
+    # each search is at a node of its chain, with the index of the node's first point and the point after its subtree
+    left_node, left_offset, left_after = left_chain, 0, None
+    right_node, right_offset, right_after = right_chain, 0, None
+    # the bridge is at the last points of the chains until the searches show otherwise
+    i, left_point = left_chain.size - 1, left_chain.last
+    j, right_point = right_chain.size - 1, right_chain.last
+
+    while left_node is not None or right_node is not None:
+        # left_off is whether the edge after p isn't on the joined chain, and right_on whether the one after q is
+        left_off = right_on = None
+        if left_node is not None:
+            p = left_node.point
+            p_next = left_node.right.first if left_node.right is not None else left_after
+            if p_next is None:
+                left_off = True
+        if right_node is not None:
+            q = right_node.point
+            q_next = right_node.right.first if right_node.right is not None else right_after
+            if q_next is None:
+                right_on = True
+
+        if left_node is not None and right_node is not None:
+            if left_off is None and right_on is None:
+                if not outside(p, p_next, q) or not outside(p, p_next, q_next):
+                    left_off = True
+                if not outside(q, q_next, p) or not outside(q, q_next, p_next):
+                    right_on = False
+                if left_off is None and right_on is None:
+                    # each edge's line is outside of the other edge, so they cross between them; the edge after p is on
+                    # the joined chain if they cross before right_chain (whose points are then all inside of the
+                    # edge after q, which is inside of the edge after p), otherwise the edge after q is
+                    # (before is in sorted order, so a crossing right below the first point of right_chain is before it)
+                    if crossing_before(p, p_next, q, q_next, right_chain.first):
+                        left_off = False
+                    else:
+                        right_on = True
+        elif left_node is not None and left_off is None:
+            # the right end of the bridge is known
+            left_off = not outside(p, p_next, right_point)
+        elif right_node is not None and right_on is None:
+            # the left end of the bridge is known
+            right_on = outside(q, q_next, left_point)
+
+        if left_off is True:
+            i, left_point = left_offset + chain_size(left_node.left), p
+            left_node, left_after = left_node.left, p
+        elif left_off is False:
+            left_offset += chain_size(left_node.left) + 1
+            left_node = left_node.right
+        if right_on is True:
+            j, right_point = right_offset + chain_size(right_node.left), q
+            right_node, right_after = right_node.left, q
+        elif right_on is False:
+            right_offset += chain_size(right_node.left) + 1
+            right_node = right_node.right
+
+    return i, j
+
+def sliding_window_hulls(points, window):
+    '''
+        Generator which yields the convex hull of every window of window consecutive points from the iterable points
+        The first window is built into a Dynamic_Hull at once, then each step inserts the newest point and deletes the
+        oldest one
+    '''
+
+    points = iter(points)
+    recent_points = deque(islice(points, window))
+    if len(recent_points) < window:
+        return
+
+    dynamic_hull = Dynamic_Hull(recent_points)
+    yield dynamic_hull.hull()
+    for point in points:
+        dynamic_hull.insert(point)
+        recent_points.append(point)
+        dynamic_hull.delete(recent_points.popleft())
+        yield dynamic_hull.hull()
+
+HULL_METHODS = {
+    'graham_scan': graham_scan,
+    'gift_wrap': gift_wrap,
+    'divide_conquer': divide_conquer,
+    'monotone_chain': monotone_chain_hull,
+    'chan': chan,
+    'parallel_divide_conquer': parallel_divide_conquer,
+    'quickhull': quickhull_hull,
+}
+
+# the methods which give the indices of the hull's points in an array, rather than the points
+HULL_INDEX_METHODS = {
+    'monotone_chain': monotone_chain,
+    'quickhull': quickhull,
+}
+
 if __name__ == "__main__":
     main(sys.argv)
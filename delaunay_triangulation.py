@@ -1,24 +1,36 @@
 '''
     File: delaunay_triangulation.py
     Author: Drew Scott
-    Description:
+    Description: Visualizes the construction of the Delaunay triangulation of a set of points
+    Usage: python3 delaunay_triangulation.py [method] [--fps=<fps>] [--skip] [--budget=<seconds>]
+        * method can be: incremental (the default), divide_conquer
+        * --fps limits how often the screen is redrawn, --skip only draws the triangulation, and --budget skips to the
+          triangulation once the animation has taken that many seconds
 '''
 
-from random import randint, choice
-from turtle import Turtle, Screen
-from time import sleep
+from random import randrange, shuffle
 import sys
 
+import numpy as np
+
 from convex_hull import divide_conquer
-from util import get_side, prev_ccw, next_ccw, draw_connect_points, DOT_RADIUS, BORDER_PADDING, DCEL, Vertex_DCEL, HalfEdge_DCEL, Face_DCEL
+from render import parse_frame_flags, Frame_Renderer
+from util import get_side, get_sides, in_circle, brio_order, draw_connect_points, as_point_set, sorted_unique_points, DOT_RADIUS, DCEL, HalfEdge_DCEL, Face_DCEL
 
 N_POINTS = 100
+TIME_STEP_DELAY = 0.1
 BOTTOM_TEXT_HEIGHT = 0
 
+# nodes with at least this many children test them all at once with get_sides
+BATCH_CHILDREN = 8
+
 def main(args):
+    args, frame_options = parse_frame_flags(args)
+
+    from turtle import Turtle, Screen
+
     # set up the screen
-    screen = Screen()
-    width, height = screen.window_width(), screen.window_height()
+    screen = Frame_Renderer(Screen(), **frame_options)
     screen.tracer(0, 0)
 
     # generate and draw the points
@@ -27,258 +39,663 @@ def main(args):
     points_turtle = Turtle(visible=False)
     points_turtle.speed(0)
     for i in range(N_POINTS):
-#        new_loc = (randint((-width//2) + BORDER_PADDING, (width//2) - BORDER_PADDING), randint((-height//2) + BORDER_PADDING + BOTTOM_TEXT_HEIGHT, (height//2) - BORDER_PADDING))
-#        points.append(new_loc)
         points_turtle.penup()
         points_turtle.setposition(points[i])
         points_turtle.pendown()
         points_turtle.dot(DOT_RADIUS, 'black')
     screen.update()
-    print(points)
 
-    # compute the triangulation
-    delaunay_dag = delaunay_triangulation(points, screen, True)
-    draw_dag(delaunay_dag, screen)
+    # compute and draw the triangulation
+    method = args[1] if len(args) > 1 else 'incremental'
+    dcel = triangulate(points, method, Turtle_Delaunay_Observer(screen))
+    draw_triangulation(dcel, screen)
 
     screen.exitonclick()
 
-def draw_dag(dag, screen):
-    if len(dag.children) == 0:
-        # at the leaf, so draw this triangle
-        turtle = Turtle(visible=False)
-        turtle.speed(0)
-        turtle.penup()
-        turtle.setposition(dag.vertices[0])
-        turtle.pendown()
-        turtle.goto(dag.vertices[1])
-        turtle.goto(dag.vertices[2])
-        turtle.goto(dag.vertices[0])
-        screen.update()
-    else:
-        for child in dag.children:
-            draw_dag(child, screen)
+def draw_triangulation(dcel, screen):
+    '''
+        Draws every triangle of the triangulation in dcel
+    '''
+
+    from turtle import Turtle
+
+    turtle = Turtle(visible=False)
+    turtle.speed(0)
+    for face in dcel.faces:
+        triangle = [face.edge.origin_vertex.coordinate, face.edge.next.origin_vertex.coordinate, face.edge.prev.origin_vertex.coordinate]
+        draw_connect_points(triangle + [triangle[0]], screen, turtle)
+
+class Delaunay_Observer():
+    '''
+        Receives the intermediate states of delaunay_triangulation
+        Every callback does nothing by default; subclasses override the ones they care about
+    '''
+
+    def on_hull(self, convex_hull):
+        '''
+            Called with the convex hull which is triangulated first
+        '''
+
+        pass
+
+    def on_insert(self, point):
+        '''
+            Called with each point before it is inserted into the triangulation
+        '''
+
+        pass
+
+    def on_flip(self, old_edge, new_edge):
+        '''
+            Called with the endpoints of the old and new edge of each edge flip
+        '''
+
+        pass
+
+    def on_locate(self, point, n_visited):
+        '''
+            Called with each point located in the DAG, and the number of DAG nodes tested (by locate_child) to find it
+        '''
+
+        pass
+
+    def on_merge(self, cross_edges):
+        '''
+            Called by delaunay_divide_conquer with the endpoints of the edges added between the halves by each merge
+        '''
+
+        pass
+
+class Turtle_Delaunay_Observer(Delaunay_Observer):
+    '''
+        Draws the intermediate states of delaunay_triangulation using turtle
+    '''
+
+    def __init__(self, screen):
+        from turtle import Turtle
+
+        self.screen = screen if isinstance(screen, Frame_Renderer) else Frame_Renderer(screen)
+
+        self.hull_turtle = Turtle(visible=False)
+        self.hull_turtle.speed(0)
+        self.point_turtle = Turtle(visible=False)
+        self.point_turtle.speed(0)
+        self.point_turtle.penup()
+        self.flip_turtle = Turtle(visible=False)
+        self.flip_turtle.speed(0)
+        self.flip_turtle.pencolor('red')
+        self.merge_turtle = Turtle(visible=False)
+        self.merge_turtle.speed(0)
+        self.merge_turtle.pencolor('blue')
+
+    def on_hull(self, convex_hull):
+        draw_connect_points(convex_hull, self.screen, self.hull_turtle)
+
+    def on_insert(self, point):
+        self.point_turtle.setposition(point)
+        self.point_turtle.dot(DOT_RADIUS, 'green')
+        self.screen.update()
+
+    def on_flip(self, old_edge, new_edge):
+        self.flip_turtle.clear()
+        draw_connect_points(list(new_edge), self.screen, self.flip_turtle)
+        self.screen.pause(TIME_STEP_DELAY)
+
+    def on_merge(self, cross_edges):
+        for edge in cross_edges:
+            draw_connect_points(list(edge), self.screen, self.merge_turtle)
+        self.screen.pause(TIME_STEP_DELAY)
+
+def triangulate(points, method='incremental', observer=None, dcel=None):
+    '''
+        Returns a DCEL of the Delaunay triangulation of the set of points
+        method can be: incremental, divide_conquer
+        points can be a list of points or a PointSet, whose sorted order is kept for the next method run on it
+        The triangulation is built in dcel if given, otherwise in a new DCEL
+    '''
+
+    if method not in DELAUNAY_METHODS:
+        raise ValueError(f'unknown Delaunay triangulation method: {method}')
+
+    return DELAUNAY_METHODS[method](points, observer, dcel)
 
 class Delaunay_DAG_Node():
     def __init__(self):
         self.children = []
         self.vertices = None
         self.dcel_face: Face_DCEL = None
+        self.child_edges = None
 
     def add_child(self, child_node):
         self.children.append(child_node)
+        self.child_edges = None
 
     def set_vertices(self, vertices):
         self.vertices = vertices
 
+    def get_sides(self, point):
+        '''
+            Returns which side point is on of each edge of this triangle
+        '''
+
+        return [
+            get_side(self.vertices[0], self.vertices[1], point),
+            get_side(self.vertices[1], self.vertices[2], point),
+            get_side(self.vertices[2], self.vertices[0], point),
+        ]
+
     def is_inside(self, point):
         if self.vertices is None:
             return False
 
         # a point is inside this triangle if is to the left of all the segments or the right of all the segments
-        if (
-            (get_side(self.vertices[0], self.vertices[1], point) > 0 and
-            get_side(self.vertices[1], self.vertices[2], point) > 0 and
-            get_side(self.vertices[2], self.vertices[0], point) > 0)
-            or
-            (get_side(self.vertices[0], self.vertices[1], point) < 0 and
-            get_side(self.vertices[1], self.vertices[2], point) < 0 and
-            get_side(self.vertices[2], self.vertices[0], point) < 0)
-        ):
-            return True
-        else:
-            return False
+        sides = self.get_sides(point)
+        return min(sides) > 0 or max(sides) < 0
 
     def on_edge(self, point):
-        if (
-            (get_side(self.vertices[0], self.vertices[1], point) == 0 or
-            get_side(self.vertices[1], self.vertices[2], point) == 0 or
-            get_side(self.vertices[2], self.vertices[0], point) == 0)
-        ):
-            return True
-        else:
-            return False
-
-def delaunay_triangulation(points, screen, show_states):
+        # a point is on an edge if it is collinear with it and not outside of the triangle
+        sides = self.get_sides(point)
+        return 0 in sides and (min(sides) >= 0 or max(sides) <= 0)
+
+    def locate_child(self, point):
+        '''
+            Returns the child whose triangle contains point, whether point is on one of its edges, and the number of
+            children tested
+            Returns None, False, <number of children> if no child contains point
+            Wide nodes (such as the fan which triangulates the convex hull) test every edge of every child at once with get_sides
+        '''
+
+        if len(self.children) < BATCH_CHILDREN:
+            for i, child_node in enumerate(self.children):
+                sides = child_node.get_sides(point)
+                if min(sides) >= 0 or max(sides) <= 0:
+                    return child_node, 0 in sides, i + 1
+            return None, False, len(self.children)
+
+        if self.child_edges is None:
+            # the start and end points of the three edges of every child, cached until another child is added
+            starts = np.array([child_node.vertices for child_node in self.children])
+            self.child_edges = (starts.reshape(-1, 2), np.roll(starts, -1, axis=1).reshape(-1, 2))
+
+        sides = get_sides(self.child_edges[0], self.child_edges[1], [point]).reshape(-1, 3)
+        contains = np.all(sides >= 0, axis=1) | np.all(sides <= 0, axis=1)
+        i = np.argmax(contains)
+        if not contains[i]:
+            return None, False, len(self.children)
+        return self.children[i], bool(np.any(sides[i] == 0)), len(self.children)
+
+def delaunay_triangulation(points, observer=None, dcel=None, point_location='dag'):
     '''
+        Returns a DCEL of the Delaunay triangulation of the set of points
+        The boundary half edges have no twin, and there is no face for the outside of the convex hull
+        The triangulation is built in dcel if given (e.g. an empty Array_DCEL, for large inputs), otherwise in a new DCEL
+        Reports the steps taken in the processing to observer, if given
+        Uses the randomized incremental approach: O(nlogn) expected, where n is the number of points
+        Triangulates the convex hull as a fan and makes it Delaunay, then inserts the other points; the edges around each
+        inserted point are legalized by edge flips
+        point_location can be:
+            * dag: points are inserted in random order, and located with the DAG of the triangles' history
+            * walk: points are inserted in BRIO order, and located by walk_to_point from the last inserted point, so
+              that no history is kept at all
     '''
 
-    # compute and draw the convex hull
-    convex_hull = divide_conquer(points, screen, False)
+    if point_location not in ('dag', 'walk'):
+        raise ValueError(f'unknown point location strategy: {point_location}')
+
+    # duplicate points can't be inserted; divide_conquer reuses the PointSet's sorted order rather than sorting again
+    point_set = as_point_set(points)
+    points = point_set.sorted_points()
+    if dcel is None:
+        dcel = DCEL()
+    if len(points) == 0:
+        # there is no convex hull to start from, and no triangles
+        return dcel
+
+    # compute the convex hull
+    convex_hull = divide_conquer(point_set)
+    if observer is not None:
+        observer.on_hull(convex_hull)
+    convex_hull.pop()
+
+    if len(convex_hull) < 3:
+        # all of the points are collinear, so there are no triangles
+        for point in points:
+            dcel.add_vertex(point)
+        return dcel
+
+    # build the fan from the first point of the convex hull to all of the others
+    if point_location == 'dag':
+        root = Delaunay_DAG_Node()
+        leaves = {}
+    else:
+        root = None
+        leaves = None
+    hull_vertices = [dcel.add_vertex(point) for point in convex_hull]
+    fan_edges = []
+    prev_edge: HalfEdge_DCEL = None
+    for i in range(1, len(hull_vertices) - 1):
+        edge1 = dcel.add_half_edge(hull_vertices[0])
+        edge2 = dcel.add_half_edge(hull_vertices[i])
+        edge3 = dcel.add_half_edge(hull_vertices[i + 1])
+        hull_vertices[i].incident_edge = edge2
+        add_triangle(dcel, leaves, [edge1, edge2, edge3], [root])
+
+        if prev_edge is not None:
+            set_twins(edge1, prev_edge)
+            fan_edges.append(edge1)
+        prev_edge = edge3
+    hull_vertices[0].incident_edge = prev_edge.next
+    hull_vertices[-1].incident_edge = prev_edge
+
+    # the fan is a triangulation, so flipping its illegal edges makes it Delaunay
+    legalize_edges(dcel, leaves, fan_edges, observer)
+
+    # insert the rest of the points
     convex_hull_set = set(convex_hull)
-    if show_states:
-        ch_turtle = Turtle(visible=False)
-        ch_turtle.speed(0)
-        draw_connect_points(convex_hull, screen, ch_turtle)
-
-    # build the triangulation
-    root = None
-    dcel = DCEL()
-    for point in points:
-        if point in convex_hull_set:
-            continue
+    inner_points = [point for point in points if point not in convex_hull_set]
+    if point_location == 'dag':
+        shuffle(inner_points)
+    else:
+        inner_points = [inner_points[i] for i in brio_order(inner_points)]
 
-        if root is None:
-            # connect the first point to all the points on the convex hull
-            root = Delaunay_DAG_Node()
-            center_vertex: Vertex_DCEL = Vertex_DCEL(point)
-            prev_vertex: Vertex_DCEL = None
-            first_edge: HalfEdge_DCEL = None
-            prev_edge: HalfEdge_DCEL = None
-
-            for i, ch_point in enumerate(convex_hull):
-                if i == 0:
-                    prev_vertex = Vertex_DCEL(ch_point)
-                    continue
-
-                # add this triangle to the DCEL
-                new_vertex = Vertex_DCEL(ch_point)
-                edge1 = HalfEdge_DCEL(prev_vertex)
-                edge2 = HalfEdge_DCEL(new_vertex)
-                edge3 = HalfEdge_DCEL(center_vertex)
-                new_face = Face_DCEL()
-
-                new_vertex.incident_edge = edge1
-                new_face.edge = edge1
-                edge1.incident_face = new_face 
-                edge2.incident_face = new_face 
-                edge3.incident_face = new_face 
-                edge1.next = edge2 
-                edge2.next = edge3
-                edge3.next = edge1 
-                edge1.prev = edge3
-                edge2.prev = edge1
-                edge3.prev = edge2
-                if i > 1:
-                    edge3.twin = prev_edge
-                    prev_edge.twin = edge3
-                    if i == len(convex_hull) - 1:
-                        first_edge.twin = edge2
-                        edge2.twin = first_edge
-                else:
-                    first_edge = edge3
-                    prev_edge = edge2 
-
-                dcel.vertices.append(new_vertex)
-                dcel.half_edges.append(edge1)
-                dcel.half_edges.append(edge2)
-                dcel.half_edges.append(edge3)
-                dcel.faces.append(new_face)
-
-                prev_vertex = new_vertex 
-
-                # add this triangle to the DAG
-                new_node = Delaunay_DAG_Node()
-                new_node.set_vertices([convex_hull[i - 1], ch_point, point])
-                new_node.dcel_face = new_face
-                root.add_child(new_node)
-        else:
+    last_face = hull_vertices[0].incident_edge.incident_face
+    for point in inner_points:
+        if observer is not None:
+            observer.on_insert(point)
+
+        if point_location == 'dag':
             # traverse the DAG into the leaf node which contains the point
             cur_node = root
             on_edge = False
-            is_inside = False
+            n_visited = 0
             while len(cur_node.children) > 0:
-                for child_node in cur_node.children:
-                    is_inside = child_node.is_inside(point)
-                    on_edge = child_node.on_edge(point)
-                    if is_inside or on_edge:
-                        cur_node = child_node
-                        break
-
-                if not is_inside and not on_edge:
-                    assert(False)
-
-            # split the triangle appropriately
-            if is_inside:
-                new_vertex = Vertex_DCEL(point)
-                dcel.vertices.append(new_vertex)
-
-                # get the face which contains this point from the dcel
-                big_face = cur_node.dcel_face
-                outer_edge1 = big_face.edge
-                outer_edge2 = outer_edge1.next
-                outer_edge3 = outer_edge2.next
-                dcel.faces.remove(big_face)
-
-                # create the new half edges for the 3 newly created faces
-                new_face1 = Face_DCEL()
-                new_edge11 = HalfEdge_DCEL(new_vertex)
-                new_edge11.next = outer_edge1
-                outer_edge1.prev = new_edge11
-                new_edge12 = HalfEdge_DCEL(outer_edge1.next.origin_vertex)
-                outer_edge1.next = new_edge12
-                new_edge12.prev = outer_edge1
-                new_edge12.next = new_edge11
-                new_edge11.prev = new_edge12
-                dcel.faces.append(new_face1)
-                dcel.half_edges.append(new_edge11)
-                dcel.half_edges.append(new_edge12)
-
-                new_face2 = Face_DCEL()
-                new_edge21 = HalfEdge_DCEL(new_vertex)
-                new_edge21.next = outer_edge2
-                outer_edge2.prev = new_edge21
-                new_edge22 = HalfEdge_DCEL(outer_edge2.next.origin_vertex)
-                outer_edge2.next = new_edge22
-                new_edge22.prev = outer_edge2
-                new_edge22.next = new_edge21
-                new_edge21.prev = new_edge22
-                dcel.faces.append(new_face2)
-                dcel.half_edges.append(new_edge21)
-                dcel.half_edges.append(new_edge22)
-
-                new_face3 = Face_DCEL()
-                new_edge31 = HalfEdge_DCEL(new_vertex)
-                new_edge31.next = outer_edge3
-                outer_edge3.prev = new_edge31
-                new_edge32 = HalfEdge_DCEL(outer_edge3.next.origin_vertex)
-                outer_edge3.next = new_edge32
-                new_edge32.prev = outer_edge3
-                new_edge32.next = new_edge31
-                new_edge31.prev = new_edge32
-                dcel.faces.append(new_face3)
-                dcel.half_edges.append(new_edge31)
-                dcel.half_edges.append(new_edge32)
-
-                # set the twin edges for each new edge
-                new_edge11.twin = new_edge32
-                new_edge32.twin = new_edge11
-                new_edge21.twin = new_edge12
-                new_edge12.twin = new_edge21
-                new_edge31.twin = new_edge22
-                new_edge22.twin = new_edge31
-
-                # create DAG nodes for the faces
-                new_node1 = Delaunay_DAG_Node()
-                new_node1.set_vertices([point, outer_edge1.origin_vertex.coordinate, new_edge12.origin_vertex.coordinate])
-                new_node1.dcel_face = new_face1`
-                cur_node.add_child(new_node1)
-                new_node2 = Delaunay_DAG_Node()
-                new_node1.set_vertices([point, outer_edge2.origin_vertex.coordinate, new_edge22.origin_vertex.coordinate])
-                new_node2.dcel_face = new_face2
-                cur_node.add_child(new_node2)
-                new_node3 = Delaunay_DAG_Node()
-                new_node1.set_vertices([point, outer_edge3.origin_vertex.coordinate, new_edge32.origin_vertex.coordinate])
-                new_node3.dcel_face = new_face3
-                cur_node.add_child(new_node3)
-
-                # check for edge flips
-                edge_flip(outer_edge1)
-                edge_flip(outer_edge2)
-                edge_flip(outer_edge3)
-            elif on_edge:
-                # TODO
-                turtle.penup()
-                turtle.setposition(point)
-                turtle.pendown()
-                turtle.dot(DOT_RADIUS, 'green')
-            else:
-                assert(False)
-
-    return root
-
-def edge_flip(dcel_edge):
-    # TODO
-   pass  
+                cur_node, on_edge, n_tested = cur_node.locate_child(point)
+                n_visited += n_tested
+                assert cur_node is not None, f'{point} is outside of the triangulation'
+            if observer is not None:
+                observer.on_locate(point, n_visited)
+
+            face = cur_node.dcel_face
+            edge = edge_containing(face, point) if on_edge else None
+        else:
+            face, edge = walk_to_point(last_face, point)
+
+        # split the triangle (or the two triangles of the edge) containing the point
+        new_vertex = dcel.add_vertex(point)
+        if edge is not None:
+            outer_edges = split_edge(dcel, leaves, edge, new_vertex)
+        else:
+            outer_edges = split_face(dcel, leaves, face, new_vertex)
+        last_face = new_vertex.incident_edge.incident_face
+
+        # check for edge flips
+        legalize_edges(dcel, leaves, outer_edges, observer)
+
+    return dcel
+
+def walk_to_point(face, point):
+    '''
+        Returns the triangle containing point, and the edge of it which point is on (or None), by walking from face
+        Uses the remembering stochastic walk: repeatedly crosses an edge which point is to the right of, checking the
+        edges of each triangle starting at a random one and skipping the edge the walk came in through
+    '''
+
+    edge = face.edge
+    came_from = None
+    while True:
+        for _ in range(randrange(3)):
+            edge = edge.next
+
+        on_edge = None
+        for _ in range(3):
+            if edge != came_from:
+                side = get_side(edge.origin_vertex.coordinate, edge.next.origin_vertex.coordinate, point)
+                if side < 0:
+                    break
+                if side == 0:
+                    on_edge = edge
+            edge = edge.next
+        else:
+            # point is not to the right of any edge, so this triangle contains it
+            return edge.incident_face, on_edge
+
+        came_from = edge.twin
+        assert came_from is not None, f'{point} is outside of the triangulation'
+        edge = came_from
+
+def edge_containing(face, point):
+    '''
+        Returns the edge of the triangle face which point is on
+    '''
+
+    edge = face.edge
+    while get_side(edge.origin_vertex.coordinate, edge.next.origin_vertex.coordinate, point) != 0:
+        edge = edge.next
+
+    return edge
+
+def add_triangle(dcel, leaves, edges, parent_nodes):
+    '''
+        Links the three half edges into a new triangle of dcel, and adds a leaf for it under each of parent_nodes
+        The DAG is skipped when leaves is None
+    '''
+
+    for i, edge in enumerate(edges):
+        edge.next = edges[(i + 1) % 3]
+        edge.prev = edges[i - 1]
+    face = dcel.add_face(edges[0])
+    if leaves is None:
+        return
+
+    new_node = Delaunay_DAG_Node()
+    new_node.set_vertices([edge.origin_vertex.coordinate for edge in edges])
+    new_node.dcel_face = face
+    for parent_node in parent_nodes:
+        parent_node.add_child(new_node)
+    leaves[face] = new_node
+
+def remove_triangle(dcel, leaves, face):
+    '''
+        Removes the triangle face from dcel; returns its leaf in the DAG, which its replacements go under
+    '''
+
+    dcel.remove_face(face)
+    return leaves.pop(face) if leaves is not None else None
+
+def set_twins(edge1, edge2):
+    edge1.twin = edge2
+    edge2.twin = edge1
+
+def split_face(dcel, leaves, face, new_vertex):
+    '''
+        Splits the triangle face into three triangles around new_vertex, which is inside of it
+        Returns the edges of the old triangle, which may now be illegal
+    '''
+
+    outer_edges = [face.edge, face.edge.next, face.edge.prev]
+    outer_vertices = [edge.origin_vertex for edge in outer_edges]
+    node = remove_triangle(dcel, leaves, face)
+
+    # the new triangle of each outer edge is closed by an edge to new_vertex and an edge back from it
+    to_new_edges = [dcel.add_half_edge(outer_vertices[(i + 1) % 3]) for i in range(3)]
+    from_new_edges = [dcel.add_half_edge(new_vertex) for _ in range(3)]
+    for i in range(3):
+        add_triangle(dcel, leaves, [outer_edges[i], to_new_edges[i], from_new_edges[i]], [node])
+    for i in range(3):
+        set_twins(to_new_edges[i], from_new_edges[(i + 1) % 3])
+    new_vertex.incident_edge = from_new_edges[0]
+
+    return outer_edges
+
+def split_edge(dcel, leaves, edge, new_vertex):
+    '''
+        Splits edge, which new_vertex is on, along with the triangles on either side of it
+        Returns the remaining edges of the old triangles, which may now be illegal
+    '''
+
+    # edge runs from vertex a to vertex b, with c opposite to it
+    next_edge, prev_edge, twin = edge.next, edge.prev, edge.twin
+    node = remove_triangle(dcel, leaves, edge.incident_face)
+
+    # edge becomes a -> new_vertex
+    new_to_c = dcel.add_half_edge(new_vertex)
+    c_to_new = dcel.add_half_edge(prev_edge.origin_vertex)
+    new_to_b = dcel.add_half_edge(new_vertex)
+    add_triangle(dcel, leaves, [edge, new_to_c, prev_edge], [node])
+    add_triangle(dcel, leaves, [new_to_b, next_edge, c_to_new], [node])
+    set_twins(new_to_c, c_to_new)
+    new_vertex.incident_edge = new_to_c
+    outer_edges = [next_edge, prev_edge]
+
+    if twin is not None:
+        # the twin runs from b to a, with d opposite to it; it becomes b -> new_vertex
+        twin_next_edge, twin_prev_edge = twin.next, twin.prev
+        twin_node = remove_triangle(dcel, leaves, twin.incident_face)
+
+        new_to_d = dcel.add_half_edge(new_vertex)
+        d_to_new = dcel.add_half_edge(twin_prev_edge.origin_vertex)
+        new_to_a = dcel.add_half_edge(new_vertex)
+        add_triangle(dcel, leaves, [twin, new_to_d, twin_prev_edge], [twin_node])
+        add_triangle(dcel, leaves, [new_to_a, twin_next_edge, d_to_new], [twin_node])
+        set_twins(new_to_d, d_to_new)
+        set_twins(edge, new_to_a)
+        set_twins(twin, new_to_b)
+        outer_edges.extend([twin_next_edge, twin_prev_edge])
+
+    return outer_edges
+
+def legalize_edges(dcel, leaves, edges, observer):
+    '''
+        Flips edges, and the edges around each flipped edge, until none of them are illegal
+        An edge is illegal if the point opposite to it in one of its triangles is inside the circle through the other
+    '''
+
+    edges = list(edges)
+    while len(edges) > 0:
+        edge = edges.pop()
+        if edge.twin is None:
+            continue
+
+        if in_circle(
+            edge.origin_vertex.coordinate, edge.next.origin_vertex.coordinate, edge.prev.origin_vertex.coordinate,
+            edge.twin.prev.origin_vertex.coordinate
+        ) > 0:
+            edges.extend(edge_flip(dcel, leaves, edge, observer))
+
+def edge_flip(dcel, leaves, dcel_edge, observer=None):
+    '''
+        Replaces the edge a-b, which is between triangles a-b-c and b-a-d, with the edge c-d
+        Both new triangles go under the leaves of both old triangles in the DAG
+        Returns the four edges around the new triangles, which may now be illegal
+    '''
+
+    twin = dcel_edge.twin
+    next_edge, prev_edge = dcel_edge.next, dcel_edge.prev
+    twin_next_edge, twin_prev_edge = twin.next, twin.prev
+    a, b = dcel_edge.origin_vertex, twin.origin_vertex
+    c, d = prev_edge.origin_vertex, twin_prev_edge.origin_vertex
+    parent_nodes = [remove_triangle(dcel, leaves, dcel_edge.incident_face), remove_triangle(dcel, leaves, twin.incident_face)]
+
+    # the edge becomes d -> c and its twin becomes c -> d
+    dcel_edge.origin_vertex = d
+    twin.origin_vertex = c
+    add_triangle(dcel, leaves, [twin_next_edge, dcel_edge, prev_edge], parent_nodes)
+    add_triangle(dcel, leaves, [next_edge, twin, twin_prev_edge], parent_nodes)
+    a.incident_edge = twin_next_edge
+    b.incident_edge = next_edge
+
+    if observer is not None:
+        observer.on_flip((a.coordinate, b.coordinate), (c.coordinate, d.coordinate))
+    return [twin_next_edge, prev_edge, next_edge, twin_prev_edge]
+
+def delaunay_divide_conquer(points, observer=None, dcel=None):
+    '''
+        Returns a DCEL of the Delaunay triangulation of the set of points, in the same form as delaunay_triangulation
+        The triangulation is built in dcel if given, otherwise in a new DCEL
+        Reports the steps taken in the processing to observer, if given
+        Uses the Guibas-Stolfi Divide and Conquer approach: O(nlogn), where n is the number of points
+        Utilizes delaunay_divide_conquer_util
+    '''
+
+    # duplicate points would make the base cases degenerate
+    points = sorted_unique_points(points)
+
+    if dcel is None:
+        dcel = DCEL()
+    vertices = [dcel.add_vertex(point) for point in points]
+    if len(points) < 2:
+        return dcel
+
+    # while merging, every edge has both half edges, including the ones on the outside of the convex hull
+    hull_edge, _ = delaunay_divide_conquer_util(dcel, vertices, 0, len(vertices), observer)
+
+    # the half edges on the outside of the convex hull form one cycle, which has no face
+    outer_edges = []
+    edge = hull_edge.twin
+    while True:
+        outer_edges.append(edge)
+        edge = edge.next
+        if edge == hull_edge.twin:
+            break
+    outer_edges_set = set(outer_edges)
+
+    if observer is not None:
+        convex_hull = [edge.origin_vertex.coordinate for edge in reversed(outer_edges)]
+        observer.on_hull(convex_hull + [convex_hull[0]])
+
+    for edge in outer_edges:
+        if edge.twin not in outer_edges_set:
+            edge.twin.twin = None
+    for edge in outer_edges:
+        dcel.remove_half_edge(edge)
+
+    # every other cycle is a triangle
+    for edge in dcel.half_edges:
+        edge.origin_vertex.incident_edge = edge
+        if edge.incident_face is None:
+            dcel.add_face(edge)
+
+    return dcel
+
+def delaunay_divide_conquer_util(dcel, vertices, l, r, observer):
+    '''
+        Triangulates the vertices between the lth (inclusive) and rth (exclusive) index in vertices using a recursive approach
+        The vertices must be sorted and distinct, and there must be at least 2 of them
+        Returns the CCW convex hull edge out of the leftmost vertex, and the CW convex hull edge out of the rightmost vertex
+    '''
+
+    if r - l == 2:
+        # base case: a single edge
+        edge = make_edge(dcel, vertices[l], vertices[l + 1])
+        return edge, edge.twin
+
+    if r - l == 3:
+        # base case: a triangle, or two edges if the points are collinear
+        a, b, c = [vertex.coordinate for vertex in vertices[l : r]]
+        edge1 = make_edge(dcel, vertices[l], vertices[l + 1])
+        edge2 = make_edge(dcel, vertices[l + 1], vertices[l + 2])
+        splice(edge1.twin, edge2)
+
+        side = get_side(a, b, c)
+        if side > 0:
+            connect(dcel, edge2, edge1)
+            return edge1, edge2.twin
+        elif side < 0:
+            edge3 = connect(dcel, edge2, edge1)
+            return edge3.twin, edge3
+        return edge1, edge2.twin
+
+    # triangulate the left and right halves of the point set recursively
+    left_out, left_in = delaunay_divide_conquer_util(dcel, vertices, l, l + (r-l)//2, observer)
+    right_in, right_out = delaunay_divide_conquer_util(dcel, vertices, l + (r-l)//2, r, observer)
+
+    # walk along the hulls to the lower common tangent, the same way as merge_hulls in convex_hull.py
+    while True:
+        if get_side(left_in.origin_vertex.coordinate, left_in.twin.origin_vertex.coordinate, right_in.origin_vertex.coordinate) > 0:
+            left_in = left_in.next
+        elif get_side(right_in.origin_vertex.coordinate, right_in.twin.origin_vertex.coordinate, left_in.origin_vertex.coordinate) < 0:
+            right_in = right_in.twin.prev.twin
+        else:
+            break
+
+    # the lower common tangent is the first cross edge, from the right half to the left half
+    base = connect(dcel, right_in.twin, left_in)
+    if left_in.origin_vertex == left_out.origin_vertex:
+        left_out = base.twin
+    if right_in.origin_vertex == right_out.origin_vertex:
+        right_out = base
+    cross_edges = [base]
+
+    # zip the halves together from the bottom up, deleting the edges which the new cross edges make illegal
+    while True:
+        base_origin, base_dest = base.origin_vertex.coordinate, base.twin.origin_vertex.coordinate
+
+        left_candidate = base.twin.prev.twin
+        left_valid = get_side(base_origin, base_dest, left_candidate.twin.origin_vertex.coordinate) < 0
+        if left_valid:
+            while in_circle(
+                base_dest, base_origin, left_candidate.twin.origin_vertex.coordinate,
+                left_candidate.prev.origin_vertex.coordinate
+            ) > 0:
+                next_candidate = left_candidate.prev.twin
+                delete_edge(dcel, left_candidate)
+                left_candidate = next_candidate
+
+        right_candidate = base.twin.next
+        right_valid = get_side(base_origin, base_dest, right_candidate.twin.origin_vertex.coordinate) < 0
+        if right_valid:
+            while in_circle(
+                base_dest, base_origin, right_candidate.twin.origin_vertex.coordinate,
+                right_candidate.twin.next.twin.origin_vertex.coordinate
+            ) > 0:
+                next_candidate = right_candidate.twin.next
+                delete_edge(dcel, right_candidate)
+                right_candidate = next_candidate
+
+        if not left_valid and not right_valid:
+            # base is the upper common tangent
+            break
+
+        if not left_valid or (right_valid and in_circle(
+            left_candidate.twin.origin_vertex.coordinate, left_candidate.origin_vertex.coordinate,
+            right_candidate.origin_vertex.coordinate, right_candidate.twin.origin_vertex.coordinate
+        ) > 0):
+            base = connect(dcel, right_candidate, base.twin)
+        else:
+            base = connect(dcel, base.twin, left_candidate.twin)
+        cross_edges.append(base)
+
+    if observer is not None:
+        observer.on_merge([(edge.origin_vertex.coordinate, edge.twin.origin_vertex.coordinate) for edge in cross_edges])
+    return left_out, right_out
+
+def make_edge(dcel, a, b):
+    '''
+        Returns the half edge a -> b of a new edge which is not connected to any other edges
+    '''
+
+    edge, twin = dcel.add_half_edge(a), dcel.add_half_edge(b)
+    set_twins(edge, twin)
+    edge.next, edge.prev = twin, twin
+    twin.next, twin.prev = edge, edge
+    return edge
+
+def splice(edge1, edge2):
+    '''
+        The quad edge splice operation: swaps the edges which come after edge1 and edge2 CCW around their origins
+        With half edges, the edge after e CCW around its origin is e.prev.twin, so this swaps the prev edges of edge1
+        and edge2 (along with their next edges)
+    '''
+
+    prev1, prev2 = edge1.prev, edge2.prev
+    edge1.prev, prev2.next = prev2, edge1
+    edge2.prev, prev1.next = prev1, edge2
+
+def connect(dcel, edge1, edge2):
+    '''
+        Returns the half edge of a new edge from the end of edge1 to the start of edge2, so that edge1, the new edge and
+        edge2 are consecutive edges of the same face
+    '''
+
+    edge = make_edge(dcel, edge1.twin.origin_vertex, edge2.origin_vertex)
+    splice(edge, edge1.next)
+    splice(edge.twin, edge2)
+    return edge
+
+def delete_edge(dcel, edge):
+    '''
+        Disconnects edge from the rest of the edges, and removes both of its half edges from dcel
+    '''
+
+    splice(edge, edge.twin.next)
+    splice(edge.twin, edge.next)
+    dcel.remove_half_edge(edge.twin)
+    dcel.remove_half_edge(edge)
+
+DELAUNAY_METHODS = {
+    'incremental': delaunay_triangulation,
+    'divide_conquer': delaunay_divide_conquer,
+}
 
 if __name__ == '__main__':
     main(sys.argv)
@@ -0,0 +1,220 @@
+'''
+    File: instrumentation.py
+    Author: Drew Scott
+    Description: Opt-in counters and timers for the convex hull and Delaunay triangulation algorithms; nothing here
+        runs unless it is used, since without an observer or a Predicate_Counter the algorithms are unchanged
+    Usage: python3 instrumentation.py <algorithm> <method> [n_points] [stats path]
+        * algorithm can be: hull, delaunay
+        * method is any method of hull or triangulate
+        * the stats are printed, and written to stats path if given: in the pstats format (readable by pstats.Stats
+          and snakeviz) if it ends with .prof, and as JSON otherwise
+'''
+
+from random import random
+from time import perf_counter
+import cProfile
+import json
+import marshal
+import sys
+
+import numpy as np
+
+import convex_hull
+import delaunay_triangulation
+import util
+
+N_POINTS = 10000
+
+def main(args):
+    n_points = int(args[3]) if len(args) > 3 else N_POINTS
+    points = [(random(), random()) for _ in range(n_points)]
+
+    if args[1] == 'hull':
+        _, stats = instrument(convex_hull.hull, points, args[2])
+    elif args[1] == 'delaunay':
+        _, stats = instrument(delaunay_triangulation.triangulate, points, args[2])
+    else:
+        raise ValueError(f'unknown algorithm: {args[1]}')
+
+    print(json.dumps(stats.summary(), indent=1))
+    if len(args) > 4:
+        stats.save(args[4])
+
+class Run_Stats():
+    '''
+        The counters, timers and samples of one instrumented run
+        counts: the number of times each thing happened, by name
+        times: the total seconds spent in each thing, by name
+        samples: the values measured for each thing every time it happened, by name (e.g. the number of DAG nodes
+            tested to locate each point)
+    '''
+
+    def __init__(self):
+        self.counts = {}
+        self.times = {}
+        self.samples = {}
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        self.times[name] = self.times.get(name, 0) + seconds
+
+    def sample(self, name, value):
+        self.samples.setdefault(name, []).append(value)
+
+    def summary(self):
+        '''
+            Returns the stats as a dictionary which can be written as JSON, with each list of samples summarized
+        '''
+
+        return {
+            'counts': dict(self.counts),
+            'times': dict(self.times),
+            'samples': {
+                name: {'n': len(values), 'total': float(np.sum(values)), 'mean': float(np.mean(values)), 'max': float(np.max(values))}
+                for name, values in self.samples.items()
+            },
+        }
+
+    def save(self, path):
+        '''
+            Writes the stats to path, with save_pstats if path ends with .prof and as JSON otherwise
+        '''
+
+        if str(path).endswith('.prof'):
+            self.save_pstats(path)
+        else:
+            with open(path, 'w') as file:
+                json.dump(self.summary(), file, indent=1)
+
+    def save_pstats(self, path):
+        '''
+            Writes the stats to path in the format which cProfile writes, so pstats.Stats can load it
+            Each name is an entry with its count as its number of calls and its time as both its own and cumulative time
+        '''
+
+        stats = {}
+        for name in {*self.counts, *self.times}:
+            calls = self.counts.get(name, 0)
+            seconds = self.times.get(name, 0)
+            stats[('instrumentation', 0, name)] = (calls, calls, seconds, seconds, {})
+
+        with open(path, 'wb') as file:
+            marshal.dump(stats, file)
+
+class Instrumented_Observer():
+    '''
+        Counts the calls of each callback of a Hull_Observer or Delaunay_Observer, and times the calls of observer (if
+        given) which it passes them on to, as the render time
+        The number of DAG nodes tested to locate each point is kept as a sample, and the steps of the common tangents of
+        divide_conquer are counted as tangent_steps (on_tangent is also called with the tangent each walk starts from)
+    '''
+
+    def __init__(self, stats, observer=None):
+        self.stats = stats
+        self.observer = observer
+        # the sides whose tangent walk has started in the current merge
+        self.tangent_sides = set()
+
+    def __getattr__(self, name):
+        if not name.startswith('on_'):
+            raise AttributeError(name)
+
+        stats = self.stats
+        tangent_sides = self.tangent_sides
+        callback = getattr(self.observer, name, None)
+        def instrumented_callback(*args):
+            stats.count(name)
+            if name == 'on_locate':
+                stats.sample('dag_nodes_tested', args[1])
+            elif name == 'on_tangent':
+                # the first tangent of each side in a merge is where its walk starts, and each one after it is a step
+                if args[0] in tangent_sides:
+                    stats.count('tangent_steps')
+                else:
+                    tangent_sides.add(args[0])
+            elif name == 'on_merge':
+                tangent_sides.clear()
+            if callback is not None:
+                start = perf_counter()
+                callback(*args)
+                stats.add_time('render', perf_counter() - start)
+
+        # later calls find the callback without going through __getattr__
+        setattr(self, name, instrumented_callback)
+        return instrumented_callback
+
+class Predicate_Counter():
+    '''
+        Counts the calls of the geometric predicates into counts (by predicate name) while it is entered
+        The modules import the predicates by name, so they are replaced in each module that uses them
+        get_sides is counted by the number of points it is given rather than by calls
+    '''
+
+    PATCHED = [
+        (util, ['get_side', 'get_sides', 'in_circle']),
+        (convex_hull, ['get_side', 'get_sides']),
+        (delaunay_triangulation, ['get_side', 'get_sides', 'in_circle']),
+    ]
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.originals = []
+
+    def __enter__(self):
+        for module, names in self.PATCHED:
+            for name in names:
+                original = getattr(module, name)
+                self.originals.append((module, name, original))
+                setattr(module, name, self.counting(name, original))
+        return self
+
+    def __exit__(self, *exc_info):
+        for module, name, original in self.originals:
+            setattr(module, name, original)
+        self.originals = []
+
+    def counting(self, name, function):
+        counts = self.counts
+        counts.setdefault(name, 0)
+        if name == 'get_sides':
+            def counting_function(point1, point2, points):
+                counts[name] += int(np.prod(np.shape(point1)[ : -1], dtype=np.int64)) * len(points)
+                return function(point1, point2, points)
+        else:
+            def counting_function(*args):
+                counts[name] += 1
+                return function(*args)
+        return counting_function
+
+def instrument(function, *args, observer=None, **kwargs):
+    '''
+        Returns the result of function(*args, observer=<instrumented observer>, **kwargs), and the Run_Stats of the run
+        function is e.g. convex_hull.hull or delaunay_triangulation.triangulate; observer, if given, is still called
+        Note that some methods take slower paths when they are given an observer (gift_wrap isn't batched)
+    '''
+
+    stats = Run_Stats()
+    with Predicate_Counter(stats.counts):
+        start = perf_counter()
+        result = function(*args, observer=Instrumented_Observer(stats, observer), **kwargs)
+        stats.add_time('total', perf_counter() - start)
+
+    return result, stats
+
+def profile(function, *args, path=None, **kwargs):
+    '''
+        Returns the result of function(*args, **kwargs), and the cProfile.Profile of running it
+        The profile is also written to path if given, which pstats.Stats can load
+    '''
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if path is not None:
+        profiler.dump_stats(path)
+
+    return result, profiler
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,263 @@
+'''
+    File: render.py
+    Author: Drew Scott
+    Description: Renders the visualizations: limits how often turtle screens redraw, and renders point clouds and paths
+        to images without turtle, by counting the points in each pixel
+    Usage: imported by the visualizations for their --render=raster mode and frame rate flags
+'''
+
+from time import perf_counter, sleep
+import struct
+import zlib
+
+import numpy as np
+
+RASTER_WIDTH = 800
+RASTER_HEIGHT = 600
+PATH_COLOR = (255, 0, 0)
+FPS = 30
+
+def parse_render_flag(args):
+    '''
+        Returns args without the --render=<mode> flag, and the mode (turtle if the flag isn't given)
+    '''
+
+    mode = 'turtle'
+    other_args = []
+    for arg in args:
+        if arg.startswith('--render='):
+            mode = arg[len('--render=') : ]
+        else:
+            other_args.append(arg)
+
+    if mode not in ('turtle', 'raster'):
+        raise ValueError(f'unknown render mode: {mode}')
+    return other_args, mode
+
+def parse_frame_flags(args):
+    '''
+        Returns args without the frame rate flags, and the keyword arguments for Frame_Renderer which they give:
+            * --fps=<frames per second>
+            * --skip: only draw the end result
+            * --budget=<seconds>: animate for at most this long, then skip to the end
+    '''
+
+    options = {}
+    other_args = []
+    for arg in args:
+        if arg.startswith('--fps='):
+            options['fps'] = float(arg[len('--fps=') : ])
+        elif arg == '--skip':
+            options['mode'] = 'skip'
+        elif arg.startswith('--budget='):
+            options['mode'] = 'budget'
+            options['time_budget'] = float(arg[len('--budget=') : ])
+        else:
+            other_args.append(arg)
+
+    return other_args, options
+
+class Frame_Renderer():
+    '''
+        Wraps a turtle screen so that it redraws at most fps times per second, however often it is updated
+        With tracer(0, 0), the screen holds everything the turtles draw until it is updated, so update() only redraws
+        when a frame is due, and pause() takes the place of sleeping between the steps of an animation
+        mode can be:
+            * animate: every pause is shown and waited out
+            * skip: nothing is redrawn until flush() (or exitonclick()), so only the end result is shown
+            * budget: animates until time_budget seconds have passed since the renderer was made, then skips
+        Every other attribute is the screen's, so it can be passed anywhere a screen is
+    '''
+
+    def __init__(self, screen, fps=FPS, mode='animate', time_budget=None):
+        if mode not in ('animate', 'skip', 'budget'):
+            raise ValueError(f'unknown frame mode: {mode}')
+        if mode == 'budget' and time_budget is None:
+            raise ValueError('budget mode needs a time_budget')
+
+        self.screen = screen
+        self.frame_time = 1 / fps
+        self.mode = mode
+        self.time_budget = time_budget
+        self.start_time = perf_counter()
+        self.last_frame_time = None
+
+    def __getattr__(self, name):
+        return getattr(self.screen, name)
+
+    def skipping(self):
+        '''
+            Returns whether the intermediate frames are currently being skipped
+        '''
+
+        if self.mode == 'budget':
+            return perf_counter() - self.start_time > self.time_budget
+        return self.mode == 'skip'
+
+    def update(self):
+        '''
+            Redraws the screen if a frame is due
+        '''
+
+        if self.skipping():
+            return
+        if self.last_frame_time is None or perf_counter() - self.last_frame_time >= self.frame_time:
+            self.flush()
+
+    def flush(self):
+        '''
+            Redraws the screen now
+        '''
+
+        self.screen.update()
+        self.last_frame_time = perf_counter()
+
+    def pause(self, delay):
+        '''
+            Shows the current step for delay seconds, unless frames are being skipped
+        '''
+
+        if self.skipping():
+            return
+        self.flush()
+        sleep(delay)
+
+    def exitonclick(self):
+        self.flush()
+        self.screen.exitonclick()
+
+class Density_Raster():
+    '''
+        An image of the number of points which land in each pixel, with paths drawn over it
+        bounds is the (min x, min y, max x, max y) of the area which is rendered; points outside of it are dropped
+    '''
+
+    def __init__(self, bounds, width=RASTER_WIDTH, height=RASTER_HEIGHT):
+        self.bounds = tuple(float(bound) for bound in bounds)
+        self.width = width
+        self.height = height
+        self.counts = np.zeros(width * height, dtype=np.int64)
+        self.path_mask = np.zeros(width * height, dtype=bool)
+
+    def pixel_indices(self, points):
+        '''
+            Returns the flat indices of the pixels which points (an (N, 2) array) land in, leaving out points outside
+            of bounds
+            Row 0 is the top of the image, so y is flipped
+        '''
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        min_x, min_y, max_x, max_y = self.bounds
+        columns = np.floor((points[:, 0] - min_x) * (self.width / max(max_x - min_x, np.finfo(float).tiny)))
+        rows = np.floor((max_y - points[:, 1]) * (self.height / max(max_y - min_y, np.finfo(float).tiny)))
+
+        # points exactly on the max bounds belong to the last pixel
+        columns[points[:, 0] == max_x] = self.width - 1
+        rows[points[:, 1] == min_y] = self.height - 1
+        inside = (columns >= 0) & (columns < self.width) & (rows >= 0) & (rows < self.height)
+        return rows[inside].astype(np.intp) * self.width + columns[inside].astype(np.intp)
+
+    def add_points(self, points):
+        '''
+            Adds each of points to the count of the pixel it lands in: O(N) with NumPy, where N is the number of points
+        '''
+
+        self.counts += np.bincount(self.pixel_indices(points), minlength=len(self.counts))
+
+    def add_path(self, points):
+        '''
+            Draws the segments between consecutive points over the density
+        '''
+
+        self.path_mask[self.path_pixels(points)] = True
+
+    def path_pixels(self, points):
+        '''
+            Returns the flat indices of the pixels on the segments between consecutive points, sampling each segment
+            about once per pixel
+        '''
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points) == 1:
+            return self.pixel_indices(points)
+        min_x, min_y, max_x, max_y = self.bounds
+        pixel_size = min((max_x - min_x) / self.width, (max_y - min_y) / self.height)
+        pixel_size = max(pixel_size, np.finfo(float).tiny)
+
+        pixels = [np.zeros(0, dtype=np.intp)]
+        for start, end in zip(points[ : -1], points[1 : ]):
+            n_samples = int(np.ceil(np.linalg.norm(end - start) / pixel_size)) + 1
+            t = np.linspace(0, 1, n_samples)[:, np.newaxis]
+            pixels.append(self.pixel_indices(start + t*(end - start)))
+
+        return np.concatenate(pixels)
+
+    def image(self, tone_mapping='log'):
+        '''
+            Returns the (height, width, 3) uint8 RGB image: pixels with more points are darker, and paths are PATH_COLOR
+            tone_mapping can be:
+                * log: the shade is proportional to log(1 + count), so sparse areas stay visible next to dense ones
+                * linear: the shade is proportional to the count
+        '''
+
+        if tone_mapping == 'log':
+            density = np.log1p(self.counts)
+        elif tone_mapping == 'linear':
+            density = self.counts.astype(float)
+        else:
+            raise ValueError(f'unknown tone mapping: {tone_mapping}')
+
+        if density.max(initial=0) > 0:
+            density /= density.max()
+        shades = np.round(255 * (1 - density)).astype(np.uint8)
+
+        image = np.repeat(shades[:, np.newaxis], 3, axis=1)
+        image[self.path_mask] = PATH_COLOR
+        return image.reshape(self.height, self.width, 3)
+
+    def save(self, path, tone_mapping='log'):
+        '''
+            Writes the image to path, as a PNG or a PPM depending on its extension
+        '''
+
+        write_image(path, self.image(tone_mapping))
+
+def write_image(path, image):
+    '''
+        Writes the (height, width, 3) uint8 RGB image to path, as a PNG if path ends with .png and a PPM otherwise
+    '''
+
+    if str(path).lower().endswith('.png'):
+        write_png(path, image)
+    else:
+        write_ppm(path, image)
+
+def write_ppm(path, image):
+    '''
+        Writes the (height, width, 3) uint8 RGB image to path as a binary PPM
+    '''
+
+    height, width, _ = image.shape
+    with open(path, 'wb') as file:
+        file.write(f'P6\n{width} {height}\n255\n'.encode('ascii'))
+        file.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+
+def write_png(path, image):
+    '''
+        Writes the (height, width, 3) uint8 RGB image to path as a PNG
+        Every row uses filter type 0 (none), and the whole image is one zlib compressed IDAT chunk
+    '''
+
+    height, width, _ = image.shape
+    rows = np.zeros((height, 1 + 3*width), dtype=np.uint8)
+    rows[:, 1 : ] = np.asarray(image, dtype=np.uint8).reshape(height, 3*width)
+
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        # 8 bit depth, color type 2 (RGB), default compression, filter and interlace methods
+        file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        file.write(chunk(b'IDAT', zlib.compress(rows.tobytes())))
+        file.write(chunk(b'IEND', b''))
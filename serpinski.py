@@ -2,18 +2,41 @@
     File: serpinski.py
     Author: Drew Scott
     Description: Visualizes the creation of the Serpinski Triangle using points
-    Usage: python3 serpinski.py
+    Usage: python3 serpinski.py [--render=<mode>] [--fps=<fps>] [--skip] [--budget=<seconds>]
+        * mode can be: turtle (the default), raster
+        * --fps limits how often the screen is redrawn, --skip only draws the end result, and --budget skips to the
+          end once the animation has taken that many seconds
+        * raster mode renders RASTER_N_POINTS points to RASTER_PATH
 '''
 
-from random import randint, choice
-from turtle import Turtle, Screen
+import sys
+
+import numpy as np
+
+from render import parse_render_flag, parse_frame_flags, Frame_Renderer, Density_Raster, RASTER_WIDTH, RASTER_HEIGHT
 
 DOT_RADIUS = 3
 N_POINTS = 10000
+RASTER_N_POINTS = 10000000
+RASTER_PATH = 'serpinski.png'
+
+# the chaos game produces its points this many at a time
+BLOCK_SIZE = 2**20
+
+# contributions smaller than this fraction of a point's coordinates are dropped
+EPSILON = 2.0 ** -53
+
+def main(args):
+    args, render_mode = parse_render_flag(args)
+    if render_mode == 'raster':
+        main_raster()
+        return
+    args, frame_options = parse_frame_flags(args)
+
+    from turtle import Turtle, Screen
 
-def main():
     # set up the screen
-    screen = Screen()
+    screen = Frame_Renderer(Screen(), **frame_options)
     width, height = screen.window_width(), screen.window_height()
     screen.tracer(0, 0)
 
@@ -32,19 +55,97 @@ def main():
     turtle.dot(DOT_RADIUS, 'black')
     screen.update()
 
-    # go to the center of the triangle
-    prev_loc = (-50, 50)
-
-    # place the dots
-    for _ in range(N_POINTS):
-        corner = choice(corners)
-        new_loc = ((prev_loc[0] + corner[0])//2, (prev_loc[1] + corner[1])//2)
-        turtle.setposition(new_loc)
-        turtle.dot(DOT_RADIUS, 'black')
-        screen.update()
-        prev_loc = new_loc
+    # place the dots, starting from the center of the triangle
+    for points in chaos_game(corners, N_POINTS, start=(-50, 50)):
+        for point in points.tolist():
+            turtle.setposition(point)
+            turtle.dot(DOT_RADIUS, 'black')
+            screen.update()
 
     screen.exitonclick()
 
+def main_raster():
+    '''
+        Renders the density of RASTER_N_POINTS points of the Serpinski triangle to RASTER_PATH
+    '''
+
+    width, height = RASTER_WIDTH, RASTER_HEIGHT
+    corners = [(0,(height//2)-50), (-(width//2)+50,-(height//2)+50), ((width//2)-50,-(height//2)+50)]
+
+    raster = Density_Raster((-width//2, -height//2, width//2, height//2))
+    for points in chaos_game(corners, RASTER_N_POINTS, start=(-50, 50)):
+        raster.add_points(points)
+    raster.save(RASTER_PATH)
+
+def chaos_game(corners, n_points, ratio=0.5, start=None, seed=None, block_size=BLOCK_SIZE):
+    '''
+        Generates the n_points points of the chaos game on the polygon corners, as (m, 2) arrays of at most block_size
+        consecutive points
+        Each point is the previous point moved ratio of the way towards a random corner, starting from start (the
+        centroid of the corners by default); ratio may also be a sequence with the ratio to use for each corner
+        seed seeds the random corners, so the same seed generates the same points
+        Computes each block at once with NumPy, using linear_recurrence
+    '''
+
+    corners = np.asarray(corners, dtype=float).reshape(-1, 2)
+    ratios = np.broadcast_to(np.asarray(ratio, dtype=float), (len(corners), ))
+    if len(corners) == 0:
+        raise ValueError('the chaos game needs at least one corner')
+    if np.any(ratios <= 0) or np.any(ratios > 1):
+        raise ValueError('the ratios must be in (0, 1]')
+
+    rng = np.random.default_rng(seed)
+    prev_point = corners.mean(axis=0) if start is None else np.asarray(start, dtype=float)
+
+    # point_k = (1 - ratio)*point_(k-1) + ratio*corner_k, where x and y are kept in separate rows
+    scaled_corners = (ratios[:, np.newaxis] * corners).T.copy()
+    same_ratio = np.all(ratios == ratios[0])
+    for block_start in range(0, n_points, block_size):
+        chosen = rng.integers(len(corners), size=min(block_size, n_points - block_start))
+        scales = 1 - ratios[0] if same_ratio else 1 - ratios[chosen]
+        offsets = np.stack([scaled_corners[0][chosen], scaled_corners[1][chosen]])
+
+        points = linear_recurrence(scales, offsets, prev_point).T
+        prev_point = points[-1]
+        yield points
+
+def linear_recurrence(scales, offsets, start):
+    '''
+        Returns the (2, n) array of x_k = scales[k]*x_(k-1) + offsets[:, k] for each k, where x_(-1) is start
+        scales may also be a single number used for every k
+        scales must be in [0, 1): x_k only depends on the last few dozen terms, so the scan stops doubling once the
+        earlier terms are too small to change it, which takes O(log(log(EPSILON) / log(max(scales)))) passes
+        Uses the Hillis-Steele scan: after the pass with shift s, each term has combined the 2s terms ending at it
+    '''
+
+    offsets = offsets.copy()
+    n = offsets.shape[1]
+
+    # the number of terms which can still change x_k
+    max_scale = np.max(scales, initial=0)
+    window = 1 if max_scale == 0 else int(np.ceil(np.log(EPSILON) / np.log(max_scale)))
+
+    if np.ndim(scales) == 0:
+        # every composed scale is just a power of the scale, so only the offsets need to be scanned
+        s = 1
+        while s < min(window, n):
+            offsets[:, s : ] += scales**s * offsets[:, : -s]
+            s *= 2
+
+        # the start only changes the first window terms
+        m = min(window, n)
+        offsets[:, : m] += scales ** np.arange(1, m + 1) * np.asarray(start)[:, np.newaxis]
+        return offsets
+
+    scales = scales.copy()
+    s = 1
+    while s < min(window, n):
+        # compose each term with the term s before it
+        offsets[:, s : ] += scales[s : ] * offsets[:, : -s]
+        scales[s : ] = scales[s : ] * scales[ : -s]
+        s *= 2
+
+    return offsets + scales * np.asarray(start)[:, np.newaxis]
+
 if __name__ == '__main__':
-    main()
+    main(sys.argv)
@@ -0,0 +1,246 @@
+'''
+    File: step_trace.py
+    Author: Drew Scott
+    Description: Records the steps of the convex hull algorithms as a compact trace, and replays them later without
+        recomputing the hull
+    Usage: python3 step_trace.py record <method> <trace path> [n_points]
+           python3 step_trace.py replay <trace path> [--start=<event>] [--render=<mode>] [--fps=<fps>] [--skip] [--budget=<seconds>]
+        * method can be: graham_scan, gift_wrap, divide_conquer, chan, quickhull
+        * trace files are written with np.savez_compressed, so the trace path should end with .npz
+        * replaying starts from event number start (0 by default)
+        * mode can be: turtle (the default), raster; raster mode writes each step to RASTER_FRAME_PATH
+'''
+
+from random import randint
+import sys
+
+import numpy as np
+
+from convex_hull import hull, Hull_Observer, Turtle_Hull_Observer, Raster_Hull_Observer, N_POINTS
+from render import parse_render_flag, parse_frame_flags, Frame_Renderer, Density_Raster, RASTER_WIDTH, RASTER_HEIGHT
+from util import draw_connect_points, DOT_RADIUS, BORDER_PADDING
+
+RASTER_FRAME_PATH = 'frame_{:05d}.png'
+
+# the kinds of events, in the order of their codes, and which of them have a point after their list of points
+EVENTS = ['pop', 'chain', 'candidate', 'scan', 'mini_hull', 'base', 'tangent', 'merge', 'hull', 'split']
+EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+EXTRA_POINT_EVENTS = {EVENT_CODES['candidate'], EVENT_CODES['scan']}
+
+# the chain or side of an event, or the hull being wrapped
+CHANNELS = ['', 'upper', 'lower', 'wrap']
+CHANNEL_CODES = {channel: code for code, channel in enumerate(CHANNELS)}
+
+# the lists of these events only change at their end from one event to the next on the same channel (they are stacks,
+# or hulls being wrapped), so each of them only stores the points past the part it shares with the previous list
+DELTA_EVENTS = {EVENT_CODES['pop'], EVENT_CODES['chain'], EVENT_CODES['candidate'], EVENT_CODES['scan']}
+
+def main(args):
+    if args[1] == 'record':
+        n_points = int(args[4]) if len(args) > 4 else N_POINTS
+        points = [
+            (randint(-RASTER_WIDTH//2 + BORDER_PADDING, RASTER_WIDTH//2 - BORDER_PADDING), randint(-RASTER_HEIGHT//2 + BORDER_PADDING, RASTER_HEIGHT//2 - BORDER_PADDING))
+            for _ in range(n_points)
+        ]
+        recorder = Trace_Recorder(points)
+        hull(points, args[2], recorder)
+        recorder.trace().save(args[3])
+    elif args[1] == 'replay':
+        args, render_mode = parse_render_flag(args)
+        args, frame_options = parse_frame_flags(args)
+        start = 0
+        for arg in args:
+            if arg.startswith('--start='):
+                start = int(arg[len('--start=') : ])
+        trace = Trace.load(args[2])
+
+        if render_mode == 'raster':
+            raster = Density_Raster((-RASTER_WIDTH//2, -RASTER_HEIGHT//2, RASTER_WIDTH//2, RASTER_HEIGHT//2))
+            raster.add_points(trace.points)
+            replay(trace, Raster_Hull_Observer(raster, RASTER_FRAME_PATH), start)
+            return
+
+        from turtle import Turtle, Screen
+
+        screen = Frame_Renderer(Screen(), **frame_options)
+        screen.tracer(0, 0)
+        points_turtle = Turtle(visible=False)
+        points_turtle.speed(0)
+        points_turtle.penup()
+        for point in trace.points.tolist():
+            points_turtle.setposition(point)
+            points_turtle.dot(DOT_RADIUS, 'black')
+        screen.update()
+
+        convex_hull = replay(trace, Turtle_Hull_Observer(screen), start)
+        if convex_hull is not None:
+            draw_connect_points(convex_hull, screen, Turtle(visible=False))
+        screen.exitonclick()
+
+class Trace():
+    '''
+        The events recorded by a Trace_Recorder, stored as columns of NumPy arrays
+        points: the (n, 2) points which the hull was computed of
+        kinds, channels: the codes in EVENTS and CHANNELS of each event
+        prefixes: how many points of each event's list are the same as the previous list on its channel
+        lengths: the number of points in each event's list
+        coordinates: the (m, 2) points stored by the events, in order: the points of each event's list past its prefix,
+            then its extra point if it has one
+    '''
+
+    def __init__(self, points, kinds, channels, prefixes, lengths, coordinates):
+        self.points = points
+        self.kinds = kinds
+        self.channels = channels
+        self.prefixes = prefixes
+        self.lengths = lengths
+        self.coordinates = coordinates
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def save(self, path):
+        np.savez_compressed(path, points=self.points, kinds=self.kinds, channels=self.channels, prefixes=self.prefixes,
+            lengths=self.lengths, coordinates=self.coordinates)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as arrays:
+            return Trace(arrays['points'], arrays['kinds'], arrays['channels'], arrays['prefixes'], arrays['lengths'], arrays['coordinates'])
+
+class Trace_Recorder(Hull_Observer):
+    '''
+        Records the steps of a convex hull algorithm into a Trace
+        Recording an event only appends to a few lists, and stacks only store the points which changed since the last
+        event on them, so recording adds O(1) amortized time to each step
+    '''
+
+    def __init__(self, points=()):
+        self.points = points
+        self.kinds, self.channels, self.prefixes, self.lengths = [], [], [], []
+        self.coordinates = []
+
+        # the last list recorded on each channel
+        self.channel_lists = [[] for _ in CHANNELS]
+
+    def record(self, event, channel, points, extra_point=None):
+        '''
+            Records an event with its list of points, and its extra point if it has one
+        '''
+
+        code = CHANNEL_CODES[channel]
+        prefix = 0
+        if EVENT_CODES[event] in DELTA_EVENTS:
+            # only the ends of the lists can differ, so search back from the end for the last point they share
+            channel_list = self.channel_lists[code]
+            prefix = min(len(channel_list), len(points))
+            while prefix > 0 and channel_list[prefix - 1] != points[prefix - 1]:
+                prefix -= 1
+            del channel_list[prefix : ]
+            channel_list.extend(points[prefix : ])
+
+        self.kinds.append(EVENT_CODES[event])
+        self.channels.append(code)
+        self.prefixes.append(prefix)
+        self.lengths.append(len(points))
+        self.coordinates.extend(points[prefix : ])
+        if extra_point is not None:
+            self.coordinates.append(extra_point)
+
+    def trace(self):
+        '''
+            Returns the Trace of the events recorded so far
+        '''
+
+        return Trace(
+            np.array(self.points).reshape(-1, 2), np.array(self.kinds, dtype=np.uint8), np.array(self.channels, dtype=np.uint8),
+            np.array(self.prefixes, dtype=np.int32), np.array(self.lengths, dtype=np.int32), np.array(self.coordinates).reshape(-1, 2)
+        )
+
+    def on_pop(self, chain, stack):
+        self.record('pop', chain, stack)
+
+    def on_chain(self, chain, stack):
+        self.record('chain', chain, stack)
+
+    def on_candidate(self, convex_hull, candidate):
+        self.record('candidate', 'wrap', convex_hull, candidate)
+
+    def on_scan(self, convex_hull, point):
+        self.record('scan', 'wrap', convex_hull, point)
+
+    def on_mini_hull(self, convex_hull):
+        self.record('mini_hull', '', convex_hull)
+
+    def on_base(self, convex_hull):
+        self.record('base', '', convex_hull)
+
+    def on_tangent(self, side, left_point, right_point):
+        self.record('tangent', side, [left_point, right_point])
+
+    def on_merge(self, convex_hull):
+        self.record('merge', '', convex_hull)
+
+    def on_hull(self, convex_hull):
+        self.record('hull', '', convex_hull)
+
+    def on_split(self, start, end, farthest):
+        self.record('split', '', [start, end, farthest])
+
+def replay(trace, observer, start=0, stop=None):
+    '''
+        Reports the events from number start (inclusive) to stop (exclusive, the end of trace by default) of trace to
+        observer, the same way as the algorithm which recorded it did
+        Events before start are only read to rebuild the lists they share points with, so scrubbing to start is
+        O(start) without any drawing
+        Returns the list of the last hull event reported, if there was one
+    '''
+
+    stop = len(trace) if stop is None else min(stop, len(trace))
+    coordinates = trace.coordinates.tolist()
+    channel_lists = [[] for _ in CHANNELS]
+    convex_hull = None
+
+    offset = 0
+    for i in range(stop):
+        kind, channel, prefix, length = int(trace.kinds[i]), int(trace.channels[i]), int(trace.prefixes[i]), int(trace.lengths[i])
+        points = [tuple(point) for point in coordinates[offset : offset + length - prefix]]
+        offset += length - prefix
+        if kind in DELTA_EVENTS:
+            points = channel_lists[channel][ : prefix] + points
+            channel_lists[channel] = points
+        extra_point = None
+        if kind in EXTRA_POINT_EVENTS:
+            extra_point = tuple(coordinates[offset])
+            offset += 1
+
+        if i < start:
+            continue
+
+        event = EVENTS[kind]
+        if event == 'pop':
+            observer.on_pop(CHANNELS[channel], list(points))
+        elif event == 'chain':
+            observer.on_chain(CHANNELS[channel], list(points))
+        elif event == 'candidate':
+            observer.on_candidate(list(points), extra_point)
+        elif event == 'scan':
+            observer.on_scan(list(points), extra_point)
+        elif event == 'mini_hull':
+            observer.on_mini_hull(points)
+        elif event == 'base':
+            observer.on_base(points)
+        elif event == 'tangent':
+            observer.on_tangent(CHANNELS[channel], points[0], points[1])
+        elif event == 'merge':
+            observer.on_merge(points)
+        elif event == 'hull':
+            observer.on_hull(points)
+            convex_hull = points
+        elif event == 'split':
+            observer.on_split(points[0], points[1], points[2])
+
+    return convex_hull
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,207 @@
+'''
+    File: test_convex_hull.py
+    Author: Drew Scott
+    Description: Checks every convex hull method against a brute force reference hull, on random and degenerate inputs
+    Usage: python3 -m pytest test_convex_hull.py
+'''
+
+from random import Random
+
+import numpy as np
+import pytest
+
+import convex_hull
+from convex_hull import hull, parallel_divide_conquer, akl_toussaint_filter, Hull_Observer, Dynamic_Hull, HULL_METHODS, HULL_INDEX_METHODS
+from util import get_side
+
+# inputs with collinear points that methods have gotten wrong before
+COLLINEAR_CASES = [
+    [(0, 1), (0, 3), (3, 0), (2, 3), (3, 1), (0, 3), (3, 3), (2, 1), (1, 3), (1, 2)],
+    [(0, 0), (1, 1), (2, 2)],
+    [(2, -2), (4, -4), (0, 0), (6, -6)],
+    [(3, 1), (3, 0), (3, 2), (1, 2)],
+]
+
+DEGENERATE_CASES = [
+    [(1, 1)],
+    [(1, 1), (1, 1), (1, 1)],
+    [(0, 0), (5, 0)],
+    [(0, 0), (0, 1), (0, 2), (0, 3)],
+    [(0, 0), (2, 0), (1, 0), (0, 2), (2, 2), (1, 2), (0, 1), (2, 1), (1, 1)],
+]
+
+def random_cases():
+    '''
+        Returns lists of random points: small integer grids (with many duplicate and collinear points), wide integer
+        ranges and floats
+    '''
+
+    random = Random(0)
+    cases = []
+    for coordinate_range in [3, 10, 1000]:
+        for _ in range(10):
+            n_points = random.randint(1, 60)
+            cases.append([(random.randint(0, coordinate_range), random.randint(0, coordinate_range)) for _ in range(n_points)])
+    for _ in range(10):
+        cases.append([(random.random(), random.random()) for _ in range(random.randint(1, 60))])
+    return cases
+
+CASES = COLLINEAR_CASES + DEGENERATE_CASES + random_cases()
+
+# the same cases spread out so far that cross products of their coordinates overflow an int64
+LARGE_SCALE = 3**26
+LARGE_CASES = [[(x * LARGE_SCALE, y * LARGE_SCALE + 1) for x, y in points] for points in COLLINEAR_CASES + DEGENERATE_CASES] + \
+    [[(x * 3**37, y * 3**37) for x, y in points] for points in COLLINEAR_CASES]
+
+# the methods which keep the points in the middle of the hull's edges
+EDGE_POINT_METHODS = ['graham_scan']
+
+def reference_hull(points):
+    '''
+        Returns the corners of the convex hull of points in CCW order (not closed), starting from the smallest one
+        Brute force: a->b is an edge of the hull if no point is right of it and no point collinear with it is beyond b
+    '''
+
+    points = sorted(set(points))
+    if len(points) == 1:
+        return points
+
+    next_corner = {}
+    for a in points:
+        for b in points:
+            if a == b:
+                continue
+            sides = [get_side(a, b, point) for point in points]
+            beyond_b = any(
+                side == 0 and (point[0] - a[0])*(b[0] - a[0]) + (point[1] - a[1])*(b[1] - a[1]) > (b[0] - a[0])**2 + (b[1] - a[1])**2
+                for side, point in zip(sides, points)
+            )
+            behind_a = any(
+                side == 0 and (point[0] - a[0])*(b[0] - a[0]) + (point[1] - a[1])*(b[1] - a[1]) < 0
+                for side, point in zip(sides, points)
+            )
+            if min(sides) >= 0 and not beyond_b and not behind_a:
+                next_corner[a] = b
+
+    convex_hull = [points[0]]
+    while next_corner[convex_hull[-1]] != convex_hull[0]:
+        convex_hull.append(next_corner[convex_hull[-1]])
+    return convex_hull
+
+def normalized(convex_hull, method=None):
+    '''
+        Returns the closed convex_hull (with the first point repeated at the end) without the repeated point, rotated
+        to start from its smallest point
+        If method keeps the points in the middle of edges, they are dropped (the ends of a hull of collinear points,
+        where it turns back, are kept)
+    '''
+
+    assert convex_hull[0] == convex_hull[-1]
+    convex_hull = [tuple(point) for point in convex_hull[ : -1]] or [tuple(convex_hull[0])]
+    if method in EDGE_POINT_METHODS and len(convex_hull) > 2:
+        corners = []
+        for i, point in enumerate(convex_hull):
+            prev_point, next_point = convex_hull[i - 1], convex_hull[(i + 1) % len(convex_hull)]
+            if get_side(prev_point, point, next_point) != 0:
+                corners.append(point)
+                continue
+            direction = (point[0] - prev_point[0])*(next_point[0] - point[0]) + (point[1] - prev_point[1])*(next_point[1] - point[1])
+            assert direction != 0
+            if direction < 0:
+                corners.append(point)
+        convex_hull = corners
+    start = convex_hull.index(min(convex_hull))
+    return convex_hull[start : ] + convex_hull[ : start]
+
+@pytest.mark.parametrize('method', HULL_METHODS)
+@pytest.mark.parametrize('points', CASES)
+def test_hull_matches_reference(method, points):
+    assert normalized(hull(points, method), method) == reference_hull(points)
+
+@pytest.mark.parametrize('method', HULL_METHODS)
+@pytest.mark.parametrize('points', COLLINEAR_CASES + DEGENERATE_CASES)
+def test_hull_with_observer_matches_reference(method, points):
+    # some methods take a different path when they are given an observer (gift_wrap isn't batched)
+    assert normalized(hull(points, method, Hull_Observer()), method) == reference_hull(points)
+
+@pytest.mark.parametrize('points', CASES[ : : 5])
+def test_parallel_hull_matches_reference(points, monkeypatch):
+    # the cases are too small to be split between workers unless the threshold is lowered
+    monkeypatch.setattr(convex_hull, 'PARALLEL_MIN_POINTS', 0)
+    assert normalized(parallel_divide_conquer(points, workers=2)) == reference_hull(points)
+
+@pytest.mark.parametrize('method', HULL_INDEX_METHODS)
+@pytest.mark.parametrize('points', CASES)
+def test_hull_indices_match_reference(method, points):
+    indices = HULL_INDEX_METHODS[method](np.array(points))
+    convex_hull = [points[i] for i in indices]
+    assert normalized(convex_hull + convex_hull[ : 1]) == reference_hull(points)
+
+@pytest.mark.parametrize('method', HULL_METHODS)
+@pytest.mark.parametrize('points', LARGE_CASES)
+def test_hull_of_large_coordinates_matches_reference(method, points):
+    assert normalized(hull(points, method), method) == reference_hull(points)
+
+@pytest.mark.parametrize('method', HULL_INDEX_METHODS)
+@pytest.mark.parametrize('points', LARGE_CASES)
+def test_hull_indices_of_large_coordinates_match_reference(method, points):
+    indices = HULL_INDEX_METHODS[method](np.array(points, dtype=np.int64))
+    convex_hull = [points[i] for i in indices]
+    assert normalized(convex_hull + convex_hull[ : 1]) == reference_hull(points)
+
+@pytest.mark.parametrize('method', HULL_METHODS)
+@pytest.mark.parametrize('seed', range(5))
+def test_hull_of_large_coordinates_is_scaled_hull(method, seed):
+    # scaling the points scales their hull, so the hull of many large points (too many for reference_hull) is checked
+    # against that of the same points at a small scale
+    random = Random(seed)
+    points = [(random.randint(0, 1000), random.randint(0, 1000)) for _ in range(500)]
+    large_points = [(x * LARGE_SCALE, y * LARGE_SCALE) for x, y in points]
+    expected = [(x * LARGE_SCALE, y * LARGE_SCALE) for x, y in normalized(hull(points, method), method)]
+    assert normalized(hull(large_points, method), method) == expected
+    if method in HULL_INDEX_METHODS:
+        indices = HULL_INDEX_METHODS[method](np.array(large_points, dtype=np.int64))
+        convex_hull = [large_points[i] for i in indices]
+        assert normalized(convex_hull + convex_hull[ : 1]) == expected
+
+def test_akl_toussaint_filter_keeps_hull_of_large_coordinates():
+    # the hull of the points at a small scale is the same, scaled
+    random = Random(0)
+    for _ in range(200):
+        points = np.array([(random.randint(0, 1000), random.randint(0, 1000)) for _ in range(50)], dtype=np.int64)
+        indices = HULL_INDEX_METHODS['monotone_chain'](points)
+        assert akl_toussaint_filter(points * LARGE_SCALE)[indices].all()
+
+@pytest.mark.parametrize('method', HULL_METHODS)
+@pytest.mark.parametrize('observer', [None, Hull_Observer()])
+def test_hull_of_no_points_is_empty(method, observer):
+    assert hull([], method, observer) == []
+    assert hull(np.zeros((0, 2)), method, observer) == []
+
+@pytest.mark.parametrize('method', HULL_INDEX_METHODS)
+def test_hull_indices_of_no_points_are_empty(method):
+    assert len(HULL_INDEX_METHODS[method](np.zeros((0, 2)))) == 0
+
+@pytest.mark.parametrize('points', CASES)
+def test_dynamic_hull_matches_reference(points):
+    assert normalized(Dynamic_Hull(points).hull()) == reference_hull(points)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_dynamic_hull_updates_match_reference(seed):
+    # points on a coarse grid of thirds and sevenths, so that many share an x coordinate and the bridges between
+    # subtrees are often vertical
+    random = Random(seed)
+    dynamic_hull = Dynamic_Hull()
+    points = []
+    for _ in range(100):
+        if len(points) > 0 and random.random() < 0.4:
+            dynamic_hull.delete(points.pop(random.randrange(len(points))))
+        else:
+            point = (random.randint(0, 5) / 3, random.randint(0, 5) / 7)
+            dynamic_hull.insert(point)
+            points.append(point)
+
+        if len(points) > 0:
+            assert normalized(dynamic_hull.hull()) == reference_hull(points)
+        else:
+            assert dynamic_hull.hull() == []
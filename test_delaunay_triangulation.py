@@ -0,0 +1,101 @@
+'''
+    File: test_delaunay_triangulation.py
+    Author: Drew Scott
+    Description: Checks that every Delaunay triangulation method (and point location strategy) gives a valid Delaunay
+        triangulation, in both kinds of DCEL, on random and degenerate inputs
+    Usage: python3 -m pytest test_delaunay_triangulation.py
+'''
+
+from random import Random
+
+import pytest
+
+from convex_hull import monotone_chain_hull
+from delaunay_triangulation import delaunay_triangulation, delaunay_divide_conquer
+from util import get_side, in_circle, DCEL, Array_DCEL
+
+TRIANGULATIONS = {
+    'dag': lambda points, dcel: delaunay_triangulation(points, dcel=dcel, point_location='dag'),
+    'walk': lambda points, dcel: delaunay_triangulation(points, dcel=dcel, point_location='walk'),
+    'divide_conquer': lambda points, dcel: delaunay_divide_conquer(points, dcel=dcel),
+}
+
+DCELS = {
+    'DCEL': DCEL,
+    'Array_DCEL': Array_DCEL,
+}
+
+DEGENERATE_CASES = [
+    [(1, 1)],
+    [(0, 0), (1, 0)],
+    [(0, 0), (1, 1), (2, 2), (3, 3)],
+    [(0, 0), (1, 0), (0, 1)],
+    [(0, 0), (1, 0), (1, 1), (0, 1)],
+    [(x, y) for x in range(5) for y in range(5)],
+    [(0, 0), (2, 0), (1, 0), (0, 2), (1, 1), (1, 1), (2, 2)],
+]
+
+def random_cases():
+    '''
+        Returns lists of random points: small integer grids (with many duplicate, collinear and cocircular points),
+        wide integer ranges and floats
+    '''
+
+    random = Random(0)
+    cases = []
+    for coordinate_range in [4, 10, 10**6]:
+        for _ in range(8):
+            n_points = random.randint(1, 100)
+            cases.append([(random.randint(0, coordinate_range), random.randint(0, coordinate_range)) for _ in range(n_points)])
+    for _ in range(8):
+        cases.append([(random.random(), random.random()) for _ in range(random.randint(1, 100))])
+    return cases
+
+CASES = DEGENERATE_CASES + random_cases()
+
+def check_delaunay(dcel, points):
+    '''
+        Asserts that dcel is a Delaunay triangulation of points: its vertices are the distinct points, its faces are CCW
+        triangles with consistent twins, no point is inside the circumcircle of a neighboring triangle, and it covers
+        the convex hull (by counting its faces against its boundary edges)
+    '''
+
+    points = set(points)
+    assert set(vertex.coordinate for vertex in dcel.vertices) == points
+
+    faces = list(dcel.faces)
+    if len(monotone_chain_hull(list(points))) <= 3:
+        # the points are collinear (or just one), so there are no triangles
+        assert len(faces) == 0
+        return
+
+    n_boundary_edges = 0
+    for face in faces:
+        edges = [face.edge, face.edge.next, face.edge.next.next]
+        assert edges[2].next == edges[0]
+        for edge in edges:
+            assert edge.incident_face == face
+            assert edge.next.prev == edge
+            if edge.twin is None:
+                n_boundary_edges += 1
+                continue
+
+            assert edge.twin.twin == edge
+            assert edge.twin.origin_vertex == edge.next.origin_vertex
+            assert in_circle(
+                edge.origin_vertex.coordinate, edge.next.origin_vertex.coordinate, edge.prev.origin_vertex.coordinate,
+                edge.twin.prev.origin_vertex.coordinate,
+            ) <= 0
+
+        corners = [edge.origin_vertex.coordinate for edge in edges]
+        assert get_side(*corners) > 0
+
+    # a triangulation of n points with b of them on its boundary has 2n - b - 2 triangles
+    assert len(faces) == 2*len(points) - n_boundary_edges - 2
+
+@pytest.mark.parametrize('dcel_type', DCELS)
+@pytest.mark.parametrize('method', TRIANGULATIONS)
+@pytest.mark.parametrize('points', CASES)
+def test_triangulation_is_delaunay(points, method, dcel_type):
+    dcel = TRIANGULATIONS[method](points, DCELS[dcel_type]())
+    check_delaunay(dcel, points)
@@ -4,13 +4,28 @@
     Description: Contains several utility functions for visualizations
 '''
 
-from turtle import Turtle, Screen
+from fractions import Fraction
 from typing import Tuple, List
 from numbers import Number
+import mmap
+import os
+import sys
+
+import numpy as np
 
 DOT_RADIUS = 5
 BORDER_PADDING = 20
 
+# bounds on the relative rounding error of the floating point predicates (Shewchuk's ccwerrboundA and iccerrboundA)
+EPSILON = 2.0 ** -53
+ORIENTATION_ERROR_BOUND = (3 + 16*EPSILON) * EPSILON
+IN_CIRCLE_ERROR_BOUND = (10 + 96*EPSILON) * EPSILON
+CROSSING_ERROR_BOUND = (8 + 64*EPSILON) * EPSILON
+# an error bound smaller than this may have lost the rounding of products which underflowed, so it isn't trusted
+UNDERFLOW_BOUND = 1e-290
+# integer coordinates of less than this magnitude have cross products which fit in an int64
+SAFE_INTEGER_BOUND = 2**30
+
 def draw_connect_points(points, screen, turtle):
     '''
         Draws a line between each points[i], points[i+1] pair of points in points
@@ -55,9 +70,431 @@ def get_side(point1, point2, point3):
     '''
         Returns which side point3 is on of segment point1-point2
         Positive if left, negative if right, 0 if collinear
+        The sign is always exact: integer coordinates are computed exactly, and a float result too close to 0 to trust
+        (compared to its error bound) is recomputed by exact_get_side
+    '''
+
+    x2, y2 = point2[0] - point1[0], point2[1] - point1[1]
+    x3, y3 = point3[0] - point1[0], point3[1] - point1[1]
+    left, right = x2*y3, y2*x3
+    side = left - right
+    if not isinstance(side, float):
+        return side
+
+    # rounding keeps the sign of each product, so if they are of opposite signs the difference's sign is exact, and if
+    # both have a factor of 0 the difference is exactly 0
+    # (a product which underflowed to 0 fails both checks, and goes on to the error bound)
+    if left * right < 0 or ((x2 == 0 or y3 == 0) and (y2 == 0 or x3 == 0)):
+        return side
+    error_bound = ORIENTATION_ERROR_BOUND * (abs(left) + abs(right))
+    if side > error_bound or -side > error_bound:
+        return side
+    return exact_get_side(point1, point2, point3)
+
+def exact_get_side(point1, point2, point3):
+    '''
+        Returns the same as get_side, computed exactly using fractions
+    '''
+
+    (x1, y1), (x2, y2), (x3, y3) = [(Fraction(point[0]), Fraction(point[1])) for point in (point1, point2, point3)]
+    return (x2 - x1)*(y3 - y1) - (y2 - y1)*(x3 - x1)
+
+def exact_integer_array(points):
+    '''
+        Returns the array points as int64 if it has integer coordinates whose cross products fit in an int64, or as
+        Python ints (an object array) if they might overflow; arrays of other types are returned as they are
+    '''
+
+    points = np.asarray(points)
+    if not np.issubdtype(points.dtype, np.integer):
+        return points
+    if points.size == 0 or (points.min() > -SAFE_INTEGER_BOUND and points.max() < SAFE_INTEGER_BOUND):
+        return points.astype(np.int64, copy=False)
+    return points.astype(object)
+
+def get_sides(point1, point2, points):
+    '''
+        Batched get_side: returns an array of which side each of points (an (N, 2) array) is on of segment point1-point2
+        point1 and point2 may also be (M, 2) arrays of segments, in which case the result is an (M, N) array
+        Positive if left, negative if right, 0 if collinear
+        For float coordinates, the entries too close to 0 to trust are replaced by the sign of exact_get_side
+        Integer coordinates too large for exact int64 products are computed with Python ints, in an object array
+    '''
+
+    point1, point2, points = exact_integer_array(point1), exact_integer_array(point2), exact_integer_array(points)
+    if point1.ndim == 2:
+        # broadcast the segments along a new axis against the points
+        point1, point2 = point1[:, np.newaxis, :], point2[:, np.newaxis, :]
+
+    x2, y2 = point2[..., 0] - point1[..., 0], point2[..., 1] - point1[..., 1]
+    x3, y3 = points[..., 0] - point1[..., 0], points[..., 1] - point1[..., 1]
+    left, right = x2*y3, y2*x3
+    sides = left - right
+    if not np.issubdtype(sides.dtype, np.floating):
+        return sides
+
+    exact = (np.sign(left) * np.sign(right) < 0) | (((x2 == 0) | (y3 == 0)) & ((y2 == 0) | (x3 == 0)))
+    uncertain = ~exact & (np.abs(sides) <= ORIENTATION_ERROR_BOUND * (np.abs(left) + np.abs(right)))
+    if np.any(uncertain):
+        point1, point2, points = np.broadcast_arrays(point1, point2, points)
+        for index in zip(*np.nonzero(uncertain)):
+            exact_side = exact_get_side(point1[index].tolist(), point2[index].tolist(), points[index].tolist())
+            sides[index] = (exact_side > 0) - (exact_side < 0)
+
+    return sides
+
+def in_circle(point1, point2, point3, point4):
+    '''
+        Returns where point4 is relative to the circle through point1, point2 and point3, which must be in CCW order
+        Positive if inside, negative if outside, 0 if on the circle
+        The sign is always exact, the same way as for get_side
+    '''
+
+    adx, ady = point1[0] - point4[0], point1[1] - point4[1]
+    bdx, bdy = point2[0] - point4[0], point2[1] - point4[1]
+    cdx, cdy = point3[0] - point4[0], point3[1] - point4[1]
+    alift, blift, clift = adx*adx + ady*ady, bdx*bdx + bdy*bdy, cdx*cdx + cdy*cdy
+
+    bc1, bc2 = bdx*cdy, cdx*bdy
+    ca1, ca2 = cdx*ady, adx*cdy
+    ab1, ab2 = adx*bdy, bdx*ady
+    det = alift*(bc1 - bc2) + blift*(ca1 - ca2) + clift*(ab1 - ab2)
+    if not isinstance(det, float):
+        return det
+
+    # the same goes for each of the three differences, and if those terms are all of one (nonzero) sign so is their sum
+    if bc1 * bc2 < 0 and ca1 * ca2 < 0 and ab1 * ab2 < 0:
+        terms = (alift*(bc1 - bc2), blift*(ca1 - ca2), clift*(ab1 - ab2))
+        if min(terms) > 0 or max(terms) < 0:
+            return det
+    error_bound = IN_CIRCLE_ERROR_BOUND * ((abs(bc1) + abs(bc2))*alift + (abs(ca1) + abs(ca2))*blift + (abs(ab1) + abs(ab2))*clift)
+    if det > error_bound or -det > error_bound:
+        return det
+    return exact_in_circle(point1, point2, point3, point4)
+
+def exact_in_circle(point1, point2, point3, point4):
+    '''
+        Returns the same as in_circle, computed exactly using fractions
+    '''
+
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = [(Fraction(point[0]), Fraction(point[1])) for point in (point1, point2, point3, point4)]
+    adx, ady, bdx, bdy, cdx, cdy = x1 - x4, y1 - y4, x2 - x4, y2 - y4, x3 - x4, y3 - y4
+    return (
+        (adx*adx + ady*ady)*(bdx*cdy - cdx*bdy) +
+        (bdx*bdx + bdy*bdy)*(cdx*ady - adx*cdy) +
+        (cdx*cdx + cdy*cdy)*(adx*bdy - bdx*ady)
+    )
+
+def crossing_side(point1, point2, point3, point4, x):
+    '''
+        Returns which side of the vertical line at x the line through point1 and point2 crosses the line through point3
+        and point4, which must not be parallel
+        Positive if right, negative if left, 0 if on it
+        The sign is always exact, the same way as for get_side
+    '''
+
+    dx1, dy1 = point2[0] - point1[0], point2[1] - point1[1]
+    dx2, dy2 = point4[0] - point3[0], point4[1] - point3[1]
+    c1, c2 = dx1*dy2, dy1*dx2
+    t1, t2 = (point3[0] - point1[0])*dy2, (point3[1] - point1[1])*dx2
+    offset = point1[0] - x
+
+    # the crossing is at offset - (t1 - t2)*dx1 / (c1 - c2) from x
+    denominator = c1 - c2
+    numerator = offset*denominator + (t1 - t2)*dx1
+    if isinstance(numerator, float):
+        denominator_bound = ORIENTATION_ERROR_BOUND * (abs(c1) + abs(c2))
+        numerator_bound = CROSSING_ERROR_BOUND * (abs(offset)*(abs(c1) + abs(c2)) + (abs(t1) + abs(t2))*abs(dx1))
+        if (abs(denominator) <= denominator_bound or abs(numerator) <= numerator_bound or
+            min(denominator_bound, numerator_bound) < UNDERFLOW_BOUND):
+            return exact_crossing_side(point1, point2, point3, point4, x)
+
+    return ((numerator > 0) - (numerator < 0)) * ((denominator > 0) - (denominator < 0))
+
+def exact_crossing_side(point1, point2, point3, point4, x):
+    '''
+        Returns the sign of crossing_side, computed exactly using fractions
+    '''
+
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = [(Fraction(point[0]), Fraction(point[1])) for point in (point1, point2, point3, point4)]
+    denominator = (x2 - x1)*(y4 - y3) - (y2 - y1)*(x4 - x3)
+    numerator = (x1 - Fraction(x))*denominator + ((x3 - x1)*(y4 - y3) - (y3 - y1)*(x4 - x3))*(x2 - x1)
+    return ((numerator > 0) - (numerator < 0)) * ((denominator > 0) - (denominator < 0))
+
+def hilbert_order(points, bits=16):
+    '''
+        Returns the indices which sort points along a Hilbert curve through their bounding box
+        The box is split into a grid of 2^bits by 2^bits cells, so points closer than a cell may be in any order
+    '''
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    # scale the points onto the integer grid
+    side = 1 << bits
+    low, high = points.min(axis=0), points.max(axis=0)
+    extent = high - low
+    scale = np.divide(side - 1, extent, out=np.zeros(2), where=extent > 0)
+    x, y = ((points - low) * scale).astype(np.int64).T
+
+    # the standard xy to distance conversion, for every point at once
+    distances = np.zeros(len(points), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx, ry = (x & s) > 0, (y & s) > 0
+        distances += s * s * ((3 * rx) ^ ry)
+
+        # rotate the quadrant so that the curve within it has the standard orientation
+        flip = ~ry & rx
+        x, y = np.where(flip, side - 1 - x, x), np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+
+    return np.argsort(distances, kind='stable')
+
+def brio_order(points):
+    '''
+        Returns the indices of points in a biased randomized insertion order
+        Each point is put in a random round, where every round has about twice as many points as the one before it,
+        and each round is sorted with hilbert_order: consecutive points are near each other, but the order is still
+        random enough for the incremental Delaunay triangulation to be O(nlogn) expected
+    '''
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    rounds = -np.random.geometric(0.5, len(points))
+    hilbert_rank = np.empty(len(points), dtype=np.intp)
+    hilbert_rank[hilbert_order(points)] = np.arange(len(points))
+
+    return np.lexsort((hilbert_rank, rounds))
+
+class PointSet():
+    '''
+        A set of points stored once as an (N, 2) array, which computes the things the algorithms need from it (sorted
+        order, bounding box, extreme points, distinct points) on first use and keeps them
+        Every convex hull and Delaunay triangulation method accepts one in place of a list of points, so running several
+        of them on the same PointSet only sorts it once
+        It also acts as a sequence of (x, y) tuples, and as an array for NumPy
+    '''
+
+    def __init__(self, points):
+        if isinstance(points, PointSet):
+            points = points.coordinates
+        elif not isinstance(points, np.ndarray):
+            points = list(points)
+        self.coordinates = np.ascontiguousarray(np.asarray(points).reshape(-1, 2))
+
+        self.point_list = None
+        self.order = None
+        self.unique_set = None
+        self.box = None
+        self.extreme_indices = None
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, index):
+        return tuple(self.coordinates[index].tolist())
+
+    def __iter__(self):
+        return iter(self.points())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.coordinates, dtype=dtype, copy=copy)
+
+    def points(self):
+        '''
+            Returns the list of the points as tuples, in their original order
+        '''
+
+        if self.point_list is None:
+            self.point_list = list(map(tuple, self.coordinates.tolist()))
+        return self.point_list
+
+    def sorted_order(self):
+        '''
+            Returns the indices which sort the points by x value then by y value, from lexicographic_order
+        '''
+
+        if self.order is None:
+            self.order = lexicographic_order(self.coordinates)
+        return self.order
+
+    def unique(self):
+        '''
+            Returns a PointSet of the distinct points in sorted order
+        '''
+
+        if self.unique_set is None:
+            order = self.sorted_order()
+            is_new = np.ones(len(order), dtype=bool)
+            is_new[1 : ] = np.any(self.coordinates[order[1 : ]] != self.coordinates[order[ : -1]], axis=1)
+            self.unique_set = PointSet(self.coordinates[order[is_new]])
+            self.unique_set.order = np.arange(len(self.unique_set))
+            self.unique_set.unique_set = self.unique_set
+
+        return self.unique_set
+
+    def sorted_points(self):
+        '''
+            Returns a new list of the distinct points as tuples in sorted order, the same as sorted(set(points))
+        '''
+
+        return list(self.unique().points())
+
+    def bounding_box(self):
+        '''
+            Returns the (min x, min y, max x, max y) of the points
+        '''
+
+        if self.box is None:
+            low, high = self.coordinates.min(axis=0).tolist(), self.coordinates.max(axis=0).tolist()
+            self.box = (low[0], low[1], high[0], high[1])
+        return self.box
+
+    def extremes(self):
+        '''
+            Returns the indices of the leftmost, lowest, rightmost and highest points
+            Ties are broken the same way as sorting: the leftmost and rightmost points are the first and last in sorted
+            order, and the lowest and highest points are the leftmost and rightmost of their ties
+        '''
+
+        if self.extreme_indices is None:
+            order = self.sorted_order()
+            ys = self.coordinates[order, 1]
+            self.extreme_indices = (int(order[0]), int(order[np.argmin(ys)]), int(order[-1]), int(order[len(ys) - 1 - np.argmax(ys[ : : -1])]))
+        return self.extreme_indices
+
+def as_point_set(points):
+    '''
+        Returns points as a PointSet, which is points itself if it already is one
+    '''
+
+    return points if isinstance(points, PointSet) else PointSet(points)
+
+def sorted_unique_points(points):
+    '''
+        Returns the distinct points of points as a sorted list of tuples
+        A PointSet's sorted order is kept, so it is only sorted once however many times this is called on it
+    '''
+
+    if isinstance(points, PointSet):
+        return points.sorted_points()
+    return sorted(set(points))
+
+def unique_points(points):
+    '''
+        Returns the distinct points of points as a list of tuples, in any order
+    '''
+
+    if isinstance(points, PointSet):
+        return points.sorted_points()
+    return list(set(points))
+
+def lexicographic_order(points):
+    '''
+        Returns the indices which sort the (N, 2) array points by x value then by y value, with ties in their original
+        order
+        Integer coordinates are packed into one key per point and radix sorted 16 bits at a time, which is a few times
+        faster than np.lexsort
+    '''
+
+    points = np.asarray(points).reshape(-1, 2)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.intp)
+    if not np.issubdtype(points.dtype, np.integer):
+        return np.lexsort((points[:, 1], points[:, 0]))
+
+    low, high = points.min(axis=0).tolist(), points.max(axis=0).tolist()
+    x_range, y_range = high[0] - low[0] + 1, high[1] - low[1] + 1
+    if x_range * y_range > 2**64:
+        return np.lexsort((points[:, 1], points[:, 0]))
+
+    # the offsets from the minimums wrap around in uint64, which still gives the right result since they fit in it
+    xs = points[:, 0].astype(np.uint64) - np.uint64(low[0] % 2**64)
+    ys = points[:, 1].astype(np.uint64) - np.uint64(low[1] % 2**64)
+    keys = xs * np.uint64(y_range % 2**64) + ys
+
+    # NumPy's stable sort of 16 bit integers is a radix sort, so each pass is O(N)
+    order = np.arange(len(keys))
+    for shift in range(0, max(1, (x_range * y_range - 1).bit_length()), 16):
+        digits = ((keys[order] >> np.uint64(shift)) & np.uint64(0xffff)).astype(np.uint16)
+        order = order[np.argsort(digits, kind='stable')]
+
+    return order
+
+def load_points(path, dtype=np.float64):
+    '''
+        Returns the (N, 2) array of the points in the file at path, which is memory mapped rather than read for binary
+        files, so only the parts of it which are used are ever loaded
+        The format is given by the extension of path:
+            * .npy: a NumPy array of shape (N, 2)
+            * .csv, .txt: one x,y pair per line
+            * anything else: raw little endian pairs of dtype, with no header
+        path can be - to read raw pairs from standard input
+    '''
+
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if path == '-':
+        return np.frombuffer(sys.stdin.buffer.read(), dtype=dtype).reshape(-1, 2)
+
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.npy':
+        points = np.load(path, mmap_mode='r')
+    elif extension in ('.csv', '.txt'):
+        points = np.loadtxt(path, delimiter=',', dtype=dtype, ndmin=2)
+    elif os.path.getsize(path) == 0:
+        # np.memmap can't map an empty file
+        points = np.zeros(0, dtype=dtype)
+    else:
+        points = np.memmap(path, dtype=dtype, mode='r')
+
+    return points.reshape(-1, 2)
+
+def save_array(path, array):
+    '''
+        Writes array to the file at path, in the format given by the extension of path, as in load_points
+        Raw files are the array's values in little endian and row major order; path can be - to write them to standard
+        output
+    '''
+
+    array = np.asarray(array)
+    raw = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    if path == '-':
+        sys.stdout.buffer.write(raw.tobytes())
+        sys.stdout.buffer.flush()
+        return
+
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.npy':
+        np.save(path, array)
+    elif extension in ('.csv', '.txt'):
+        np.savetxt(path, array.reshape(len(array), -1), delimiter=',', fmt='%d' if np.issubdtype(array.dtype, np.integer) else '%.17g')
+    else:
+        raw.tofile(path)
+
+def release_rows(points, start, stop):
+    '''
+        Tells the kernel that the rows from start (inclusive) to stop (exclusive) of points, if it is memory mapped (as
+        returned by load_points), won't be read again, so their pages stop counting towards the memory of the process
+        Does nothing for arrays which aren't memory mapped, or where madvise isn't available
     '''
-    
-    return ((point2[0] - point1[0])*(point3[1] - point1[1]) - (point2[1] - point1[1])*(point3[0] - point1[0]))
+
+    mapping = points
+    while mapping is not None and not isinstance(mapping, mmap.mmap):
+        mapping = getattr(mapping, 'base', None)
+    if mapping is None or not hasattr(mapping, 'madvise') or not hasattr(mmap, 'MADV_DONTNEED') or stop <= start:
+        return
+
+    # madvise takes whole pages, so only the pages entirely within the rows are released
+    rows = points[start : stop]
+    mapping_start = np.frombuffer(mapping, dtype=np.uint8).ctypes.data
+    first_byte = rows.ctypes.data - mapping_start
+    last_byte = first_byte + rows.nbytes
+    first_page = -(-first_byte // mmap.PAGESIZE) * mmap.PAGESIZE
+    last_page = last_byte // mmap.PAGESIZE * mmap.PAGESIZE
+    if last_page > first_page:
+        mapping.madvise(mmap.MADV_DONTNEED, first_page, last_page - first_page)
 
 class DCEL():
     def __init__(self):
@@ -65,6 +502,56 @@ class DCEL():
         self.half_edges: List[HalfEdge_DCEL] = []
         self.faces: List[Face_DCEL] = []
 
+    def add_vertex(self, coordinate: Tuple[Number, Number]):
+        vertex = Vertex_DCEL(coordinate)
+        self.vertices.append(vertex)
+        return vertex
+
+    def add_half_edge(self, origin_vertex):
+        half_edge = HalfEdge_DCEL(origin_vertex)
+        half_edge.index = len(self.half_edges)
+        self.half_edges.append(half_edge)
+        return half_edge
+
+    def remove_half_edge(self, half_edge):
+        '''
+            Removes half_edge from half_edges in O(1) by moving the last half edge into its place
+        '''
+
+        last_half_edge = self.half_edges.pop()
+        if last_half_edge is not half_edge:
+            self.half_edges[half_edge.index] = last_half_edge
+            last_half_edge.index = half_edge.index
+
+    def add_face(self, edge):
+        '''
+            Adds a face bounded by the cycle of next pointers through edge, and makes it the incident face of that cycle
+        '''
+
+        face = Face_DCEL()
+        face.edge = edge
+        face.index = len(self.faces)
+        self.faces.append(face)
+
+        cur_edge = edge
+        while True:
+            cur_edge.incident_face = face
+            cur_edge = cur_edge.next
+            if cur_edge is edge:
+                break
+
+        return face
+
+    def remove_face(self, face):
+        '''
+            Removes face from faces in O(1) by moving the last face into its place
+        '''
+
+        last_face = self.faces.pop()
+        if last_face is not face:
+            self.faces[face.index] = last_face
+            last_face.index = face.index
+
 class Vertex_DCEL():
     def __init__(self, coordinate: Tuple[Number, Number]):
         self.coordinate: Tuple[Number, Number] = coordinate
@@ -77,8 +564,210 @@ class HalfEdge_DCEL():
         self.twin: HalfEdge_DCEL = None
         self.next: HalfEdge_DCEL = None
         self.prev: HalfEdge_DCEL = None
+        self.index: int = None
 
 class Face_DCEL():
     def __init__(self):
-        self.edge: HalfEdge_DCEL = None 
+        self.edge: HalfEdge_DCEL = None
+        self.index: int = None
+
+
+class Array_DCEL():
+    '''
+        A DCEL stored as a struct of arrays: each vertex, half edge and face is an index into NumPy arrays, so it takes a
+        few dozen bytes per half edge instead of a Python object each
+        Navigating it gives lightweight handles with the same attributes as Vertex_DCEL, HalfEdge_DCEL and Face_DCEL;
+        -1 takes the place of None
+        Removed half edges and faces go on free lists and their slots are reused, so removal is O(1)
+    '''
+
+    def __init__(self, capacity=16):
+        self.coordinates = np.empty((capacity, 2), dtype=np.float64)
+        self.vertex_edge = np.full(capacity, -1, dtype=np.int32)
+        self.origin = np.full(capacity, -1, dtype=np.int32)
+        self.twin = np.full(capacity, -1, dtype=np.int32)
+        self.next = np.full(capacity, -1, dtype=np.int32)
+        self.prev = np.full(capacity, -1, dtype=np.int32)
+        self.face = np.full(capacity, -1, dtype=np.int32)
+        self.face_edge = np.full(capacity, -1, dtype=np.int32)
+
+        self.n_vertices = 0
+        self.n_half_edges = 0
+        self.n_faces = 0
+        self.free_half_edges = []
+        self.free_faces = []
+
+    @property
+    def vertices(self):
+        return [Array_Vertex(self, i) for i in range(self.n_vertices)]
+
+    @property
+    def half_edges(self):
+        return [Array_HalfEdge(self, i) for i in np.flatnonzero(self.origin[ : self.n_half_edges] >= 0).tolist()]
+
+    @property
+    def faces(self):
+        return [Array_Face(self, i) for i in np.flatnonzero(self.face_edge[ : self.n_faces] >= 0).tolist()]
+
+    def add_vertex(self, coordinate: Tuple[Number, Number]):
+        if self.n_vertices == len(self.vertex_edge):
+            self.coordinates = grow_array(self.coordinates, 0)
+            self.vertex_edge = grow_array(self.vertex_edge, -1)
+
+        self.coordinates[self.n_vertices] = coordinate
+        self.n_vertices += 1
+        return Array_Vertex(self, self.n_vertices - 1)
+
+    def add_half_edge(self, origin_vertex):
+        if len(self.free_half_edges) > 0:
+            half_edge = self.free_half_edges.pop()
+        else:
+            if self.n_half_edges == len(self.origin):
+                for name in ('origin', 'twin', 'next', 'prev', 'face'):
+                    setattr(self, name, grow_array(getattr(self, name), -1))
+            half_edge = self.n_half_edges
+            self.n_half_edges += 1
+
+        self.origin[half_edge] = origin_vertex.index
+        return Array_HalfEdge(self, half_edge)
+
+    def remove_half_edge(self, half_edge):
+        '''
+            Removes half_edge in O(1) by putting its slot on the free list
+        '''
+
+        for array in (self.origin, self.twin, self.next, self.prev, self.face):
+            array[half_edge.index] = -1
+        self.free_half_edges.append(half_edge.index)
+
+    def add_face(self, edge):
+        '''
+            Adds a face bounded by the cycle of next pointers through edge, and makes it the incident face of that cycle
+        '''
+
+        if len(self.free_faces) > 0:
+            face = self.free_faces.pop()
+        else:
+            if self.n_faces == len(self.face_edge):
+                self.face_edge = grow_array(self.face_edge, -1)
+            face = self.n_faces
+            self.n_faces += 1
+
+        self.face_edge[face] = edge.index
+        cur_edge = edge.index
+        while True:
+            self.face[cur_edge] = face
+            cur_edge = self.next[cur_edge]
+            if cur_edge == edge.index:
+                break
+
+        return Array_Face(self, face)
+
+    def remove_face(self, face):
+        '''
+            Removes face in O(1) by putting its slot on the free list
+        '''
+
+        self.face_edge[face.index] = -1
+        self.free_faces.append(face.index)
+
+def grow_array(array, fill):
+    '''
+        Returns a copy of array with twice as many rows, where the new rows are set to fill
+    '''
+
+    grown = np.full((2 * len(array), *array.shape[1 : ]), fill, dtype=array.dtype)
+    grown[ : len(array)] = array
+    return grown
+
+class Array_Handle():
+    '''
+        A reference to the vertex, half edge or face at index of an Array_DCEL; handles to the same one are equal
+    '''
+
+    __slots__ = ('dcel', 'index')
+
+    def __init__(self, dcel, index):
+        self.dcel = dcel
+        self.index = int(index)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.index == self.index and other.dcel is self.dcel
+
+    def __hash__(self):
+        return hash(self.index)
+
+def handle_or_none(handle_type, dcel, index):
+    return None if index < 0 else handle_type(dcel, index)
+
+def index_or_none(handle):
+    return -1 if handle is None else handle.index
+
+class Array_Vertex(Array_Handle):
+    __slots__ = ()
+
+    @property
+    def coordinate(self):
+        return tuple(self.dcel.coordinates[self.index].tolist())
+
+    @property
+    def incident_edge(self):
+        return handle_or_none(Array_HalfEdge, self.dcel, self.dcel.vertex_edge[self.index])
+
+    @incident_edge.setter
+    def incident_edge(self, edge):
+        self.dcel.vertex_edge[self.index] = index_or_none(edge)
+
+class Array_HalfEdge(Array_Handle):
+    __slots__ = ()
+
+    @property
+    def origin_vertex(self):
+        return Array_Vertex(self.dcel, self.dcel.origin[self.index])
+
+    @origin_vertex.setter
+    def origin_vertex(self, vertex):
+        self.dcel.origin[self.index] = vertex.index
+
+    @property
+    def incident_face(self):
+        return handle_or_none(Array_Face, self.dcel, self.dcel.face[self.index])
+
+    @incident_face.setter
+    def incident_face(self, face):
+        self.dcel.face[self.index] = index_or_none(face)
+
+    @property
+    def twin(self):
+        return handle_or_none(Array_HalfEdge, self.dcel, self.dcel.twin[self.index])
+
+    @twin.setter
+    def twin(self, edge):
+        self.dcel.twin[self.index] = index_or_none(edge)
+
+    @property
+    def next(self):
+        return handle_or_none(Array_HalfEdge, self.dcel, self.dcel.next[self.index])
+
+    @next.setter
+    def next(self, edge):
+        self.dcel.next[self.index] = index_or_none(edge)
+
+    @property
+    def prev(self):
+        return handle_or_none(Array_HalfEdge, self.dcel, self.dcel.prev[self.index])
+
+    @prev.setter
+    def prev(self, edge):
+        self.dcel.prev[self.index] = index_or_none(edge)
+
+class Array_Face(Array_Handle):
+    __slots__ = ()
+
+    @property
+    def edge(self):
+        return handle_or_none(Array_HalfEdge, self.dcel, self.dcel.face_edge[self.index])
 
+    @edge.setter
+    def edge(self, edge):
+        self.dcel.face_edge[self.index] = index_or_none(edge)
@@ -0,0 +1,278 @@
+'''
+    File: voronoi.py
+    Author: Drew Scott
+    Description: Visualizes the Voronoi diagram of a set of points, computed from their Delaunay triangulation
+    Usage: python3 voronoi.py [method]
+        * method can be: incremental (the default), divide_conquer
+'''
+
+from random import randint
+import sys
+
+import numpy as np
+
+from delaunay_triangulation import triangulate
+from render import Frame_Renderer
+from util import hilbert_order, draw_connect_points, DOT_RADIUS, BORDER_PADDING, Array_DCEL
+
+N_POINTS = 100
+
+# queries are walked this many at a time, so the arrays of distances stay small
+QUERY_BLOCK = 4096
+
+def main(args):
+    from turtle import Turtle, Screen
+
+    # set up the screen
+    screen = Frame_Renderer(Screen())
+    width, height = screen.window_width(), screen.window_height()
+    screen.tracer(0, 0)
+
+    # generate and draw the points
+    points = []
+    points_turtle = Turtle(visible=False)
+    points_turtle.speed(0)
+    points_turtle.penup()
+    for _ in range(N_POINTS):
+        new_loc = (randint((-width//2) + BORDER_PADDING, (width//2) - BORDER_PADDING), randint((-height//2) + BORDER_PADDING, (height//2) - BORDER_PADDING))
+        points.append(new_loc)
+        points_turtle.setposition(new_loc)
+        points_turtle.dot(DOT_RADIUS, 'black')
+    screen.update()
+
+    # compute and draw the Voronoi diagram, with the unbounded edges cut off past the edge of the screen
+    method = args[1] if len(args) > 1 else 'incremental'
+    diagram = voronoi_diagram(triangulate(points, method))
+    voronoi_turtle = Turtle(visible=False)
+    voronoi_turtle.speed(0)
+    voronoi_turtle.pencolor('blue')
+    for i, j in diagram.edges:
+        draw_connect_points([tuple(diagram.vertices[i]), tuple(diagram.vertices[j])], screen, voronoi_turtle)
+    for i, direction in zip(diagram.ray_vertices, diagram.ray_directions):
+        far_point = diagram.vertices[i] + (width + height) * direction
+        draw_connect_points([tuple(diagram.vertices[i]), tuple(far_point)], screen, voronoi_turtle)
+
+    screen.exitonclick()
+
+class Voronoi_Diagram():
+    '''
+        The Voronoi diagram dual to a Delaunay triangulation
+        sites: (n, 2) array of the sites, in the order of the DCEL's vertices
+        vertices: (f, 2) array of the Voronoi vertices, which are the circumcenters of the triangles
+        edges: (m, 2) array of the pairs of vertices joined by a bounded Voronoi edge
+        ray_vertices, ray_directions: the start vertex and unit direction of each unbounded Voronoi edge
+        cells: for each site, the indices of the vertices of its cell in CCW order; the cell is unbounded if the site
+            is on the convex hull, in which case its first and last vertices are the starts of its two rays
+        bounded: for each site, whether its cell is bounded
+    '''
+
+    def __init__(self, sites, vertices, edges, ray_vertices, ray_directions, cells, bounded):
+        self.sites = sites
+        self.vertices = vertices
+        self.edges = edges
+        self.ray_vertices = ray_vertices
+        self.ray_directions = ray_directions
+        self.cells = cells
+        self.bounded = bounded
+
+def voronoi_diagram(dcel):
+    '''
+        Returns the Voronoi_Diagram dual to the Delaunay triangulation in dcel, as returned by triangulate
+        Each triangle becomes a vertex, each edge between two triangles becomes an edge, and each convex hull edge
+        becomes a ray going out from the hull: O(n), where n is the number of sites
+    '''
+
+    faces, vertices = circumcenters(dcel)
+    face_indices = {face: i for i, face in enumerate(faces)}
+    sites = np.array([vertex.coordinate for vertex in dcel.vertices], dtype=float).reshape(-1, 2)
+    site_indices = {vertex: i for i, vertex in enumerate(dcel.vertices)}
+
+    # each interior edge is seen from both of its half edges, so only the one from its first face is kept
+    edges = []
+    ray_vertices, ray_directions = [], []
+    for face in faces:
+        edge = face.edge
+        for _ in range(3):
+            i = face_indices[face]
+            if edge.twin is None:
+                # the ray is perpendicular to the hull edge, pointing out of the hull (which is on the right)
+                (x1, y1), (x2, y2) = edge.origin_vertex.coordinate, edge.next.origin_vertex.coordinate
+                ray_vertices.append(i)
+                ray_directions.append((y2 - y1, x1 - x2))
+            elif i < face_indices[edge.twin.incident_face]:
+                edges.append((i, face_indices[edge.twin.incident_face]))
+            edge = edge.next
+
+    ray_directions = np.array(ray_directions, dtype=float).reshape(-1, 2)
+    ray_directions /= np.maximum(np.linalg.norm(ray_directions, axis=1), np.finfo(float).tiny)[:, np.newaxis]
+
+    # walk CCW around each site to get its cell
+    cells, bounded = [[] for _ in range(len(sites))], np.zeros(len(sites), dtype=bool)
+    for vertex in dcel.vertices:
+        start = vertex.incident_edge
+        if start is None:
+            continue
+
+        # start at the hull edge going out of the site if there is one, which is found by rotating CW
+        edge = start
+        while edge.twin is not None:
+            edge = edge.twin.next
+            if edge == start:
+                break
+        start = edge
+
+        cell = cells[site_indices[vertex]]
+        while True:
+            cell.append(face_indices[edge.incident_face])
+            if edge.prev.twin is None:
+                break
+            edge = edge.prev.twin
+            if edge == start:
+                bounded[site_indices[vertex]] = True
+                break
+
+    return Voronoi_Diagram(sites, vertices, np.array(edges, dtype=np.intp).reshape(-1, 2),
+        np.array(ray_vertices, dtype=np.intp), ray_directions, cells, bounded)
+
+def circumcenters(dcel):
+    '''
+        Returns the faces of dcel, and an array of the circumcenters of their triangles
+        The circumcenters are all computed at once with NumPy
+    '''
+
+    faces, triangles = triangle_coordinates(dcel)
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+
+    # solve for the center relative to a
+    b, c = b - a, c - a
+    b_lift, c_lift = np.sum(b*b, axis=1), np.sum(c*c, axis=1)
+    d = 2 * (b[:, 0]*c[:, 1] - b[:, 1]*c[:, 0])
+    centers = np.empty_like(a)
+    centers[:, 0] = (c[:, 1]*b_lift - b[:, 1]*c_lift) / d
+    centers[:, 1] = (b[:, 0]*c_lift - c[:, 0]*b_lift) / d
+
+    return faces, centers + a
+
+def triangle_coordinates(dcel):
+    '''
+        Returns the faces of dcel, and an (f, 3, 2) array of the coordinates of their triangles' vertices in CCW order
+        An Array_DCEL is read straight from its arrays
+    '''
+
+    faces = dcel.faces
+    if isinstance(dcel, Array_DCEL):
+        edges = np.array([face.index for face in faces], dtype=np.intp)
+        edges = dcel.face_edge[edges]
+        corners = np.stack([edges, dcel.next[edges], dcel.prev[edges]], axis=1)
+        return faces, dcel.coordinates[dcel.origin[corners]].reshape(-1, 3, 2)
+
+    triangles = [
+        [face.edge.origin_vertex.coordinate, face.edge.next.origin_vertex.coordinate, face.edge.prev.origin_vertex.coordinate]
+        for face in faces
+    ]
+    return faces, np.array(triangles, dtype=float).reshape(-1, 3, 2)
+
+class Nearest_Site_Index():
+    '''
+        Answers nearest site queries by walking the Delaunay triangulation of the sites
+        Each query starts from the nearest of a sample of about sqrt(n) sites, then repeatedly moves to the neighbor
+        closest to the query while it gets closer; the Delaunay graph guarantees that the walk can only stop at the
+        nearest site
+    '''
+
+    def __init__(self, dcel, seed=None):
+        '''
+            Builds the index from the Delaunay triangulation in dcel, as returned by triangulate: O(n)
+            seed seeds the sample of starting sites, so the same seed gives the same index
+        '''
+
+        vertices = dcel.vertices
+        self.sites = np.array([vertex.coordinate for vertex in vertices], dtype=float).reshape(-1, 2)
+        if len(self.sites) == 0:
+            raise ValueError('there are no sites to query')
+
+        # every edge of the triangulation goes both ways, including the convex hull edges which have one half edge
+        if isinstance(dcel, Array_DCEL):
+            half_edges = np.flatnonzero(dcel.origin[ : dcel.n_half_edges] >= 0)
+            half_edges = half_edges[dcel.next[half_edges] >= 0]
+            origins, destinations = dcel.origin[half_edges], dcel.origin[dcel.next[half_edges]]
+        else:
+            site_indices = {vertex: i for i, vertex in enumerate(vertices)}
+            pairs = [(site_indices[edge.origin_vertex], site_indices[edge.next.origin_vertex]) for edge in dcel.half_edges]
+            origins, destinations = np.array(pairs, dtype=np.intp).reshape(-1, 2).T
+        if len(origins) == 0:
+            # the sites are collinear, so each one's Delaunay neighbors are the ones next to it in sorted order
+            order = np.lexsort((self.sites[:, 1], self.sites[:, 0]))
+            origins, destinations = order[ : -1], order[1 : ]
+        pairs = np.unique(np.concatenate([np.stack([origins, destinations], axis=1), np.stack([destinations, origins], axis=1)]), axis=0)
+
+        # store the neighbors of each site in a row padded with -1
+        degrees = np.bincount(pairs[:, 0], minlength=len(self.sites))
+        starts = np.concatenate([[0], np.cumsum(degrees)[ : -1]])
+        self.neighbors = np.full((len(self.sites), max(1, degrees.max(initial=0))), -1, dtype=np.intp)
+        self.neighbors[pairs[:, 0], np.arange(len(pairs)) - starts[pairs[:, 0]]] = pairs[:, 1]
+
+        # the walks start from the nearest of these
+        n_samples = max(1, int(np.sqrt(len(self.sites))))
+        self.samples = np.random.default_rng(seed).choice(len(self.sites), n_samples, replace=False)
+
+    def nearest(self, point):
+        '''
+            Returns the index of the site nearest to point
+        '''
+
+        return int(self.nearest_many([point])[0])
+
+    def nearest_many(self, points):
+        '''
+            Returns an array of the indices of the sites nearest to each of points
+            The queries are taken in blocks, and all of the walks in a block take their steps at once
+        '''
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        nearest = np.empty(len(points), dtype=np.intp)
+
+        # queries near each other take similar walks, so keeping them together keeps the blocks' walks equally short
+        order = hilbert_order(points)
+        for block_start in range(0, len(points), QUERY_BLOCK):
+            block = order[block_start : block_start + QUERY_BLOCK]
+            nearest[block] = self.walk(points[block])
+
+        return nearest
+
+    def walk(self, points):
+        '''
+            Returns an array of the indices of the sites nearest to each of points, found by walking from the samples
+        '''
+
+        sample_distances = squared_distances(points[:, np.newaxis, :], self.sites[self.samples][np.newaxis, :, :])
+        current = self.samples[np.argmin(sample_distances, axis=1)]
+        current_distances = squared_distances(points, self.sites[current])
+
+        # walks which stopped getting closer are done
+        active = np.arange(len(points))
+        while len(active) > 0:
+            neighbors = self.neighbors[current[active]]
+            distances = squared_distances(points[active, np.newaxis, :], self.sites[neighbors])
+            distances[neighbors < 0] = np.inf
+
+            best = np.argmin(distances, axis=1)
+            best_distances = distances[np.arange(len(active)), best]
+            moved = best_distances < current_distances[active]
+
+            active, best, best_distances = active[moved], best[moved], best_distances[moved]
+            current[active] = neighbors[moved, best]
+            current_distances[active] = best_distances
+
+        return current
+
+def squared_distances(points1, points2):
+    '''
+        Returns the squared distances between points1 and points2, which are broadcast against each other
+    '''
+
+    differences = points1 - points2
+    return np.sum(differences * differences, axis=-1)
+
+if __name__ == '__main__':
+    main(sys.argv)